@@ -0,0 +1,169 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .calculator import calculate_impact_over_years_batch, validate_incomes
+
+# Profiles scored per simulation; memory use depends on this, not on the input size
+BULK_CHUNK_SIZE = 250
+
+# CSV columns that hold wage growth rather than income, e.g. wage_growth_2027
+WAGE_GROWTH_PREFIX = "wage_growth_"
+
+
+def parse_ndjson_profile(line: str) -> Dict[str, Any]:
+    """
+    Parse one NDJSON line shaped like a `WageGrowthRequest`, with an optional "id".
+    """
+    record = json.loads(line)
+    incomes = [
+        {"amount": float(income_item["amount"]), "type": str(income_item["type"])}
+        for income_item in record["incomes"]
+    ]
+    wage_growth = {str(year): float(rate) for year, rate in record.get("wage_growth", {}).items()}
+    return {"id": record.get("id"), "incomes": incomes, "wage_growth": wage_growth}
+
+
+def parse_csv_profile(row: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Parse one CSV row with an optional id column, one column per income type and optional
+    wage_growth_<year> columns. Empty cells are skipped.
+    """
+    incomes = []
+    wage_growth = {}
+    for column, value in row.items():
+        if column == "id" or value is None or value.strip() == "":
+            continue
+        if column.startswith(WAGE_GROWTH_PREFIX):
+            wage_growth[column[len(WAGE_GROWTH_PREFIX) :]] = float(value)
+        else:
+            incomes.append({"amount": float(value), "type": column})
+    return {"id": row.get("id") or None, "incomes": incomes, "wage_growth": wage_growth}
+
+
+def score_lines(
+    lines: List[str], input_format: str, header: Optional[List[str]] = None, start: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Score a chunk of NDJSON or CSV lines with one batched simulation per scenario.
+
+    Args:
+        lines: Input lines, without the CSV header
+        input_format: "ndjson" or "csv"
+        header: CSV column names
+        start: Position of the first line in the input, used as the id when none is given
+
+    Returns:
+        One result per line, in order: net income by year for both scenarios and the total
+        impact, or an error message for lines that couldn't be parsed
+    """
+    parsed = []
+    for position, line in enumerate(lines, start):
+        row = {}
+        try:
+            if input_format == "csv":
+                row = dict(zip(header, next(csv.reader([line]))))
+                profile = parse_csv_profile(row)
+            else:
+                profile = parse_ndjson_profile(line)
+        except (ValueError, KeyError, TypeError, AttributeError, StopIteration) as e:
+            profile = {"id": row.get("id") or None, "error": f"Could not parse line: {e}"}
+        if profile.get("id") is None:
+            profile["id"] = position
+        parsed.append(profile)
+
+    # Check inputs first so an unknown income type doesn't fail the chunk's simulation
+    for profile in parsed:
+        if "error" not in profile:
+            try:
+                validate_incomes(profile["incomes"])
+            except ValueError as e:
+                profile["error"] = f"Could not score profile: {e}"
+
+    valid = [profile for profile in parsed if "error" not in profile]
+    try:
+        results = calculate_impact_over_years_batch(
+            [profile["incomes"] for profile in valid],
+            [profile["wage_growth"] for profile in valid],
+        )
+        for profile, profile_results in zip(valid, results):
+            profile["results"] = profile_results
+    except Exception:
+        # A profile that fails despite valid inputs fails the whole batch, so find it
+        for profile in valid:
+            try:
+                profile["results"] = calculate_impact_over_years_batch(
+                    [profile["incomes"]], [profile["wage_growth"]]
+                )[0]
+            except Exception as e:
+                profile["error"] = f"Could not score profile: {e}"
+
+    return [format_bulk_result(profile) for profile in parsed]
+
+
+def format_bulk_result(profile: Dict[str, Any]) -> Dict[str, Union[str, int, float, dict]]:
+    """
+    Format a scored profile as one output record.
+    """
+    if "error" in profile:
+        return {"id": profile["id"], "error": profile["error"]}
+
+    with_freeze = profile["results"]["with_freeze"]
+    without_freeze = profile["results"]["without_freeze"]
+    return {
+        "id": profile["id"],
+        "with_freeze": {str(year): value for year, value in with_freeze.items()},
+        "without_freeze": {str(year): value for year, value in without_freeze.items()},
+        "total_impact": sum(without_freeze[year] - with_freeze[year] for year in range(2028, 2030)),
+    }
+
+
+def iter_chunks(
+    lines: Iterable[str], input_format: str, chunk_size: int = BULK_CHUNK_SIZE
+) -> Iterator[Tuple[List[str], Optional[List[str]], int]]:
+    """
+    Lazily split an NDJSON or CSV input into chunks of profile lines.
+
+    Args:
+        lines: Input lines, including the CSV header
+        input_format: "ndjson" or "csv"
+        chunk_size: Profiles per chunk
+
+    Yields:
+        Each chunk's lines, the CSV header and the position of the chunk's first profile
+    """
+    lines = (line.rstrip("\r\n") for line in lines)
+    lines = (line for line in lines if line.strip())
+    header = None
+    if input_format == "csv":
+        header_line = next(lines, None)
+        if header_line is None:
+            return
+        header = next(csv.reader([header_line]))
+
+    start = 0
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk, header, start
+        start += len(chunk)
+
+
+def score_file_lines(
+    lines: Iterable[str], input_format: str, chunk_size: int = BULK_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily score every profile in an NDJSON or CSV input, one chunk at a time.
+
+    Args:
+        lines: Input lines, including the CSV header
+        input_format: "ndjson" or "csv"
+        chunk_size: Profiles per batched simulation
+
+    Yields:
+        One result per input profile, in order
+    """
+    for chunk, header, start in iter_chunks(lines, input_format, chunk_size):
+        yield from score_lines(chunk, input_format, header, start)
@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+
+from .calculator import DEFAULT_REFORM, LONG_RUN_GROWTH, OBR_EARNINGS_GROWTH
+
+
+def normalize_incomes(
+    incomes: List[Dict[str, Union[float, str]]],
+) -> Tuple[Tuple[str, float], ...]:
+    """
+    Merge income items by type, round them to the penny and sort them.
+    """
+    merged_incomes = {}
+    for income_item in incomes:
+        income_type = income_item["type"]
+        merged_incomes[income_type] = merged_incomes.get(income_type, 0) + income_item["amount"]
+
+    rounded_incomes = {
+        income_type: round(amount, 2) for income_type, amount in merged_incomes.items()
+    }
+    return tuple(sorted(rounded_incomes.items()))
+
+
+def normalize_wage_growth(
+    wage_growth: Dict[str, float], end_year: int = 2029
+) -> Tuple[Tuple[str, float], ...]:
+    """
+    Fill in wage growth for every projection year through `end_year` the same way
+    `income_growth_factors` falls back to OBR rates, as sorted (year, growth rate) pairs.
+    """
+    complete_wage_growth = {}
+    for year in range(2026, end_year + 1):
+        year_str = str(year)
+        complete_wage_growth[year_str] = wage_growth.get(
+            year_str, OBR_EARNINGS_GROWTH.get(year_str, LONG_RUN_GROWTH)
+        )
+    return tuple(sorted(complete_wage_growth.items()))
+
+
+def normalize_calculation_request(
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growth: Dict[str, float],
+    reform: str = DEFAULT_REFORM,
+) -> Tuple[Tuple[Tuple[str, float], ...], Tuple[Tuple[str, float], ...], str]:
+    """
+    Build a canonical cache key for a calculation request.
+
+    Incomes are merged by type, rounded to the penny and sorted, and wage growth is filled
+    in for every projection year the same way `build_household` falls back to OBR rates,
+    so requests that produce the same households share a key.
+
+    Args:
+        incomes: List of income items with amount and type
+        wage_growth: Dictionary mapping years to growth rates
+        reform: Canonical spec of the counterfactual reform, from `canonical_reform_spec`
+
+    Returns:
+        Tuple of sorted (income type, amount) pairs, sorted (year, growth rate) pairs and
+        the reform spec
+    """
+    return normalize_incomes(incomes), normalize_wage_growth(wage_growth), reform
+
+
+def normalize_projection_request(
+    people: List[dict],
+    end_year: int,
+    wage_growth: Dict[str, float],
+    reform: str = DEFAULT_REFORM,
+) -> Tuple:
+    """
+    Build a canonical cache key for a projection request.
+
+    Each member's incomes are normalized as in `normalize_calculation_request` and members
+    are sorted, so households listing the same people in a different order share a key.
+
+    Args:
+        people: Household members, each with an age and a list of income items
+        end_year: Last projection year
+        wage_growth: Dictionary mapping years to growth rates
+        reform: Canonical spec of the counterfactual reform, from `canonical_reform_spec`
+
+    Returns:
+        Tuple of sorted (age, normalized incomes) pairs, the end year, sorted (year, growth
+        rate) pairs and the reform spec
+    """
+    members = tuple(
+        sorted((person["age"], normalize_incomes(person["incomes"])) for person in people)
+    )
+    return members, end_year, normalize_wage_growth(wage_growth, end_year), reform
+
+
+class _InFlight:
+    """
+    A computation in progress that concurrent callers for the same key wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with TTL expiry and per-key in-flight deduplication.
+
+    Concurrent callers asking for a key that is already being computed wait for that
+    computation rather than starting their own.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Args:
+            key: Hashable cache key
+            compute: Function producing the value when it isn't cached
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = _InFlight()
+                self._in_flight[key] = in_flight
+                self.misses += 1
+                is_leader = True
+            else:
+                self.deduplicated += 1
+                is_leader = False
+
+        if not is_leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            in_flight.result = compute()
+        except Exception as e:
+            in_flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(key, in_flight.result)
+            return in_flight.result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the cached value for `key`, or None if it isn't cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store `value` for `key`, evicting the least recently used entries beyond the size limit.
+        """
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every cached entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.deduplicated = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Report cache size, configuration and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
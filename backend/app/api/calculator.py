@@ -1,8 +1,34 @@
-from typing import Dict, List, Tuple, Union
+import gc
+import json
+import math
+import os
+import threading
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import pandas as pd
-from policyengine_uk import Microsimulation, Simulation
+
+from .metrics import span
+from .population import (
+    POPULATION_ARTIFACT_PATH,
+    SHARE_POPULATION_DATA,
+    SHARED_POPULATION_DIR,
+    attach_shared_population_data,
+    load_population_artifact,
+    population_artifact_version,
+    save_population_artifact,
+    save_shared_population_data,
+)
+
+# PolicyEngine UK builds its whole parameter tree on import, which takes several seconds,
+# so it's imported on first use rather than when the API starts, as is pandas
+if TYPE_CHECKING:
+    import pandas as pd
+    from policyengine_uk import Simulation
+
+    from .cache import ResultCache
 
 # OBR earnings growth projections (March 2024)
 OBR_EARNINGS_GROWTH = {
@@ -26,25 +52,268 @@ CURRENT_PARAMETERS = {
 }
 
 
-def uprated_parameter_values(base_value: float) -> Dict[str, float]:
-    value_2028 = round(base_value * (1 + OBR_EARNINGS_GROWTH["2028"]))
-    value_2029 = round(value_2028 * (1 + OBR_EARNINGS_GROWTH["2029"]))
+# Assumed CPI, as in get_projected_thresholds, for counterfactuals uprating by prices
+CPI_PROJECTIONS = {
+    "2026": 0.02,
+    "2027": 0.02,
+    "2028": 0.02,
+    "2029": 0.02,
+}
+
+# Growth assumed for either index in years beyond its projections
+LONG_RUN_GROWTH = 0.02
+
+# Indices a counterfactual reform can uprate thresholds by
+UPRATING_INDICES = {
+    "earnings": OBR_EARNINGS_GROWTH,
+    "cpi": CPI_PROJECTIONS,
+}
+
+# PolicyEngine parameter behind each threshold a counterfactual reform can uprate
+THRESHOLD_PARAMETERS = {
+    "personal_allowance": "gov.hmrc.income_tax.allowances.personal_allowance.amount",
+    "basic_rate_limit": "gov.hmrc.income_tax.rates.uk[1].threshold",
+    "additional_rate_threshold": "gov.hmrc.income_tax.rates.uk[2].threshold",
+}
+
+# The freeze was due to end after FREEZE_END_YEAR; with the extension, current law keeps
+# thresholds frozen through CURRENT_LAW_FREEZE_END_YEAR and uprates them with CPI afterwards
+FREEZE_END_YEAR = 2027
+CURRENT_LAW_FREEZE_END_YEAR = 2030
+
+# Years incomes can be projected over; inputs are given for the first
+FIRST_PROJECTION_YEAR = 2025
+LAST_PROJECTION_YEAR = 2035
+
+# The counterfactual the freeze extension is compared against unless a request picks another:
+# the freeze ends as planned and the personal allowance and basic rate limit rise with earnings
+DEFAULT_REFORM_SPEC = {
+    "freeze_end_year": FREEZE_END_YEAR,
+    "uprating": "earnings",
+    "thresholds": ["basic_rate_limit", "personal_allowance"],
+}
+
+# Compiled counterfactual reforms kept per process
+COMPILED_REFORM_CACHE_SIZE = int(os.environ.get("COMPILED_REFORM_CACHE_SIZE", "32"))
+
+
+def canonical_reform_spec(spec: Optional[dict] = None) -> str:
+    """
+    Validate a counterfactual reform spec and serialize it canonically, with defaults filled
+    in and thresholds sorted, so equivalent specs share every cache keyed on it.
+
+    Args:
+        spec: Any of `DEFAULT_REFORM_SPEC`'s keys, or None for the default counterfactual
+
+    Returns:
+        Compact JSON with sorted keys
+
+    Raises:
+        ValueError: If the spec has unknown keys or invalid values
+    """
+    if spec is not None and not isinstance(spec, dict):
+        raise ValueError("reform must be an object")
+    spec = {**DEFAULT_REFORM_SPEC, **(spec or {})}
+    unknown = set(spec) - set(DEFAULT_REFORM_SPEC)
+    if unknown:
+        raise ValueError(f"Unknown reform parameters: {sorted(unknown)}")
+
+    freeze_end_year = spec["freeze_end_year"]
+    if (
+        isinstance(freeze_end_year, bool)
+        or not isinstance(freeze_end_year, int)
+        or not FREEZE_END_YEAR <= freeze_end_year <= CURRENT_LAW_FREEZE_END_YEAR
+    ):
+        raise ValueError(
+            f"freeze_end_year must be from {FREEZE_END_YEAR} to {CURRENT_LAW_FREEZE_END_YEAR}"
+        )
+    if not isinstance(spec["uprating"], str) or spec["uprating"] not in UPRATING_INDICES:
+        raise ValueError(f"uprating must be one of {sorted(UPRATING_INDICES)}")
+    thresholds = spec["thresholds"]
+    if (
+        not isinstance(thresholds, list)
+        or not thresholds
+        or not all(
+            isinstance(threshold, str) and threshold in THRESHOLD_PARAMETERS
+            for threshold in thresholds
+        )
+    ):
+        raise ValueError(f"thresholds must be a non-empty subset of {sorted(THRESHOLD_PARAMETERS)}")
+
+    return json.dumps(
+        {**spec, "thresholds": sorted(set(thresholds))}, sort_keys=True, separators=(",", ":")
+    )
+
+
+DEFAULT_REFORM = canonical_reform_spec()
+
+
+def uprated_parameter_values(
+    base_value: float,
+    freeze_end_year: int = FREEZE_END_YEAR,
+    growth: Dict[str, float] = OBR_EARNINGS_GROWTH,
+) -> Dict[str, float]:
+    """
+    Uprate a threshold by `growth` in each year after the freeze ends through the last
+    projection year, rounding to the pound.
+
+    Returns:
+        Dictionary mapping PolicyEngine period strings to values
+    """
+    values = {}
+    value = base_value
+    for year in range(freeze_end_year + 1, LAST_PROJECTION_YEAR + 1):
+        value = round(value * (1 + growth.get(str(year), LONG_RUN_GROWTH)))
+        values[f"{year}-01-01.{year}-12-31"] = value
+    return values
+
+
+@lru_cache(maxsize=COMPILED_REFORM_CACHE_SIZE)
+def compile_reform(reform: str) -> dict:
+    """
+    Compile a canonical reform spec into PolicyEngine parameter changes, once per process.
+
+    The result is shared between callers, so it must not be modified.
+
+    Args:
+        reform: Spec from `canonical_reform_spec`
+
+    Returns:
+        PolicyEngine reform uprating each of the spec's thresholds
+    """
+    spec = json.loads(reform)
+    growth = UPRATING_INDICES[spec["uprating"]]
     return {
-        "2028-01-01.2028-12-31": value_2028,
-        "2029-01-01.2029-12-31": value_2029,
+        THRESHOLD_PARAMETERS[threshold]: uprated_parameter_values(
+            CURRENT_PARAMETERS[threshold], spec["freeze_end_year"], growth
+        )
+        for threshold in spec["thresholds"]
     }
 
 
 # Counterfactual reform that removes the extended freeze and uprates thresholds.
-NO_FREEZE_REFORM = {
-    "gov.hmrc.income_tax.allowances.personal_allowance.amount": uprated_parameter_values(
-        CURRENT_PARAMETERS["personal_allowance"]
-    ),
-    "gov.hmrc.income_tax.rates.uk[1].threshold": uprated_parameter_values(
-        CURRENT_PARAMETERS["basic_rate_limit"]
-    ),
+NO_FREEZE_REFORM = compile_reform(DEFAULT_REFORM)
+
+# PolicyEngine UK release the fast engine's tables below were taken from. With any other
+# version installed, every household falls back to the full simulation rather than risk
+# results that silently differ from it.
+FAST_ENGINE_POLICYENGINE_UK_VERSION = "2.127.0"
+
+# Parameters the fast engine needs beyond CURRENT_PARAMETERS, frozen through 2030
+PERSONAL_ALLOWANCE_TAPER = {
+    "income_limit": 100_000,
+    "reduction_rate": 0.5,
+}
+
+NATIONAL_INSURANCE_PARAMETERS = {
+    "primary_threshold": 12_570,
+    "upper_earnings_limit": 50_270,
+    "class_1_main_rate": 0.08,
+    "class_1_additional_rate": 0.02,
+    "lower_profits_limit": 12_570,
+    "upper_profits_limit": 50_270,
+    "class_4_main_rate": 0.06,
+    "class_4_additional_rate": 0.02,
+}
+
+# Income tax thresholds PolicyEngine uprates with CPI once the freeze ends, by year. From
+# then on, National Insurance thresholds follow the personal allowance and higher rate
+# threshold in force, whether under current law or a counterfactual.
+POST_FREEZE_THRESHOLDS = {
+    2031: {"personal_allowance": 12_830, "basic_rate_limit": 38_500},
+    2032: {"personal_allowance": 13_090, "basic_rate_limit": 39_300},
+    2033: {"personal_allowance": 13_360, "basic_rate_limit": 40_100},
+    2034: {"personal_allowance": 13_630, "basic_rate_limit": 41_000},
+    2035: {"personal_allowance": 13_910, "basic_rate_limit": 41_900},
+}
+
+# Cumulative uprating PolicyEngine applies when carrying 2025 inputs forward to later years
+FAST_ENGINE_UPRATING = {
+    "employment_income": {
+        2025: 1.0,
+        2026: 1.0339989,
+        2027: 1.058816,
+        2028: 1.0810518,
+        2029: 1.1030685,
+        2030: 1.1295393,
+        2031: 1.1670427,
+        2032: 1.2103387,
+        2033: 1.255604,
+        2034: 1.3029374,
+        2035: 1.3524492,
+    },
+    "self_employment_income": {
+        2025: 1.0,
+        2026: 1.0305968,
+        2027: 1.0688355,
+        2028: 1.107745,
+        2029: 1.146853,
+        2030: 1.1882563,
+        2031: 1.2311522,
+        2032: 1.2755972,
+        2033: 1.3216482,
+        2034: 1.3693618,
+        2035: 1.4187945,
+    },
 }
 
+# Taxes PolicyEngine charges every household regardless of income
+# (TV licence fee plus the expected stamp duty property sale rate)
+FLAT_HOUSEHOLD_TAX = {
+    2025: 174.545,
+    **{year: 180.045 for year in range(2026, 2036)},
+}
+
+# Annual Child Benefit for the eldest child and for each other child
+CHILD_BENEFIT_AMOUNTS = {
+    2025: (1354.60, 897.00),
+    2026: (1406.60, 930.80),
+    2027: (1438.95, 952.21),
+    2028: (1467.73, 971.25),
+    2029: (1497.08, 990.67),
+    2030: (1527.02, 1010.48),
+    2031: (1557.56, 1030.69),
+    2032: (1588.71, 1051.31),
+    2033: (1620.48, 1072.33),
+    2034: (1652.89, 1093.78),
+    2035: (1685.95, 1115.66),
+}
+
+# High Income Child Benefit Charge: a whole percentage of Child Benefit for each 1% of the
+# phase-out band the higher earner's income is into it, rounded down to the pound
+CHILD_BENEFIT_CHARGE = {
+    "phase_out_start": 60_000,
+    "phase_out_end": 80_000,
+}
+
+# Annual Universal Credit amounts, rounded up, that bound any award to a family with
+# children: the couple (25 or over) standard allowance, the higher child element per child
+# and the work allowance without housing costs. The fast engine only takes families whose
+# net earnings above the work allowance, withdrawn at the taper rate, cover the bound.
+UNIVERSAL_CREDIT_BOUNDS = {
+    2025: (7_538, 4_068, 8_208),
+    2026: (8_004, 4_223, 8_520),
+    2027: (8_188, 4_320, 8_716),
+    2028: (8_352, 4_407, 8_891),
+    2029: (8_519, 4_495, 9_069),
+    2030: (8_689, 4_585, 9_250),
+    2031: (8_863, 4_676, 9_435),
+    2032: (9_040, 4_770, 9_624),
+    2033: (9_221, 4_865, 9_816),
+    2034: (9_406, 4_962, 10_012),
+    2035: (9_594, 5_062, 10_213),
+}
+UNIVERSAL_CREDIT_TAPER_RATE = 0.55
+
+# People are adults from this age, in a household's single benefit unit
+ADULT_AGE = 18
+
+# Ages the fast engine supports: working-age adults, below the state pension age in any
+# projection year, and school-age children, who get no free childcare and are too young to
+# be qualifying young people
+FAST_ENGINE_ADULT_AGES = (ADULT_AGE, 66)
+FAST_ENGINE_CHILD_AGES = (5, 16)
+
 VARIABLES = [
     "person_id",
     "household_id",
@@ -63,62 +332,605 @@ VARIABLES = [
     "household_weight",
 ]
 
+# Household-level variables the percentile impact chart and bins need from the population
+POPULATION_VARIABLES = ["household_id", "household_weight", "household_net_income"]
+
+# Population sample behind the percentile impact chart
+POPULATION_DATASET = "hf://policyengine/policyengine-uk-data/enhanced_frs_2022_23.h5"
+POPULATION_SAMPLE_SIZE = 1000
+POPULATION_SEED = 42
+
+# Numbers of weighted percentile bins precomputed from the full population
+PERCENTILE_BIN_COUNTS = (100, 1000)
+
+# Population results against counterfactuals other than the default kept per process; each
+# takes a microsimulation of the whole population to compute
+REFORM_POPULATION_CACHE_SIZE = int(os.environ.get("REFORM_POPULATION_CACHE_SIZE", "4"))
+
 _population_data = None
+_percentile_impact_data = None
+_percentile_bins = None
+
+# Loading state reported by /ready; the lock makes concurrent loads wait for one another
+_population_lock = threading.Lock()
+_population_start_lock = threading.Lock()
+_percentile_impact_lock = threading.Lock()
+_population_status = {"state": "idle", "stage": None, "error": None}
 
 
-# Filter dataframes to selected households
-def filter_to_selected(df, household_selection):
-    return df.set_index("household_id").loc[household_selection].reset_index()
+def get_population_artifact_version() -> str:
+    """
+    Version hash for the population artifact built from this module's settings.
+    """
+    return population_artifact_version(
+        POPULATION_DATASET,
+        POPULATION_VARIABLES,
+        NO_FREEZE_REFORM,
+        POPULATION_SAMPLE_SIZE,
+        POPULATION_SEED,
+        PERCENTILE_BIN_COUNTS,
+    )
+
 
+def calculate_population_variables(reform: Optional[dict]) -> List["pd.DataFrame"]:
+    """
+    Run one microsimulation for the household-level `POPULATION_VARIABLES` in 2028 and 2029,
+    then free it.
 
-def get_population_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    global _population_data
+    Only one microsimulation, with its cache of every intermediate variable, is alive at a
+    time, which keeps peak memory to about half of running both scenarios side by side.
 
-    if _population_data is not None:
-        return _population_data
+    Args:
+        reform: PolicyEngine reform, or None for current law
+
+    Returns:
+        One frame per year with a row for every household
+    """
+    import pandas as pd
+    from policyengine_uk import Microsimulation
+
+    microsimulation = Microsimulation(reform=reform, dataset=POPULATION_DATASET)
+    frames = [
+        pd.DataFrame(
+            {
+                variable: np.asarray(microsimulation.calculate(variable, year, unweighted=True))
+                for variable in POPULATION_VARIABLES
+            }
+        )
+        for year in (2028, 2029)
+    ]
+    del microsimulation
+    gc.collect()
+    return frames
+
+
+def compute_population_data(
+    reform: str = DEFAULT_REFORM,
+    current_law_frames: Optional[Tuple["pd.DataFrame", "pd.DataFrame"]] = None,
+) -> Tuple[
+    Tuple["pd.DataFrame", "pd.DataFrame", "pd.DataFrame", "pd.DataFrame"],
+    Dict[int, Dict[str, np.ndarray]],
+]:
+    """
+    Run the baseline and reform microsimulations, sample households from them, and
+    summarise every household into weighted percentile bins.
+
+    Only the household-level `POPULATION_VARIABLES` are calculated. The bins need every
+    household, but the frames kept afterwards hold just the sample, as float32.
+
+    Args:
+        reform: Canonical spec of the counterfactual baseline
+        current_law_frames: Current-law frames from an earlier run, which don't depend on
+            the counterfactual, to use rather than simulating current law again
 
-    dataset = "hf://policyengine/policyengine-uk-data/enhanced_frs_2022_23.h5"
-    baseline_microsimulation = Microsimulation(reform=NO_FREEZE_REFORM, dataset=dataset)
-    reform_microsimulation = Microsimulation(dataset=dataset)
+    Returns:
+        Baseline and reform dataframes for 2028 and 2029 restricted to the sample, and the
+        full-population percentile bins for each of `PERCENTILE_BIN_COUNTS`
+    """
 
-    baseline_population_df_2028 = baseline_microsimulation.calculate_dataframe(VARIABLES[1:], 2028)
+    # Only the default counterfactual's loading is reported by /ready
+    def set_stage(stage):
+        if reform == DEFAULT_REFORM:
+            _population_status["stage"] = stage
+
+    set_stage("calculating baseline")
+    baseline_population_df_2028, baseline_population_df_2029 = calculate_population_variables(
+        compile_reform(reform)
+    )
     household_weights = baseline_population_df_2028.household_weight.values
     selection_probs = household_weights / household_weights.sum()
 
-    rng = np.random.default_rng(42)
-    selected_households = rng.choice(
-        baseline_population_df_2028.household_id.values,
-        1000,
+    rng = np.random.default_rng(POPULATION_SEED)
+    selected = rng.choice(
+        len(baseline_population_df_2028),
+        POPULATION_SAMPLE_SIZE,
         replace=False,
         p=selection_probs,
     )
-    reform_population_df_2028 = reform_microsimulation.calculate_dataframe(VARIABLES[1:], 2028)
-    baseline_population_df_2029 = baseline_microsimulation.calculate_dataframe(VARIABLES[1:], 2029)
-    reform_population_df_2029 = reform_microsimulation.calculate_dataframe(VARIABLES[1:], 2029)
-
-    _population_data = (
-        filter_to_selected(baseline_population_df_2028, selected_households),
-        filter_to_selected(reform_population_df_2028, selected_households),
-        filter_to_selected(baseline_population_df_2029, selected_households),
-        filter_to_selected(reform_population_df_2029, selected_households),
+
+    set_stage("calculating reform")
+    if current_law_frames is None:
+        current_law_frames = calculate_population_variables(None)
+    reform_population_df_2028, reform_population_df_2029 = current_law_frames
+
+    full_population_data = (
+        baseline_population_df_2028,
+        reform_population_df_2028,
+        baseline_population_df_2029,
+        reform_population_df_2029,
     )
+    set_stage("calculating percentile bins")
+    percentile_bins = {
+        bins: calculate_weighted_percentile_bins(full_population_data, bins)
+        for bins in PERCENTILE_BIN_COUNTS
+    }
+
+    population_data = tuple(
+        df.iloc[selected]
+        .reset_index(drop=True)
+        .astype({"household_weight": np.float32, "household_net_income": np.float32})
+        for df in full_population_data
+    )
+    return population_data, percentile_bins
+
+
+@lru_cache(maxsize=1)
+def get_current_law_population_frames() -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+    """
+    Simulate the whole population under current law once per process, for every
+    counterfactual other than the default to compare against.
+
+    Returns:
+        One frame per year, 2028 and 2029, with a row for every household
+    """
+    return tuple(calculate_population_variables(None))
+
+
+@lru_cache(maxsize=REFORM_POPULATION_CACHE_SIZE)
+def get_reform_population_results(
+    reform: str,
+) -> Tuple[Dict[str, np.ndarray], Dict[int, Dict[str, np.ndarray]]]:
+    """
+    Compute the scatter data and percentile bins against a counterfactual other than the
+    default, on first use.
+
+    Each takes one microsimulation of the counterfactual, as current law is shared. They
+    run under the population lock, so only one microsimulation is alive at a time.
+
+    Args:
+        reform: Canonical spec of the counterfactual baseline
+
+    Returns:
+        Scatter data columns and the percentile bins for each of `PERCENTILE_BIN_COUNTS`
+    """
+    with _population_lock:
+        population_data, percentile_bins = compute_population_data(
+            reform, get_current_law_population_frames()
+        )
+    return calculate_percentile_impact(population_data), percentile_bins
+
+
+def get_population_data() -> Tuple["pd.DataFrame", "pd.DataFrame", "pd.DataFrame", "pd.DataFrame"]:
+    global _population_data, _percentile_impact_data, _percentile_bins
+
+    if _population_data is not None:
+        return _population_data
+
+    with _population_lock:
+        # Another caller may have finished loading while this one waited for the lock
+        if _population_data is not None:
+            return _population_data
+
+        _population_status.update(state="loading", stage="reading artifact", error=None)
+        try:
+            # Prefer a copy shared by another worker, then the precomputed artifact, and only
+            # simulate when neither is available
+            artifact = None
+            if SHARE_POPULATION_DATA:
+                artifact = attach_shared_population_data(
+                    SHARED_POPULATION_DIR, get_population_artifact_version()
+                )
+            if artifact is None:
+                artifact = load_population_artifact(
+                    POPULATION_ARTIFACT_PATH, get_population_artifact_version()
+                )
+            if artifact is not None:
+                _population_data, _percentile_impact_data, _percentile_bins = artifact
+            else:
+                _population_data, _percentile_bins = compute_population_data()
+        except Exception as e:
+            _population_status.update(state="failed", stage=None, error=str(e))
+            raise
+
+        _population_status.update(state="ready", stage=None)
     return _population_data
 
 
+def _load_population_data_in_background():
+    try:
+        get_population_data()
+    except Exception:
+        # The failure is recorded in the population status for /ready to report
+        pass
+
+
+def start_population_loading() -> bool:
+    """
+    Start loading the population data in a background thread unless it is loaded or loading.
+
+    Returns:
+        Whether a new loading thread was started
+    """
+    with _population_start_lock:
+        if _population_data is not None or _population_status["state"] == "loading":
+            return False
+        _population_status.update(state="loading", stage="starting", error=None)
+
+    threading.Thread(
+        target=_load_population_data_in_background, name="population-loader", daemon=True
+    ).start()
+    return True
+
+
+def get_population_status() -> Dict[str, Union[str, None]]:
+    """
+    Report whether the population data is idle, loading, ready or failed, and the loading stage.
+    """
+    return dict(_population_status)
+
+
+def is_population_ready() -> bool:
+    """
+    Check whether the population data has been loaded.
+    """
+    return _population_data is not None
+
+
+def build_population_artifact(path: Path = POPULATION_ARTIFACT_PATH) -> Path:
+    """
+    Compute the population data, scatter data and percentile bins and write them to the
+    artifact file.
+
+    Returns:
+        The path written to
+    """
+    population_data, percentile_bins = compute_population_data()
+    save_population_artifact(
+        path,
+        get_population_artifact_version(),
+        population_data,
+        calculate_percentile_impact(population_data),
+        percentile_bins,
+    )
+    return path
+
+
+def share_population_data(directory: Path = SHARED_POPULATION_DIR) -> Path:
+    """
+    Load the population data, write it to shared memory and switch this process over to the
+    shared copy.
+
+    Run before forking server workers, every worker then maps the same read-only pages, and
+    workers started later attach them instead of loading their own copy.
+
+    Returns:
+        The directory written to
+    """
+    global _population_data, _percentile_impact_data, _percentile_bins
+
+    get_population_data()
+    scatter_data = get_income_percentile_impact_columns()
+    artifact_version = get_population_artifact_version()
+    with _population_lock:
+        save_shared_population_data(
+            directory, artifact_version, _population_data, scatter_data, _percentile_bins
+        )
+        _population_data, _percentile_impact_data, _percentile_bins = attach_shared_population_data(
+            directory, artifact_version
+        )
+    return directory
+
+
+# Inputs PolicyEngine moves to another variable when it builds a simulation
+MOVED_INPUT_VARIABLES = {
+    "capital_gains": "capital_gains_before_response",
+    "employment_income": "employment_income_before_lsr",
+    "employee_pension_contributions": "employee_pension_contributions_reported",
+}
+
+# Single-person households in each simulation template. Situations of single-person
+# households are padded to the smallest bucket that holds them, so a single calculation, a
+# micro-batch or sensitivity sweep and a bulk chunk of 250 profiles over five years each use
+# one template. The cost of a calculation barely grows with the number of households, so
+# padding is nearly free.
+SIMULATION_HOUSEHOLD_BUCKETS = (16, 256, 1280)
+
+# Tax-benefit systems kept per process, one per reform, with current law counting as one.
+# Each takes seconds and up to a few hundred MB to build; every template of a reform shares
+# its system, so current law, the default counterfactual and one other reform are kept
+TAX_BENEFIT_SYSTEM_CACHE_SIZE = int(os.environ.get("TAX_BENEFIT_SYSTEM_CACHE_SIZE", "3"))
+
+
+def situation_households(situation: dict) -> List[List[dict]]:
+    """
+    List each household's members' inputs, in household order.
+
+    A situation without explicit households is one household, as PolicyEngine treats it.
+    Every household must also be one benefit unit, as in every situation built here.
+    """
+    if "households" not in situation:
+        return [list(situation["people"].values())]
+    return [
+        [situation["people"][person_id] for person_id in household["members"]]
+        for household in situation["households"].values()
+    ]
+
+
+def template_bucket(household_count: int) -> int:
+    """
+    The smallest bucket in `SIMULATION_HOUSEHOLD_BUCKETS` holding `household_count`
+    single-person households, or for more than the largest, a multiple of it.
+    """
+    largest = SIMULATION_HOUSEHOLD_BUCKETS[-1]
+    return next(
+        (size for size in SIMULATION_HOUSEHOLD_BUCKETS if size >= household_count),
+        -(-household_count // largest) * largest,
+    )
+
+
+def shape_situation(shape: Tuple[int, ...]) -> dict:
+    """
+    Build a situation without inputs with one household and benefit unit of each size.
+    """
+    situation = {"people": {}, "benunits": {}, "households": {}}
+    for index, size in enumerate(shape):
+        members = [f"person_{len(situation['people']) + member}" for member in range(size)]
+        situation["people"].update({person_id: {} for person_id in members})
+        situation["benunits"][f"benunit_{index}"] = {"members": members}
+        situation["households"][f"household_{index}"] = {"members": members}
+    return situation
+
+
+_simulation_templates = None
+_simulation_templates_lock = threading.Lock()
+_simulation_builds = {"tax_benefit_systems": 0, "templates": 0}
+
+
+def count_simulation_build(kind: str):
+    """
+    Count a build reported by `simulation_build_counts`.
+    """
+    with _simulation_templates_lock:
+        _simulation_builds[kind] += 1
+
+
+class SimulationTemplates:
+    """
+    A reform's tax-benefit system, built once, and the simulation templates built on it.
+
+    Building the tax-benefit system and applying the reform takes far longer than the
+    calculations themselves. Templates only rebuild the entities against the shared system,
+    which takes a fraction of a second. Templates are only ever cloned, never calculated
+    on, so clones share the system read-only too.
+    """
+
+    def __init__(self, reform: Optional[str]):
+        """
+        Args:
+            reform: Canonical counterfactual reform spec, or None for current law
+        """
+        from policyengine_uk import Simulation
+
+        from .cache import ResultCache
+
+        parameter_changes = None if reform is None else compile_reform(reform)
+        smallest = SIMULATION_HOUSEHOLD_BUCKETS[0]
+        self._base = Simulation(
+            situation=shape_situation((1,) * smallest), reform=parameter_changes
+        )
+        self._base.reset_calculations()
+        self.tax_benefit_system = self._base.tax_benefit_system
+        count_simulation_build("tax_benefit_systems")
+        # Building a bucket's template once, however many requests need it at the same time
+        self._templates = ResultCache(max_size=len(SIMULATION_HOUSEHOLD_BUCKETS), ttl=math.inf)
+        self._templates.set(smallest, self._base)
+
+    def template(self, bucket: int) -> "Simulation":
+        """
+        The template with `bucket` single-person households, built on first use.
+        """
+        return self._templates.get_or_compute(bucket, lambda: self._build_template(bucket))
+
+    def _build_template(self, bucket: int) -> "Simulation":
+        count_simulation_build("templates")
+        return self.build((1,) * bucket)
+
+    def build(self, shape: Tuple[int, ...]) -> "Simulation":
+        """
+        Build a simulation without inputs with one household of each size, from a copy of
+        the first template with its entities rebuilt.
+
+        Args:
+            shape: Number of members in each household
+
+        Returns:
+            Simulation equivalent to a new one of `shape_situation(shape)` under the reform
+        """
+        from policyengine_uk.scenarios import universal_credit_july_2025_reform
+
+        simulation = self._base.clone(clone_tax_benefit_system=False)
+        simulation.build_from_situation(shape_situation(shape))
+        # A new simulation applies this to its entities when it's built, setting inputs
+        universal_credit_july_2025_reform.simulation_modifier(simulation)
+        simulation.input_variables = list(self._base.input_variables)
+        simulation.reset_calculations()
+        return simulation
+
+
+def get_simulation_templates(reform: Optional[str]) -> SimulationTemplates:
+    """
+    Get a reform's templates, building its tax-benefit system once per process. Concurrent
+    first callers for a reform wait for one build rather than each starting their own.
+
+    Args:
+        reform: Canonical counterfactual reform spec, or None for current law
+    """
+    global _simulation_templates
+
+    # The cache module imports this one, so it's imported on first use
+    from .cache import ResultCache
+
+    with _simulation_templates_lock:
+        if _simulation_templates is None:
+            _simulation_templates = ResultCache(
+                max_size=TAX_BENEFIT_SYSTEM_CACHE_SIZE, ttl=math.inf
+            )
+    return _simulation_templates.get_or_compute(reform, lambda: SimulationTemplates(reform))
+
+
+def simulation_build_counts() -> Dict[str, int]:
+    """
+    Count the tax-benefit systems and bucket templates this process has built.
+    """
+    with _simulation_templates_lock:
+        return dict(_simulation_builds)
+
+
+def create_simulation(
+    situation: dict, freeze_thresholds: bool = False, reform: str = DEFAULT_REFORM
+) -> "Simulation":
+    """
+    Create a simulation of a situation from a shared template rather than from scratch.
+
+    Situations of single-person households clone the template for their bucket; the
+    simulation's first households are the situation's, in order, and the rest are padding,
+    copies of the last one, whose results should be ignored. Other situations, i.e.
+    projections for families, rebuild the entities for their own households against the
+    reform's shared tax-benefit system.
+
+    Args:
+        situation: OpenFisca-style situation whose people have unperioded numeric inputs
+        freeze_thresholds: Whether to keep the extended freeze (no reform)
+        reform: Canonical spec of the counterfactual used when thresholds aren't frozen
+
+    Returns:
+        Simulation whose households match `Simulation(situation=situation, reform=...)`
+    """
+    with span("simulation_setup"):
+        households = situation_households(situation)
+        templates = get_simulation_templates(None if freeze_thresholds else reform)
+        if all(len(members) == 1 for members in households):
+            bucket = template_bucket(len(households))
+            simulation = templates.template(bucket).clone(clone_tax_benefit_system=False)
+            households = households + households[-1:] * (bucket - len(households))
+        else:
+            simulation = templates.build(tuple(len(members) for members in households))
+
+        people = [person for members in households for person in members]
+        variables = {variable for person in people for variable in person}
+        for variable in sorted(variables):
+            name = MOVED_INPUT_VARIABLES.get(variable, variable)
+            # People without the input get its default, as they would in a new simulation
+            default = simulation.tax_benefit_system.get_variable(name).default_value
+            # Unperioded situation values are inputs for PolicyEngine's default input period
+            simulation.set_input(
+                name,
+                simulation.default_input_period,
+                np.array([person.get(variable, default) for person in people], dtype=float),
+            )
+
+    return simulation
+
+
+def get_tax_benefit_system():
+    """
+    Current law's tax-benefit system, shared with its templates so it isn't built again.
+    """
+    return get_simulation_templates(None).tax_benefit_system
+
+
+def validate_incomes(incomes: List[Dict[str, Union[float, str]]]):
+    """
+    Check that income items can be simulated, so one bad profile needn't fail a batch.
+
+    Raises:
+        ValueError: If an amount isn't finite or a type isn't a numeric personal input
+    """
+    variables = get_tax_benefit_system().variables
+    for income_item in incomes:
+        income_type = income_item["type"]
+        variable = variables.get(MOVED_INPUT_VARIABLES.get(income_type, income_type))
+        if (
+            variable is None
+            or variable.entity.key != "person"
+            or variable.value_type not in (float, int)
+        ):
+            raise ValueError(f"Unknown income type: {income_type}")
+        if not np.isfinite(income_item["amount"]):
+            raise ValueError(f"Income amount must be finite, not {income_item['amount']}")
+
+
+def warm_up_simulation():
+    """
+    Import PolicyEngine UK and build the templates for a single-earner household in both
+    scenarios, so the first calculation doesn't pay for them.
+
+    Run before forking server workers, this lets the workers share the tax-benefit system.
+    """
+    situation = build_households_by_year(
+        [{"amount": 0.0, "type": "employment_income"}], list(range(2025, 2030)), {}
+    )
+    for freeze_thresholds in (True, False):
+        create_simulation(situation, freeze_thresholds)
+
+
 def calculate_household_df(
-    household: dict, year: int, freeze_thresholds: bool = False
-) -> pd.DataFrame:
+    household: dict, year: int, freeze_thresholds: bool = False, reform: str = DEFAULT_REFORM
+) -> "pd.DataFrame":
     """
     From an OpenFisca-style household dictionary, year, and reform policy.
 
     Returns a dataframe with a row for each person and a column for relevant variables.
     """
-    reform = None if freeze_thresholds else NO_FREEZE_REFORM
-    simulation = Simulation(situation=household, reform=reform)
+    simulation = create_simulation(household, freeze_thresholds, reform)
+
+    with span("formula_evaluation"):
+        result = simulation.calculate_dataframe(VARIABLES, year)
+
+    # Drop the template's padding people
+    return result.iloc[: len(household["people"])]
+
+
+def income_growth_factors(years: List[int], wage_growth: Dict[str, float]) -> np.ndarray:
+    """
+    Compound wage growth from 2025 to each year, as a cumulative product of every year's
+    growth rate.
 
-    result = simulation.calculate_dataframe(VARIABLES, year)
+    Args:
+        years: Projection years, none before 2025
+        wage_growth: Dictionary mapping years to growth rates; years without one use the OBR
+            projections, then `LONG_RUN_GROWTH`
 
-    return result
+    Returns:
+        Factor each of `years` multiplies 2025 incomes by
+    """
+    rates = [
+        wage_growth.get(str(year), OBR_EARNINGS_GROWTH.get(str(year), LONG_RUN_GROWTH))
+        for year in range(FIRST_PROJECTION_YEAR + 1, max(years) + 1)
+    ]
+    factors = np.cumprod(np.concatenate([[1.0], 1 + np.asarray(rates, dtype=float)]))
+    return factors[np.asarray(years) - FIRST_PROJECTION_YEAR]
+
+
+def grow_incomes(incomes: List[Dict[str, Union[float, str]]], factor: float) -> Dict[str, float]:
+    """
+    Scale income items by a growth factor, adding up items of the same type.
+    """
+    grown = {}
+    for income_item in incomes:
+        income_type = income_item["type"]
+        grown[income_type] = grown.get(income_type, 0) + income_item["amount"] * factor
+    return grown
 
 
 def build_household(
@@ -135,38 +947,535 @@ def build_household(
     Returns:
         Household dictionary for PolicyEngine
     """
-    # Apply wage growth to income for years after the base year (2025)
-    base_year = 2025
+    # Apply compounding wage growth for each year after the base year (2025)
+    factor = float(income_growth_factors([year], wage_growth)[0])
+    person = {"age": 40, **grow_incomes(incomes, factor)}
+    return {"people": {"person": person}}
 
-    # Create person with multiple income sources
-    person = {"age": 40}
 
-    for income_item in incomes:
-        income_type = income_item["type"]
-        base_amount = income_item["amount"]
+def validate_household(people: List[dict]):
+    """
+    Check that household members make up one family: one or two adults and any children.
 
-        # Apply compounding growth for each year after 2025
-        adjusted_amount = base_amount
-        for growth_year in range(base_year + 1, year + 1):
-            if not wage_growth:  # Empty dict = use OBR projections
-                growth_rate = OBR_EARNINGS_GROWTH.get(str(growth_year), 0.02)
-            else:
-                # Get growth rate from custom values or fall back to OBR
-                obr_rate = OBR_EARNINGS_GROWTH.get(str(growth_year), 0.02)
-                growth_rate = wage_growth.get(str(growth_year), obr_rate)
-            adjusted_amount *= 1 + growth_rate
-
-        # Add or increment the income value in the person dict
-        if income_type in person:
-            person[income_type] += adjusted_amount
+    Args:
+        people: Household members, each with an age and a list of income items
+
+    Raises:
+        ValueError: If the household has no adults or more than two
+    """
+    adults = sum(person["age"] >= ADULT_AGE for person in people)
+    if not 1 <= adults <= 2:
+        raise ValueError(
+            f"A household needs one or two adults (aged {ADULT_AGE} or over), not {adults}"
+        )
+
+
+def build_projection_situation(
+    people: List[dict], years: List[int], wage_growth: Dict[str, float]
+) -> dict:
+    """
+    Create a situation with one household per year, each holding every member with their
+    incomes grown to that year, so a single simulation evaluates every year at once.
+
+    Every household is one benefit unit, so its adults are a couple and the rest of its
+    members are their children.
+
+    Args:
+        people: Household members, each with an age and a list of income items
+        years: The simulation years, in household order
+        wage_growth: Dictionary mapping years to growth rates
+
+    Returns:
+        Situation dictionary for PolicyEngine
+    """
+    situation = {"people": {}, "benunits": {}, "households": {}}
+
+    for year, factor in zip(years, income_growth_factors(years, wage_growth)):
+        members = []
+        for index, person in enumerate(people):
+            person_id = f"person_{year}_{index}"
+            situation["people"][person_id] = {
+                "age": person["age"],
+                **grow_incomes(person["incomes"], float(factor)),
+            }
+            members.append(person_id)
+        # Explicit groups stop PolicyEngine putting every person in one default household
+        situation["benunits"][f"benunit_{year}"] = {"members": members}
+        situation["households"][f"household_{year}"] = {"members": members}
+
+    return situation
+
+
+def build_households_by_year(
+    incomes: List[Dict[str, Union[float, str]]], years: List[int], wage_growth: Dict[str, float]
+) -> dict:
+    """
+    Create a multi-household situation with one `build_household` person per year.
+
+    Args:
+        incomes: List of income items with amount and type
+        years: The simulation years, in household order
+        wage_growth: Dictionary mapping years to growth rates
+
+    Returns:
+        Situation dictionary for PolicyEngine
+    """
+    return build_projection_situation([{"age": 40, "incomes": incomes}], years, wage_growth)
+
+
+def year_result_key(
+    people: List[dict], year: int, freeze_thresholds: bool, reform: str = DEFAULT_REFORM
+) -> Tuple:
+    """
+    Key a year's net income on everything that determines it: the year, the household
+    members' uprated inputs and the scenario, which is current law or a counterfactual reform.
+    """
+    return (
+        year,
+        tuple(tuple(sorted(person.items())) for person in people),
+        None if freeze_thresholds else reform,
+    )
+
+
+def calculate_net_income_by_year(
+    situation: dict,
+    years: List[int],
+    freeze_thresholds: bool = False,
+    year_results: Optional["ResultCache"] = None,
+    reform: str = DEFAULT_REFORM,
+) -> Dict[int, float]:
+    """
+    Calculate each year's household net income from a `build_projection_situation` situation.
+
+    With `year_results`, years whose household is already stored aren't calculated, so a
+    change to one year's wage growth only recalculates the years it affects. The simulation
+    still holds every year's household, so its template is shared with full calculations.
+
+    Args:
+        situation: Situation from `build_projection_situation`
+        years: The simulation years, in household order
+        freeze_thresholds: Whether to keep the extended freeze (no reform)
+        year_results: Store of net income by `year_result_key`, read and updated
+        reform: Canonical spec of the counterfactual used when thresholds aren't frozen
+
+    Returns:
+        Dictionary mapping each year to the net income of that year's household
+    """
+    keys = [
+        year_result_key(
+            [situation["people"][person_id] for person_id in household["members"]],
+            year,
+            freeze_thresholds,
+            reform,
+        )
+        for household, year in zip(situation["households"].values(), years)
+    ]
+
+    results = {}
+    missing = []
+    for index, (year, key) in enumerate(zip(years, keys)):
+        stored = year_results.get(key) if year_results is not None else None
+        if stored is None:
+            missing.append(index)
         else:
-            person[income_type] = adjusted_amount
+            results[year] = stored
 
-    return {"people": {"person": person}}
+    if missing:
+        simulation = create_simulation(situation, freeze_thresholds, reform)
+        with span("formula_evaluation"):
+            for index in missing:
+                household_net_income = simulation.calculate("household_net_income", years[index])
+                results[years[index]] = float(household_net_income[index])
+                if year_results is not None:
+                    year_results.set(keys[index], results[years[index]])
+
+    return {year: results[year] for year in years}
+
+
+def current_law_thresholds(year: int) -> Dict[str, float]:
+    """
+    Income tax thresholds under current law in a year.
+    """
+    thresholds = {threshold: CURRENT_PARAMETERS[threshold] for threshold in THRESHOLD_PARAMETERS}
+    thresholds.update(POST_FREEZE_THRESHOLDS.get(year, {}))
+    return thresholds
+
+
+def national_insurance_thresholds(year: int, thresholds: Dict[str, float]) -> Dict[str, float]:
+    """
+    National Insurance thresholds in a year, given its income tax thresholds.
+
+    Class 1 thresholds are weekly amounts, rounded to the penny, over 52 weeks.
+    """
+    if year <= CURRENT_LAW_FREEZE_END_YEAR:
+        return {
+            threshold: NATIONAL_INSURANCE_PARAMETERS[threshold]
+            for threshold in (
+                "primary_threshold",
+                "upper_earnings_limit",
+                "lower_profits_limit",
+                "upper_profits_limit",
+            )
+        }
+    lower = thresholds["personal_allowance"]
+    upper = thresholds["personal_allowance"] + thresholds["basic_rate_limit"]
+    return {
+        "primary_threshold": round(lower / 52, 2) * 52,
+        "upper_earnings_limit": round(upper / 52, 2) * 52,
+        "lower_profits_limit": lower,
+        "upper_profits_limit": upper,
+    }
+
+
+@lru_cache(maxsize=COMPILED_REFORM_CACHE_SIZE)
+def fast_engine_thresholds(
+    years: Tuple[int, ...], freeze_thresholds: bool, reform: str
+) -> Dict[str, np.ndarray]:
+    """
+    Thresholds the fast engine applies in each year of a horizon, once per process.
+
+    Current law applies unless the counterfactual reform uprates an income tax threshold in
+    a year, which also moves National Insurance thresholds after the freeze.
+
+    Returns:
+        Dictionary mapping each threshold to an array of its value in each of `years`
+    """
+    thresholds = [current_law_thresholds(year) for year in years]
+    if not freeze_thresholds:
+        parameter_changes = compile_reform(reform)
+        for year, year_thresholds in zip(years, thresholds):
+            period = f"{year}-01-01.{year}-12-31"
+            for threshold, parameter in THRESHOLD_PARAMETERS.items():
+                year_thresholds[threshold] = parameter_changes.get(parameter, {}).get(
+                    period, year_thresholds[threshold]
+                )
+    for year, year_thresholds in zip(years, thresholds):
+        year_thresholds.update(national_insurance_thresholds(year, year_thresholds))
+    return {
+        threshold: np.array([year_thresholds[threshold] for year_thresholds in thresholds])
+        for threshold in thresholds[0]
+    }
+
+
+@lru_cache(maxsize=1)
+def fast_engine_matches_policyengine() -> bool:
+    """
+    Check that the installed PolicyEngine UK is the release the fast engine's tables were
+    taken from.
+    """
+    try:
+        return version("policyengine-uk") == FAST_ENGINE_POLICYENGINE_UK_VERSION
+    except PackageNotFoundError:
+        return False
+
+
+def calculate_net_income_fast_by_year(
+    people: List[dict],
+    years: List[int],
+    growth: np.ndarray,
+    freeze_thresholds: bool = False,
+    reform: str = DEFAULT_REFORM,
+) -> Optional[np.ndarray]:
+    """
+    Calculate a household's net income in every year at once with the analytic fast engine.
+
+    Mirrors PolicyEngine for the households it supports: one or two working-age adults, each
+    with either employment or self-employment income (both bring in the National Insurance
+    annual maximum), and any school-age children. Each adult's income must reach the
+    personal allowance: the frozen one for a single adult, so no benefits are payable, and
+    the scenario's for a couple, so neither can transfer allowance to the other. Families
+    with children must earn enough that no Universal Credit is payable, leaving Child
+    Benefit less the High Income Child Benefit Charge.
+
+    Inputs are grown to each year, then uprated from 2025 as the simulation would, and every
+    year and adult is evaluated together as arrays, so the cost barely grows with the
+    horizon.
+
+    Args:
+        people: Household members, each an age and unperioded inputs as in `build_household`
+        years: Projection years
+        growth: Factor to multiply inputs by in each year
+        freeze_thresholds: Whether to keep the extended freeze (no reform)
+        reform: Canonical spec of the counterfactual used when thresholds aren't frozen
+
+    Returns:
+        Household net income in each year, or None if the fast engine doesn't support the
+        household in every year or the installed PolicyEngine UK
+    """
+    if not fast_engine_matches_policyengine():
+        return None
+    if not all(year in FLAT_HOUSEHOLD_TAX for year in years):
+        return None
+
+    adults = []
+    children = 0
+    for person in people:
+        age = person.get("age")
+        inputs = {variable: value for variable, value in person.items() if variable != "age"}
+        if age is None:
+            return None
+        if FAST_ENGINE_CHILD_AGES[0] <= age < FAST_ENGINE_CHILD_AGES[1] and not any(
+            inputs.values()
+        ):
+            children += 1
+        elif (
+            FAST_ENGINE_ADULT_AGES[0] <= age < FAST_ENGINE_ADULT_AGES[1]
+            and len(inputs) == 1
+            and set(inputs).issubset(FAST_ENGINE_UPRATING)
+        ):
+            adults.append(inputs)
+        else:
+            return None
+    if not 1 <= len(adults) <= 2:
+        return None
+
+    # Arrays are shaped (years, adults)
+    growth = np.asarray(growth, dtype=float)[:, np.newaxis]
+    earnings = {
+        income_type: growth
+        * np.array([uprating[year] for year in years])[:, np.newaxis]
+        * np.array([adult.get(income_type, 0.0) for adult in adults])
+        for income_type, uprating in FAST_ENGINE_UPRATING.items()
+    }
+    total_income = sum(earnings.values())
+
+    thresholds = {
+        threshold: values[:, np.newaxis]
+        for threshold, values in fast_engine_thresholds(
+            tuple(years), freeze_thresholds, reform
+        ).items()
+    }
+    if len(adults) == 1:
+        minimum_income = CURRENT_PARAMETERS["personal_allowance"]
+    else:
+        minimum_income = thresholds["personal_allowance"]
+    if np.any(total_income < minimum_income):
+        return None
+
+    # Personal allowance is withdrawn in whole pounds above the income limit
+    excess_income = np.maximum(total_income - PERSONAL_ALLOWANCE_TAPER["income_limit"], 0)
+    reduction = np.floor(excess_income * PERSONAL_ALLOWANCE_TAPER["reduction_rate"])
+    personal_allowance = np.maximum(thresholds["personal_allowance"] - reduction, 0)
+
+    # The additional rate applies to taxable income above its own threshold
+    basic_rate_limit = thresholds["basic_rate_limit"]
+    additional_rate_threshold = thresholds["additional_rate_threshold"]
+    taxable_income = np.maximum(total_income - personal_allowance, 0)
+    income_tax = (
+        np.minimum(taxable_income, basic_rate_limit) * CURRENT_PARAMETERS["basic_rate"]
+        + np.maximum(np.minimum(taxable_income, additional_rate_threshold) - basic_rate_limit, 0)
+        * CURRENT_PARAMETERS["higher_rate"]
+        + np.maximum(taxable_income - additional_rate_threshold, 0)
+        * CURRENT_PARAMETERS["additional_rate"]
+    )
+
+    ni = NATIONAL_INSURANCE_PARAMETERS
+    employment_income = earnings["employment_income"]
+    upper_earnings_limit = thresholds["upper_earnings_limit"]
+    class_1 = (
+        np.maximum(
+            np.minimum(employment_income, upper_earnings_limit) - thresholds["primary_threshold"],
+            0,
+        )
+        * ni["class_1_main_rate"]
+        + np.maximum(employment_income - upper_earnings_limit, 0) * ni["class_1_additional_rate"]
+    )
+    self_employment_income = earnings["self_employment_income"]
+    upper_profits_limit = thresholds["upper_profits_limit"]
+    class_4 = (
+        np.maximum(
+            np.minimum(self_employment_income, upper_profits_limit)
+            - thresholds["lower_profits_limit"],
+            0,
+        )
+        * ni["class_4_main_rate"]
+        + np.maximum(self_employment_income - upper_profits_limit, 0)
+        * ni["class_4_additional_rate"]
+    )
+
+    net_earnings = (total_income - income_tax - class_1 - class_4).sum(axis=1)
+
+    child_benefit = np.zeros(len(years))
+    child_benefit_charge = np.zeros(len(years))
+    if children:
+        standard_allowance, child_element, work_allowance = (
+            np.array([UNIVERSAL_CREDIT_BOUNDS[year][index] for year in years]) for index in range(3)
+        )
+        earnings_deduction = UNIVERSAL_CREDIT_TAPER_RATE * np.maximum(
+            net_earnings - work_allowance, 0
+        )
+        if np.any(earnings_deduction < standard_allowance + children * child_element):
+            return None
+
+        child_benefit = np.array(
+            [
+                CHILD_BENEFIT_AMOUNTS[year][0] + (children - 1) * CHILD_BENEFIT_AMOUNTS[year][1]
+                for year in years
+            ]
+        )
+        # Charged on the higher earner, with amounts rounded down to the pound and the
+        # percentage rounded down to a whole number
+        charge = CHILD_BENEFIT_CHARGE
+        percentage = np.floor(
+            np.minimum(
+                np.maximum(total_income.max(axis=1) - charge["phase_out_start"], 0)
+                * 100
+                / (charge["phase_out_end"] - charge["phase_out_start"]),
+                100,
+            )
+        )
+        child_benefit_charge = np.floor(
+            np.round(percentage / 100 * np.floor(np.round(child_benefit, 2)), 2)
+        )
+
+    flat_household_tax = np.array([FLAT_HOUSEHOLD_TAX[year] for year in years])
+    return net_earnings + child_benefit - child_benefit_charge - flat_household_tax
+
+
+def supports_fast_engine(household: dict, year: int, reform: str = DEFAULT_REFORM) -> bool:
+    """
+    Check whether the fast engine can calculate a household exactly in a year, under both
+    current law and the counterfactual reform.
+
+    Args:
+        household: Household dictionary whose people have an age and unperioded inputs, as
+            from `build_household`
+    """
+    people = list(household["people"].values())
+    return all(
+        calculate_net_income_fast_by_year(people, [year], np.ones(1), freeze_thresholds, reform)
+        is not None
+        for freeze_thresholds in (True, False)
+    )
+
+
+def calculate_net_income_fast(
+    household: dict, year: int, freeze_thresholds: bool = False, reform: str = DEFAULT_REFORM
+) -> float:
+    """
+    Calculate household net income analytically for a household the fast engine supports.
+
+    Raises:
+        ValueError: If the fast engine doesn't support the household
+    """
+    net_income = calculate_net_income_fast_by_year(
+        list(household["people"].values()), [year], np.ones(1), freeze_thresholds, reform
+    )
+    if net_income is None:
+        raise ValueError("The fast engine doesn't support this household")
+    return float(net_income[0])
+
+
+def calculate_projection_fast(
+    people: List[dict],
+    years: List[int],
+    wage_growth: Dict[str, float],
+    reform: str = DEFAULT_REFORM,
+) -> Optional[Dict[str, Dict[int, float]]]:
+    """
+    Calculate a projection with the analytic fast engine, if it supports the household in
+    every year.
+
+    Args:
+        people: Household members, each with an age and a list of income items
+        years: Projection years
+        wage_growth: Dictionary mapping years to growth rates
+        reform: Canonical spec of the counterfactual the freeze extension is compared against
+
+    Returns:
+        Dictionary with results for both policy scenarios, or None if unsupported
+    """
+    members = [{"age": person["age"], **grow_incomes(person["incomes"], 1.0)} for person in people]
+    growth = income_growth_factors(years, wage_growth)
+
+    results = {}
+    for scenario, freeze_thresholds in (("with_freeze", True), ("without_freeze", False)):
+        net_income = calculate_net_income_fast_by_year(
+            members, years, growth, freeze_thresholds, reform
+        )
+        if net_income is None:
+            return None
+        results[scenario] = dict(zip(years, net_income.tolist()))
+    return results
+
+
+def calculate_impact_fast(
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growth: Dict[str, float],
+    reform: str = DEFAULT_REFORM,
+) -> Optional[Dict[str, Dict[int, float]]]:
+    """
+    Calculate the impact with the analytic fast engine, if it supports every year's household.
+
+    Returns:
+        Dictionary with results for both policy scenarios, or None if unsupported
+    """
+    return calculate_projection_fast(
+        [{"age": 40, "incomes": incomes}], list(range(2025, 2030)), wage_growth, reform
+    )
+
+
+def calculate_projection(
+    people: List[dict],
+    years: List[int],
+    wage_growth: Dict[str, float],
+    fast: bool = False,
+    year_results: Optional["ResultCache"] = None,
+    reform: str = DEFAULT_REFORM,
+) -> Dict[str, Dict[int, float]]:
+    """
+    Project a household's net income over several years with the freeze extension and under
+    the counterfactual.
+
+    The fast engine evaluates every year at once as arrays. Otherwise each year's household
+    is its own entity in one simulation per scenario; PolicyEngine still runs its formulas
+    once per year, so that cost grows with the horizon.
+
+    Args:
+        people: Household members, each with an age and a list of income items
+        years: Projection years, from 2025 to `LAST_PROJECTION_YEAR`
+        wage_growth: Dictionary of wage growth rates by year
+        fast: Use the analytic fast engine when it supports the household in every year
+        year_results: Store of per-year net incomes to reuse and add to
+        reform: Canonical spec of the counterfactual the freeze extension is compared against
+
+    Returns:
+        Dictionary with results for both policy scenarios
+
+    Raises:
+        ValueError: If the household isn't one family or a year is outside the projection
+    """
+    validate_household(people)
+    if not all(FIRST_PROJECTION_YEAR <= year <= LAST_PROJECTION_YEAR for year in years):
+        raise ValueError(f"Years must be from {FIRST_PROJECTION_YEAR} to {LAST_PROJECTION_YEAR}")
+
+    if fast:
+        fast_results = calculate_projection_fast(people, years, wage_growth, reform)
+        if fast_results is not None:
+            return fast_results
+
+    with span("build_household"):
+        situation = build_projection_situation(people, years, wage_growth)
+
+    # Calculate with freeze extension
+    with_freeze_results = calculate_net_income_by_year(
+        situation, years, freeze_thresholds=True, year_results=year_results
+    )
+
+    # Calculate without freeze extension (status quo - thresholds would be uprated)
+    without_freeze_results = calculate_net_income_by_year(
+        situation, years, freeze_thresholds=False, year_results=year_results, reform=reform
+    )
+
+    return {"with_freeze": with_freeze_results, "without_freeze": without_freeze_results}
 
 
 def calculate_impact_over_years(
-    incomes: List[Dict[str, Union[float, str]]], wage_growth: Dict[str, float]
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growth: Dict[str, float],
+    fast: bool = False,
+    year_results: Optional["ResultCache"] = None,
+    reform: str = DEFAULT_REFORM,
 ) -> Dict[str, Dict[int, float]]:
     """
     Calculate the impact of extending the income tax threshold freeze to 2028/29 and 2029/30.
@@ -174,116 +1483,416 @@ def calculate_impact_over_years(
     Args:
         incomes: List of income items with amount and type
         wage_growth: Dictionary of wage growth rates by year
+        fast: Use the analytic fast engine when every year's household supports it
+        year_results: Store of per-year net incomes to reuse and add to, so only years whose
+            uprated incomes changed since an earlier request are simulated
+        reform: Canonical spec of the counterfactual the freeze extension is compared against
 
     Returns:
         Dictionary with results for both policy scenarios
     """
-    with_freeze_results = {}
-    without_freeze_results = {}
+    # A single 40-year-old, for years 2025 through 2029
+    return calculate_projection(
+        [{"age": 40, "incomes": incomes}],
+        list(range(2025, 2030)),
+        wage_growth,
+        fast=fast,
+        year_results=year_results,
+        reform=reform,
+    )
 
-    # Only calculate for years 2025 through 2029
-    for year in range(2025, 2030):
-        # Create household for this year
-        household = build_household(incomes, year, wage_growth)
 
-        # Calculate with freeze extension
-        with_freeze_df = calculate_household_df(household, year, freeze_thresholds=True)
-        with_freeze_results[year] = float(with_freeze_df["household_net_income"].iloc[0])
+def build_single_person_situation(people: List[dict]) -> dict:
+    """
+    Create a situation with one single-person household for each person's inputs, in order.
 
-        # Calculate without freeze extension (status quo - thresholds would be uprated)
-        without_freeze_df = calculate_household_df(household, year, freeze_thresholds=False)
-        without_freeze_results[year] = float(without_freeze_df["household_net_income"].iloc[0])
+    Args:
+        people: Each person's unperioded inputs
 
-    return {"with_freeze": with_freeze_results, "without_freeze": without_freeze_results}
+    Returns:
+        Situation dictionary for PolicyEngine
+    """
+    situation = {"people": {}, "benunits": {}, "households": {}}
+    for index, person in enumerate(people):
+        person_id = f"person_{index}"
+        situation["people"][person_id] = person
+        situation["benunits"][f"benunit_{index}"] = {"members": [person_id]}
+        situation["households"][f"household_{index}"] = {"members": [person_id]}
+    return situation
+
+
+def build_households_batch(
+    income_lists: List[List[Dict[str, Union[float, str]]]],
+    years: List[int],
+    wage_growths: List[Dict[str, float]],
+) -> dict:
+    """
+    Create a situation with one single-person household per income profile and year.
+
+    Households are ordered by profile, then by year, so profile `i` in year `years[j]` is
+    household `i * len(years) + j`.
+
+    Args:
+        income_lists: Income items for each profile
+        years: The simulation years
+        wage_growths: Wage growth rates for each profile
+
+    Returns:
+        Situation dictionary for PolicyEngine
+    """
+    return build_single_person_situation(
+        [
+            build_household(incomes, year, wage_growth)["people"]["person"]
+            for incomes, wage_growth in zip(income_lists, wage_growths)
+            for year in years
+        ]
+    )
+
+
+def calculate_impact_over_years_batch(
+    income_lists: List[List[Dict[str, Union[float, str]]]],
+    wage_growths: List[Dict[str, float]],
+    reform: str = DEFAULT_REFORM,
+) -> List[Dict[str, Dict[int, float]]]:
+    """
+    Calculate `calculate_impact_over_years` for many income profiles at once.
+
+    Every profile and year is a household in one simulation per scenario, so the number of
+    simulations doesn't grow with the number of profiles.
+
+    Args:
+        income_lists: Income items for each profile
+        wage_growths: Wage growth rates for each profile
+        reform: Canonical spec of the counterfactual shared by every profile
+
+    Returns:
+        Results for each profile, in order, with the same shape as `calculate_impact_over_years`
+    """
+    years = list(range(2025, 2030))
+    results = [{"with_freeze": {}, "without_freeze": {}} for _ in income_lists]
+    if not income_lists:
+        return results
+
+    with span("build_household"):
+        situation = build_households_batch(income_lists, years, wage_growths)
+
+    for scenario, freeze_thresholds in (("with_freeze", True), ("without_freeze", False)):
+        simulation = create_simulation(situation, freeze_thresholds, reform)
+        with span("formula_evaluation"):
+            for year_index, year in enumerate(years):
+                household_net_income = simulation.calculate("household_net_income", year)
+                year_net_income = household_net_income[
+                    year_index : len(income_lists) * len(years) : len(years)
+                ]
+                for profile_results, net_income in zip(results, year_net_income):
+                    profile_results[scenario][year] = float(net_income)
+
+    return results
+
+
+def calculate_sensitivity(
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growths: List[Dict[str, float]],
+    year_results: Optional["ResultCache"] = None,
+    reform: str = DEFAULT_REFORM,
+) -> List[Dict[str, Dict[int, float]]]:
+    """
+    Calculate `calculate_impact_over_years` for one income profile under many wage growth
+    scenarios at once.
+
+    Scenarios share every household whose uprated incomes are the same, e.g. every 2025
+    household and every year before two scenarios' growth rates differ. Each distinct
+    household is simulated once, in one simulation per policy scenario, so the cost grows
+    with the number of distinct households rather than the number of scenarios.
 
+    Args:
+        incomes: List of income items with amount and type
+        wage_growths: Wage growth rates for each scenario
+        year_results: Store of per-year net incomes to reuse and add to
+        reform: Canonical spec of the counterfactual the freeze extension is compared against
 
-def get_income_percentile_impact_data() -> List[Dict[str, Union[float, int]]]:
+    Returns:
+        Results for each wage growth scenario, in order, with the same shape as
+        `calculate_impact_over_years`
+    """
+    years = list(range(2025, 2030))
+
+    # Distinct (year, person) households, and each scenario's household for each year
+    people = []
+    household_years = []
+    household_indices = {}
+    scenario_households = []
+    with span("build_household"):
+        for wage_growth in wage_growths:
+            row = []
+            for year in years:
+                person = build_household(incomes, year, wage_growth)["people"]["person"]
+                key = (year, tuple(sorted(person.items())))
+                if key not in household_indices:
+                    household_indices[key] = len(people)
+                    people.append(person)
+                    household_years.append(year)
+                row.append(household_indices[key])
+            scenario_households.append(row)
+
+        # Padded to a template bucket like a batch, so sweeps of most sizes share a template
+        situation = build_single_person_situation(people)
+
+    results = [{"with_freeze": {}, "without_freeze": {}} for _ in wage_growths]
+    for scenario, freeze_thresholds in (("with_freeze", True), ("without_freeze", False)):
+        keys = [
+            year_result_key([person], year, freeze_thresholds, reform)
+            for person, year in zip(people, household_years)
+        ]
+        net_income = [year_results.get(key) if year_results is not None else None for key in keys]
+
+        # Each year's formulas run once for every household in the simulation, so only the
+        # years with an uncached household are calculated
+        missing_years = sorted(
+            {year for year, value in zip(household_years, net_income) if value is None}
+        )
+        if missing_years:
+            simulation = create_simulation(situation, freeze_thresholds, reform)
+            with span("formula_evaluation"):
+                for year in missing_years:
+                    household_net_income = simulation.calculate("household_net_income", year)
+                    for index, household_year in enumerate(household_years):
+                        if household_year == year and net_income[index] is None:
+                            net_income[index] = float(household_net_income[index])
+                            if year_results is not None:
+                                year_results.set(keys[index], net_income[index])
+
+        for scenario_results, row in zip(results, scenario_households):
+            for year, index in zip(years, row):
+                scenario_results[scenario][year] = net_income[index]
+
+    return results
+
+
+def get_income_percentile_impact_columns(reform: str = DEFAULT_REFORM) -> Dict[str, np.ndarray]:
+    """
+    Get the scatter plot data as one array per field, computing it on first use.
+
+    Args:
+        reform: Canonical spec of the counterfactual baseline
+
+    Returns:
+        Dictionary mapping each scatter field to an array with one value per household
+    """
+    global _percentile_impact_data
+
+    if reform != DEFAULT_REFORM:
+        return get_reform_population_results(reform)[0]
+
+    population_data = get_population_data()
+    if _percentile_impact_data is None:
+        with _percentile_impact_lock:
+            # Another caller may have calculated it while this one waited for the lock
+            if _percentile_impact_data is None:
+                _percentile_impact_data = calculate_percentile_impact(population_data)
+    return _percentile_impact_data
+
+
+def get_income_percentile_impact_data(
+    reform: str = DEFAULT_REFORM,
+) -> List[Dict[str, Union[float, int]]]:
     """
     Generate data for a scatter plot showing the percentage change in combined net income
     across income percentiles due to the threshold freeze extension.
 
+    Args:
+        reform: Canonical spec of the counterfactual baseline
+
     Returns:
         List of dictionaries with income percentile and percentage change in net income
     """
+    columns = get_income_percentile_impact_columns(reform)
+    fields = list(columns)
+    return [
+        dict(zip(fields, values)) for values in zip(*(columns[field].tolist() for field in fields))
+    ]
+
+
+def calculate_household_impact(
+    population_data: Tuple["pd.DataFrame", "pd.DataFrame", "pd.DataFrame", "pd.DataFrame"],
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate each household's loss from the freeze extension over 2028 and 2029.
+
+    Args:
+        population_data: Baseline and reform dataframes for 2028 and 2029
+
+    Returns:
+        Dictionary of 2028 net income, weight, absolute difference (£) and percentage change
+        (as decimal) arrays, restricted to households where every value is finite
+    """
     (
         baseline_population_df_2028,
         reform_population_df_2028,
         baseline_population_df_2029,
         reform_population_df_2029,
-    ) = get_population_data()
+    ) = population_data
 
-    # First, calculate the impact for each household in 2028 and 2029
-    baseline_income_2028 = baseline_population_df_2028.household_net_income.values
-    baseline_income_2029 = baseline_population_df_2029.household_net_income.values
-    baseline_combined_income = baseline_income_2028 + baseline_income_2029
+    # Population frames may be stored as float32, so calculate in float64
+    def net_income_of(df):
+        return df.household_net_income.values.astype(float)
 
-    reform_income_2028 = reform_population_df_2028.household_net_income.values
-    reform_income_2029 = reform_population_df_2029.household_net_income.values
-    reform_combined_income = reform_income_2028 + reform_income_2029
+    # First, calculate the impact for each household in 2028 and 2029
+    baseline_combined_income = net_income_of(baseline_population_df_2028) + net_income_of(
+        baseline_population_df_2029
+    )
+    reform_combined_income = net_income_of(reform_population_df_2028) + net_income_of(
+        reform_population_df_2029
+    )
 
-    # Calculate the absolute difference in combined income (£)
+    # Absolute (£) and percentage (as decimal) change in combined income, clipped at 0
     absolute_difference = baseline_combined_income - reform_combined_income
-
-    # Calculate the percentage change in combined income (as decimal, not %)
-    income_difference = baseline_combined_income - reform_combined_income
-    percentage_change = income_difference / baseline_combined_income
-
-    # Handle NaN, Infinity values, and clip at 0
-    absolute_difference = pd.Series(absolute_difference).replace([np.inf, -np.inf], np.nan)
-    absolute_difference = np.maximum(absolute_difference, 0)  # Clip at 0
-
-    percentage_change = pd.Series(percentage_change).replace([np.inf, -np.inf], np.nan)
-    percentage_change = np.maximum(percentage_change, 0)  # Clip at 0
-
-    # Create a DataFrame with the necessary data
-    impact_df = pd.DataFrame(
-        {
-            "household_id": baseline_population_df_2028.household_id,
-            "net_income": baseline_population_df_2028.household_net_income,
-            "percentage_change": percentage_change.values,
-            "absolute_difference": absolute_difference.values,
-            "household_weight": baseline_population_df_2028.household_weight,
-        }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage_change = absolute_difference / baseline_combined_income
+    absolute_difference = np.maximum(absolute_difference, 0)
+    percentage_change = np.maximum(percentage_change, 0)
+
+    # Keep households where every value is finite
+    net_income = net_income_of(baseline_population_df_2028)
+    household_weight = baseline_population_df_2028.household_weight.values.astype(float)
+    valid = (
+        np.isfinite(absolute_difference)
+        & np.isfinite(percentage_change)
+        & np.isfinite(net_income)
+        & np.isfinite(household_weight)
     )
 
-    # Drop rows with NaN values
-    impact_df = impact_df.dropna()
+    return {
+        "net_income": net_income[valid].astype(float),
+        "household_weight": household_weight[valid].astype(float),
+        "absolute_difference": absolute_difference[valid].astype(float),
+        "percentage_change": percentage_change[valid].astype(float),
+    }
 
-    # Calculate percentiles based on household net income, as suggested
-    impact_df["percentile"] = impact_df.net_income.rank(pct=True) * 100
 
-    # Convert to list of dictionaries for the API response
-    scatter_data = []
-    for _, row in impact_df.iterrows():
-        try:
-            # Ensure all values are valid for JSON serialization
-            percentile = float(row["percentile"])
-            percentage_change = float(row["percentage_change"]) * 100
-            absolute_difference = float(row["absolute_difference"])
-
-            # Check for NaN or infinity
-            if (
-                np.isnan(percentile)
-                or np.isinf(percentile)
-                or np.isnan(percentage_change)
-                or np.isinf(percentage_change)
-                or np.isnan(absolute_difference)
-                or np.isinf(absolute_difference)
-            ):
-                continue
-
-            scatter_data.append(
-                {
-                    "percentile": percentile,
-                    "percentage_change": percentage_change,  # Convert to percentage
-                    "absolute_difference": absolute_difference,
-                }
-            )
-        except (ValueError, TypeError):
-            # Skip any rows that can't be properly converted
-            continue
+def calculate_percentile_impact(
+    population_data: Tuple["pd.DataFrame", "pd.DataFrame", "pd.DataFrame", "pd.DataFrame"],
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate the scatter plot data from baseline and reform population dataframes.
+
+    Args:
+        population_data: Baseline and reform dataframes for 2028 and 2029
+
+    Returns:
+        Dictionary of percentile, percentage change (%) and absolute difference (£) arrays,
+        with households that have any non-finite value left out
+    """
+    import pandas as pd
+
+    impact = calculate_household_impact(population_data)
+
+    # Calculate percentiles based on household net income
+    percentile = pd.Series(impact["net_income"]).rank(pct=True).values * 100
+
+    return {
+        "percentile": percentile,
+        "percentage_change": impact["percentage_change"] * 100,
+        "absolute_difference": impact["absolute_difference"],
+    }
 
-    return scatter_data
+
+def weighted_bin_medians(
+    values: np.ndarray, bin_index: np.ndarray, weights: np.ndarray, bins: int
+) -> np.ndarray:
+    """
+    Calculate the weighted median of `values` within each bin.
+
+    Returns:
+        Array of one median per bin, NaN for bins with no weight
+    """
+    # Sort by bin, then by value, so each bin's values are contiguous and ordered
+    order = np.lexsort((values, bin_index))
+    sorted_values = values[order]
+    cumulative_weight = np.cumsum(weights[order])
+
+    bin_weight = np.bincount(bin_index, weights=weights, minlength=bins)
+    bin_start = np.concatenate([[0.0], np.cumsum(bin_weight)[:-1]])
+    median_position = np.searchsorted(cumulative_weight, bin_start + bin_weight / 2)
+
+    medians = sorted_values[np.minimum(median_position, len(values) - 1)]
+    return np.where(bin_weight > 0, medians, np.nan)
+
+
+def calculate_weighted_percentile_bins(
+    population_data: Tuple["pd.DataFrame", "pd.DataFrame", "pd.DataFrame", "pd.DataFrame"],
+    bins: int = 100,
+) -> Dict[str, np.ndarray]:
+    """
+    Summarise every household into weighted percentiles of 2028 household net income.
+
+    Args:
+        population_data: Baseline and reform dataframes for 2028 and 2029
+        bins: Number of equal-weight percentile bins
+
+    Returns:
+        Dictionary of per-bin arrays: the upper percentile, total household weight, mean net
+        income, and mean and median absolute difference (£) and percentage change (%).
+        Bins that no household falls into are left out.
+    """
+    impact = calculate_household_impact(population_data)
+    weights = impact["household_weight"]
+
+    # Assign households to bins by the midpoint of their share of cumulative weight
+    order = np.argsort(impact["net_income"], kind="stable")
+    sorted_weights = weights[order]
+    cumulative_share = (np.cumsum(sorted_weights) - sorted_weights / 2) / sorted_weights.sum()
+    bin_index = np.empty(len(order), dtype=int)
+    bin_index[order] = np.clip((cumulative_share * bins).astype(int), 0, bins - 1)
+
+    bin_weight = np.bincount(bin_index, weights=weights, minlength=bins)
+    occupied = bin_weight > 0
+
+    def weighted_bin_means(values):
+        return (
+            np.bincount(bin_index, weights=weights * values, minlength=bins)[occupied]
+            / bin_weight[occupied]
+        )
+
+    def bin_medians(values):
+        return weighted_bin_medians(values, bin_index, weights, bins)[occupied]
+
+    return {
+        "percentile": (np.arange(1, bins + 1) * 100 / bins)[occupied],
+        "household_weight": bin_weight[occupied],
+        "mean_net_income": weighted_bin_means(impact["net_income"]),
+        "mean_absolute_difference": weighted_bin_means(impact["absolute_difference"]),
+        "median_absolute_difference": bin_medians(impact["absolute_difference"]),
+        "mean_percentage_change": weighted_bin_means(impact["percentage_change"]) * 100,
+        "median_percentage_change": bin_medians(impact["percentage_change"]) * 100,
+    }
+
+
+def get_income_percentile_bins(
+    bins: int = 100, reform: str = DEFAULT_REFORM
+) -> List[Dict[str, float]]:
+    """
+    Get the full-population weighted percentile bins for one of `PERCENTILE_BIN_COUNTS`.
+
+    Args:
+        bins: Number of bins
+        reform: Canonical spec of the counterfactual baseline
+
+    Returns:
+        List of dictionaries with one entry per occupied bin
+    """
+    if bins not in PERCENTILE_BIN_COUNTS:
+        raise ValueError(f"bins must be one of {PERCENTILE_BIN_COUNTS}")
+
+    if reform != DEFAULT_REFORM:
+        columns = get_reform_population_results(reform)[1][bins]
+    else:
+        get_population_data()
+        columns = _percentile_bins[bins]
+    fields = list(columns)
+    return [
+        dict(zip(fields, values)) for values in zip(*(columns[field].tolist() for field in fields))
+    ]
 
 
 def get_projected_thresholds() -> Tuple[Dict[str, Dict[int, float]], Dict[str, Dict[int, float]]]:
@@ -358,3 +1967,33 @@ def get_projected_thresholds() -> Tuple[Dict[str, Dict[int, float]], Dict[str, D
     reform_thresholds["higher_rate_threshold"][2029] = hrt
 
     return baseline_thresholds, reform_thresholds
+
+
+def get_counterfactual_thresholds(reform: str) -> Dict[str, Dict[int, float]]:
+    """
+    Thresholds by year under a counterfactual reform, shaped like the baseline from
+    `get_projected_thresholds`.
+
+    Args:
+        reform: Canonical counterfactual reform spec
+
+    Returns:
+        Dictionary mapping each threshold to its value in each year
+    """
+    parameter_changes = compile_reform(reform)
+    thresholds = {
+        "personal_allowance": {},
+        "basic_rate_limit": {},
+        "higher_rate_threshold": {},
+    }
+    for year in range(2025, 2030):
+        period = f"{year}-01-01.{year}-12-31"
+        for threshold in ("personal_allowance", "basic_rate_limit"):
+            thresholds[threshold][year] = parameter_changes.get(
+                THRESHOLD_PARAMETERS[threshold], {}
+            ).get(period, CURRENT_PARAMETERS[threshold])
+        # Higher rate starts where the basic rate band ends above the personal allowance
+        thresholds["higher_rate_threshold"][year] = (
+            thresholds["personal_allowance"][year] + thresholds["basic_rate_limit"][year]
+        )
+    return thresholds
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .metrics import span
+
+
+class RequestCoalescer:
+    """
+    Single-flight for the event loop: concurrent callers with the same key await one shared
+    computation rather than each starting their own.
+
+    The computation runs as its own task, so a caller that disconnects doesn't cancel it for
+    the others. It runs in the first caller's context, so its stages count towards that
+    request; the others record their wait as a "coalesced" stage.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await the computation for `key`, starting `compute()` unless one is already running.
+
+        Raises:
+            Whatever the shared computation raises
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.started += 1
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        with span("coalesced"):
+            return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the error as retrieved, in case every caller had already gone
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """
+        Report computations started, callers that joined one already running, and how many
+        are running now.
+        """
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects calls arriving within `window` seconds of the first, up to `max_size`, and
+    runs them as one batch, fanning the results back out to each caller.
+
+    `run_batch` receives the items in arrival order and returns one result per item. A
+    result that is an exception is raised for that item's caller alone; an exception raised
+    by `run_batch` itself is raised for every caller in the batch.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window: float,
+        max_size: int,
+    ):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_size = max_size
+        self._pending = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks
+        self._running = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the next batch and await its result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[tuple]):
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Callers that gave up have cancelled their future
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Report the batches run so far and the items they held.
+        """
+        return {"batches": self.batches, "items": self.items, "pending": len(self._pending)}
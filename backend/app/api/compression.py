@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it responses fall back to gzip
+    brotli = None
+
+# Content codings this server can produce, most preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# File suffix of each content coding's precompressed static file
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Static files of these types are worth compressing; images and fonts already are compressed
+COMPRESSIBLE_SUFFIXES = (".html", ".js", ".css", ".json", ".svg", ".txt", ".map", ".xml")
+
+# Smaller files gain too little from compression to be worth a separate copy
+MIN_COMPRESS_SIZE = 512
+
+# Next.js puts content-hashed build output here, so those files never change at a given URL
+IMMUTABLE_STATIC_PREFIX = "_next/static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Everything else in the static export (HTML, icons) is revalidated with its ETag on each use
+STATIC_CACHE_CONTROL = "public, no-cache"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with a content coding at its highest level.
+
+    gzip output has no timestamp, so the same body always compresses to the same bytes and
+    every worker serves the same ETag.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into quality values by content coding.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding: str, available) -> Optional[str]:
+    """
+    Pick the available content coding the client accepts with the highest quality, preferring
+    the order of `ENCODINGS` between equal qualities.
+
+    Returns:
+        The content coding, or None to send the body uncompressed
+    """
+    qualities = accepted_encodings(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag, using weak comparison as RFC 9110
+    requires for this header.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+class EncodedPayload:
+    """
+    A response body compressed once with every supported content coding, each with its own
+    strong ETag, so repeat requests are served as stored bytes.
+    """
+
+    def __init__(self, body: bytes, media_type: str, headers: Optional[Mapping[str, str]] = None):
+        self.media_type = media_type
+        self.headers = dict(headers or {})
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {None: body}
+        self.etags = {None: f'"{digest}"'}
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                self.bodies[encoding] = compressed
+                self.etags[encoding] = f'"{digest}-{encoding}"'
+
+    def response(self, request_headers: Headers, cache_control: str) -> Response:
+        """
+        Serve the representation the client accepts, or a 304 if it already has it.
+
+        Args:
+            request_headers: Headers of the request being answered
+            cache_control: Cache-Control header value for the response
+
+        Returns:
+            The stored bytes, or an empty 304 Not Modified
+        """
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), self.bodies)
+        headers = {
+            **self.headers,
+            "ETag": self.etags[encoding],
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request_headers.get("if-none-match", ""), self.etags[encoding]):
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.bodies[encoding], media_type=self.media_type, headers=headers)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves the .br or .gz copy written next to a file by
+    `precompress_directory` when the client accepts it, and sets Cache-Control by path.
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        available = {}
+        for encoding in ENCODINGS:
+            compressed_path = f"{full_path}{ENCODING_SUFFIXES[encoding]}"
+            if os.path.isfile(compressed_path):
+                available[encoding] = compressed_path
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), available)
+
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        else:
+            compressed_path = available[encoding]
+            response = super().file_response(
+                compressed_path, os.stat(compressed_path), scope, status_code
+            )
+            # Keep the original file's type rather than application/gzip
+            media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            if response.status_code != 304:
+                response.headers["Content-Type"] = media_type
+                response.headers["Content-Encoding"] = encoding
+
+        if available:
+            response.headers["Vary"] = "Accept-Encoding"
+        relative_path = Path(full_path).relative_to(Path(self.directory).resolve()).as_posix()
+        response.headers["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL
+            if relative_path.startswith(IMMUTABLE_STATIC_PREFIX)
+            else STATIC_CACHE_CONTROL
+        )
+        return response
+
+
+def precompress_directory(directory: Path) -> int:
+    """
+    Write a compressed copy of every compressible static file next to it, e.g. app.js.gz,
+    for `PrecompressedStaticFiles` to serve.
+
+    Args:
+        directory: Static files directory, searched recursively
+
+    Returns:
+        Number of compressed copies written
+    """
+    written = 0
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        body = path.read_bytes()
+        if len(body) < MIN_COMPRESS_SIZE:
+            continue
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                path.with_name(path.name + ENCODING_SUFFIXES[encoding]).write_bytes(compressed)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    static_directory = Path(sys.argv[1] if len(sys.argv) > 1 else "static")
+    print(f"Wrote {precompress_directory(static_directory)} compressed files")
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from .calculator import (
+    CURRENT_PARAMETERS,
+    NO_FREEZE_REFORM,
+    OBR_EARNINGS_GROWTH,
+    PERSONAL_ALLOWANCE_TAPER,
+    calculate_impact_over_years_batch,
+)
+
+# Precomputed single-income responses baked into the image by `python -m app.api.grid`
+RESPONSE_GRID_PATH = Path(
+    os.environ.get(
+        "RESPONSE_GRID_PATH",
+        Path(__file__).resolve().parents[2] / "data" / "response_grid.npz",
+    )
+)
+
+GRID_INCOME_TYPES = (
+    "employment_income",
+    "self_employment_income",
+    "pension_income",
+    "dividend_income",
+    "savings_interest_income",
+)
+
+GRID_YEARS = list(range(2025, 2030))
+
+# Base-year amounts up to GRID_MAX_INCOME, every GRID_STEP, plus the tax thresholds
+GRID_MAX_INCOME = 200_000
+GRID_STEP = 100
+
+# Largest interpolation error accepted against live simulation, in £ of net income.
+# Thresholds are grid points only in the base year: later years' grown incomes cross them
+# between grid points. A kink between grid points costs at most the change in marginal rate
+# times a quarter of GRID_STEP, and the steepest kinks (allowance taper, benefit withdrawal)
+# are below 0.6.
+GRID_MAX_ERROR = 0.6 * GRID_STEP / 4
+
+# Profiles per simulation when building the grid, to bound memory
+GRID_BATCH_SIZE = 500
+
+_response_grid = None
+_response_grid_loaded = False
+
+
+def grid_amounts() -> np.ndarray:
+    """
+    Base-year income amounts the grid is evaluated at, including each base-year threshold.
+    """
+    thresholds = [
+        CURRENT_PARAMETERS["personal_allowance"],
+        CURRENT_PARAMETERS["higher_rate_threshold"],
+        CURRENT_PARAMETERS["additional_rate_threshold"],
+        PERSONAL_ALLOWANCE_TAPER["income_limit"],
+    ]
+    return np.union1d(np.arange(0, GRID_MAX_INCOME + 1, GRID_STEP), thresholds).astype(float)
+
+
+def default_wage_growth() -> Dict[str, float]:
+    """
+    Wage growth for each projection year under the OBR projections, which the grid assumes.
+    """
+    return {str(year): OBR_EARNINGS_GROWTH.get(str(year), 0.02) for year in GRID_YEARS[1:]}
+
+
+def response_grid_version() -> str:
+    """
+    Hash everything that determines the grid, so stale grids are ignored.
+    """
+    try:
+        policyengine_uk_version = version("policyengine-uk")
+    except PackageNotFoundError:
+        policyengine_uk_version = "unknown"
+
+    inputs = {
+        "income_types": list(GRID_INCOME_TYPES),
+        "years": GRID_YEARS,
+        "max_income": GRID_MAX_INCOME,
+        "step": GRID_STEP,
+        "wage_growth": default_wage_growth(),
+        "reform": NO_FREEZE_REFORM,
+        "policyengine_uk": policyengine_uk_version,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def build_response_grid(path: Path = RESPONSE_GRID_PATH) -> Path:
+    """
+    Evaluate both scenarios at every grid amount for each income type and save the results.
+
+    Returns:
+        The path written to
+    """
+    amounts = grid_amounts()
+    wage_growth = default_wage_growth()
+    arrays = {"version": np.array(response_grid_version()), "amounts": amounts}
+
+    for income_type in GRID_INCOME_TYPES:
+        income_lists = [[{"amount": float(amount), "type": income_type}] for amount in amounts]
+        results = []
+        for start in range(0, len(income_lists), GRID_BATCH_SIZE):
+            batch = income_lists[start : start + GRID_BATCH_SIZE]
+            results += calculate_impact_over_years_batch(batch, [wage_growth] * len(batch))
+
+        for scenario in ("with_freeze", "without_freeze"):
+            arrays[f"{income_type}.{scenario}"] = np.array(
+                [[result[scenario][year] for year in GRID_YEARS] for result in results]
+            )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return path
+
+
+def load_response_grid(path: Path = RESPONSE_GRID_PATH) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Read the grid written by `build_response_grid`.
+
+    Returns:
+        Dictionary of grid arrays, or None if the file is missing or its version differs
+    """
+    if not path.exists():
+        return None
+
+    with np.load(path) as arrays:
+        if str(arrays["version"]) != response_grid_version():
+            return None
+        return {key: arrays[key] for key in arrays.files if key != "version"}
+
+
+def get_response_grid() -> Optional[Dict[str, np.ndarray]]:
+    """
+    Get the response grid, loading it on first use.
+    """
+    global _response_grid, _response_grid_loaded
+
+    if not _response_grid_loaded:
+        _response_grid = load_response_grid()
+        _response_grid_loaded = True
+    return _response_grid
+
+
+def lookup_impact_over_years(
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growth: Dict[str, float],
+    grid: Optional[Dict[str, np.ndarray]] = None,
+) -> Optional[Dict[str, Dict[int, float]]]:
+    """
+    Answer `calculate_impact_over_years` from the response grid when the request is on it.
+
+    Only a single income type within the grid under the default OBR wage growth is covered;
+    between grid points, net income is interpolated linearly.
+
+    Args:
+        incomes: List of income items with amount and type
+        wage_growth: Dictionary of wage growth rates by year
+        grid: Grid arrays, defaulting to the loaded response grid
+
+    Returns:
+        Dictionary with results for both policy scenarios, or None if the grid can't answer
+    """
+    if grid is None:
+        grid = get_response_grid()
+    if grid is None:
+        return None
+
+    income_types = {income_item["type"] for income_item in incomes}
+    if len(income_types) != 1:
+        return None
+    income_type = income_types.pop()
+    if f"{income_type}.with_freeze" not in grid:
+        return None
+
+    defaults = default_wage_growth()
+    if any(wage_growth.get(year, rate) != rate for year, rate in defaults.items()):
+        return None
+
+    amounts = grid["amounts"]
+    amount = sum(income_item["amount"] for income_item in incomes)
+    if not amounts[0] <= amount <= amounts[-1]:
+        return None
+
+    return {
+        scenario: {
+            year: float(np.interp(amount, amounts, grid[f"{income_type}.{scenario}"][:, index]))
+            for index, year in enumerate(GRID_YEARS)
+        }
+        for scenario in ("with_freeze", "without_freeze")
+    }
+
+
+if __name__ == "__main__":
+    print(f"Wrote {build_response_grid()}")
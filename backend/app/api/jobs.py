@@ -0,0 +1,420 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .calculator import (
+    PERCENTILE_BIN_COUNTS,
+    canonical_reform_spec,
+    get_income_percentile_bins,
+    get_income_percentile_impact_data,
+    get_population_artifact_version,
+)
+
+# SQLite database holding every job and its result; point it at a persistent volume to keep
+# results across container restarts
+JOB_STORE_PATH = Path(
+    os.environ.get(
+        "JOB_STORE_PATH",
+        Path(__file__).resolve().parents[2] / "data" / "jobs.sqlite",
+    )
+)
+
+# Jobs running at once across every process sharing the store. Population analyses peak at
+# over 1GB, so only one fits in the 2Gi memory limit alongside the API
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "1"))
+
+# Seconds an idle runner waits before checking the store for jobs queued by other processes
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "5"))
+
+# Seconds between a runner's heartbeats for the jobs it's running, and how long without one
+# before a running job counts as abandoned and is queued again. Process IDs can't tell this,
+# since containers on different hosts or restarts of one can reuse them
+JOB_HEARTBEAT_INTERVAL = float(os.environ.get("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_HEARTBEAT_TIMEOUT = float(os.environ.get("JOB_HEARTBEAT_TIMEOUT", "120"))
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+
+class JobKind(NamedTuple):
+    """
+    A kind of job: how to validate its parameters into a canonical form, how to run it, and
+    what its results depend on besides the parameters.
+    """
+
+    normalize: Callable[[Dict[str, Any]], Dict[str, Any]]
+    run: Callable[[Dict[str, Any]], Any]
+    version: Callable[[], str]
+
+
+def normalize_percentile_impact_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate percentile impact parameters, filling in defaults so equivalent specs match.
+
+    A "reform" spec picks the counterfactual the freeze extension is compared against, as
+    in a calculate request.
+    """
+    unknown = set(params) - {"mode", "bins", "reform"}
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+
+    reform = json.loads(canonical_reform_spec(params.get("reform")))
+    mode = params.get("mode", "sample")
+    if mode == "sample":
+        return {"mode": "sample", "reform": reform}
+    if mode != "binned":
+        raise ValueError("mode must be 'sample' or 'binned'")
+
+    bins = params.get("bins", 100)
+    if bins not in PERCENTILE_BIN_COUNTS:
+        raise ValueError(f"bins must be one of {PERCENTILE_BIN_COUNTS}")
+    return {"mode": "binned", "bins": bins, "reform": reform}
+
+
+def run_percentile_impact_job(params: Dict[str, Any]) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Calculate the /api/percentile-impact payload for normalized parameters. Population
+    results against a counterfactual other than the default are computed on first use.
+    """
+    reform = canonical_reform_spec(params.get("reform"))
+    if params["mode"] == "binned":
+        return {"percentile_bins": get_income_percentile_bins(params["bins"], reform)}
+    return {"scatter_data": get_income_percentile_impact_data(reform)}
+
+
+JOB_KINDS = {
+    "percentile_impact": JobKind(
+        normalize_percentile_impact_params,
+        run_percentile_impact_job,
+        get_population_artifact_version,
+    ),
+}
+
+
+def job_spec_id(kind: str, params: Dict[str, Any], kind_version: str) -> str:
+    """
+    Hash a job spec, so identical specs share one job and its stored result.
+    """
+    spec = {"kind": kind, "params": params, "version": kind_version}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def process_owner() -> str:
+    """
+    Identify this process to other processes sharing the store. Only for reporting, since
+    liveness is judged by heartbeats.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobStore:
+    """
+    Jobs and their results in a SQLite database, shared by every process that opens it.
+
+    Each operation uses its own connection, so the store can be used from any thread.
+    """
+
+    def __init__(self, path: Path = JOB_STORE_PATH, concurrency: int = JOB_CONCURRENCY):
+        self.path = Path(path)
+        self.concurrency = concurrency
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _initialize(self):
+        """
+        Create the database on first use rather than when the API is imported.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    owner TEXT,
+                    heartbeat_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            # Stores created before jobs had heartbeats
+            if "heartbeat_at" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize()
+                self._initialized = True
+        # isolation_level=None leaves transactions to explicit BEGIN statements
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job unless an identical one is queued, running or done; failed jobs are
+        queued again.
+
+        Args:
+            kind: One of `JOB_KINDS`
+            params: Parameters for the job kind
+
+        Returns:
+            The job's status, as from `get`
+
+        Raises:
+            ValueError: If the kind or parameters are invalid
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_kind = JOB_KINDS[kind]
+        params = job_kind.normalize(params)
+        new_id = job_spec_id(kind, params, job_kind.version())
+
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT INTO jobs (id, kind, params, state, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    state = 'queued', owner = NULL, error = NULL, updated_at = excluded.updated_at
+                WHERE state = 'failed'
+                """,
+                (new_id, kind, json.dumps(params, sort_keys=True), now, now),
+            )
+        return self.get(new_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, without its result.
+
+        Returns:
+            Dictionary of the job's id, kind, parameters, state, error and timestamps, or
+            None if there is no such job
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT id, kind, params, state, error, created_at, updated_at FROM jobs "
+                "WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "params": json.loads(row["params"])}
+
+    def get_result(self, job_id: str) -> Optional[str]:
+        """
+        Get a finished job's result as the JSON text it was stored as.
+
+        Returns:
+            The result, or None if the job doesn't exist or isn't done
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT result FROM jobs WHERE id = ? AND state = 'done'", (job_id,)
+            ).fetchone()
+        return None if row is None else row["result"]
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark the oldest queued job as running for `owner`, unless `concurrency` jobs are
+        already running.
+
+        Returns:
+            The claimed job's id, kind and parameters, or None if there is nothing to run
+        """
+        with self._connect() as connection:
+            # BEGIN IMMEDIATE takes the write lock, so no other process claims concurrently
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                running = connection.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state = 'running'"
+                ).fetchone()[0]
+                row = None
+                if running < self.concurrency:
+                    row = connection.execute(
+                        "SELECT id, kind, params FROM jobs WHERE state = 'queued' "
+                        "ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    connection.execute(
+                        "UPDATE jobs SET state = 'running', owner = ?, heartbeat_at = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (owner, now, now, row["id"]),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {**dict(row), "params": json.loads(row["params"])}
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None):
+        """
+        Store a running job's result, or the error it failed with.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = ?, owner = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (
+                    "failed" if error is not None else "done",
+                    None if error is not None else json.dumps(result, allow_nan=False),
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def heartbeat(self, owner: str) -> int:
+        """
+        Record that `owner` is still running the jobs it claimed.
+
+        Returns:
+            Number of running jobs of `owner`'s
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE state = 'running' AND owner = ?",
+                (time.time(), owner),
+            ).rowcount
+
+    def requeue_abandoned(self, timeout: float = JOB_HEARTBEAT_TIMEOUT) -> int:
+        """
+        Queue again the running jobs without a heartbeat in `timeout` seconds, whose process
+        has presumably exited, e.g. after a crash or restart.
+
+        Returns:
+            Number of jobs queued again
+        """
+        now = time.time()
+        with self._connect() as connection:
+            return connection.execute(
+                "UPDATE jobs SET state = 'queued', owner = NULL, heartbeat_at = NULL, "
+                "updated_at = ? WHERE state = 'running' "
+                "AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (now, now - timeout),
+            ).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count jobs in each state.
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: 0 for state in JOB_STATES} | {state: count for state, count in rows}
+
+
+class JobRunner:
+    """
+    Background threads that claim queued jobs from a `JobStore` and run them, and one that
+    sends heartbeats for the running jobs.
+
+    The store limits how many jobs run at once across processes, so each process can start
+    the same number of runner threads.
+    """
+
+    def __init__(self, store: JobStore, threads: int = JOB_CONCURRENCY):
+        self.store = store
+        self.threads = threads
+        self.owner = process_owner()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """
+        Queue again any jobs abandoned by exited processes, then start the runner threads.
+        """
+        if self._threads:
+            return
+        self._stop.clear()
+        self.store.requeue_abandoned()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-runner-{index}", daemon=True)
+            for index in range(self.threads)
+        ] + [threading.Thread(target=self._send_heartbeats, name="job-heartbeat", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def notify(self):
+        """
+        Wake the runner threads to claim a newly queued job.
+        """
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop claiming jobs and wait for the running ones to finish, up to `timeout` seconds.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_next(self) -> bool:
+        """
+        Claim and run one queued job.
+
+        Returns:
+            Whether a job was run
+        """
+        job = self.store.claim(self.owner)
+        if job is None:
+            return False
+        try:
+            result = JOB_KINDS[job["kind"]].run(job["params"])
+        except Exception as e:
+            self.store.finish(job["id"], error=str(e))
+        else:
+            self.store.finish(job["id"], result=result)
+        # A slot is free, so another thread may be able to claim a job
+        self._wake.set()
+        return True
+
+    def _send_heartbeats(self):
+        while not self._stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                self.store.heartbeat(self.owner)
+            except sqlite3.Error:
+                # A missed heartbeat is harmless well within the timeout
+                pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                if self.run_next():
+                    continue
+                # Free the slots of jobs whose process stopped sending heartbeats
+                self.store.requeue_abandoned()
+            except sqlite3.Error:
+                # The store is busy or unavailable; try again after the poll interval
+                pass
+            self._wake.wait(JOB_POLL_INTERVAL)
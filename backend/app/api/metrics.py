@@ -0,0 +1,267 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from .profiling import SamplingProfiler, new_profile_id, profiling_requested, save_profile
+
+# Upper bounds of the duration histogram buckets, in seconds: validation and response
+# shaping take well under a millisecond, simulations several seconds
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus-style histogram with one series per combination of label values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """
+        Count one observation in every bucket at least as large as `value`.
+        """
+        key = tuple(labels[label_name] for label_name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> List[str]:
+        """
+        Format the histogram in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = [f'{name}="{value}"' for name, value in zip(self.label_names, key)]
+                for upper_bound, count in zip(self.buckets, series["buckets"]):
+                    bucket_labels = ",".join(labels + [f'le="{upper_bound}"'])
+                    lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+                all_labels = ",".join(labels + ['le="+Inf"'])
+                lines.append(f"{self.name}_bucket{{{all_labels}}} {series['count']}")
+                lines.append(f"{self.name}_sum{{{','.join(labels)}}} {series['sum']}")
+                lines.append(f"{self.name}_count{{{','.join(labels)}}} {series['count']}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its response.",
+    ("method", "route", "status"),
+)
+
+STAGE_DURATION = Histogram(
+    "http_request_stage_duration_seconds",
+    "Time each request spends in each stage, summed over the stage's spans.",
+    ("route", "stage"),
+)
+
+
+class RequestTimings:
+    """
+    Stage durations and worker threads of one request, shared with the threads working on it.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.threads = {threading.get_ident()}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """
+        Format the stages so far, and the total, as a Server-Timing header value in ms.
+        """
+        with self._lock:
+            stages = list(self.stages.items())
+        stages.append(("total", time.perf_counter() - self.start))
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages)
+
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    """
+    Add time spent in a stage to the current request, if there is one.
+    """
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def record_stage_since_request_start(stage: str):
+    """
+    Record everything since the request arrived as a stage, e.g. body parsing and validation
+    when called at the start of an endpoint.
+    """
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, time.perf_counter() - timings.start)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a stage of the current request.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def request_thread() -> Iterator[None]:
+    """
+    Mark the current thread as working on the current request, so a profile of the request
+    samples it.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    ident = threading.get_ident()
+    with timings._lock:
+        timings.threads.add(ident)
+    try:
+        yield
+    finally:
+        with timings._lock:
+            timings.threads.discard(ident)
+
+
+def route_label(scope: dict) -> str:
+    """
+    The path template of the route a request matched, which keeps label values bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return getattr(route, "path", "") or "/"
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware that times every HTTP request and the stages recorded within it.
+
+    Stage totals are echoed in a Server-Timing response header and, with the request
+    duration, aggregated into histograms for /metrics. Requests carrying a valid profiling
+    header are also sampled by `SamplingProfiler`, and the profile id is returned in an
+    X-Profile-Id header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        status = 500
+
+        profiler = None
+        profile_id = None
+        # Fetching a profile isn't profiled, or it would push older profiles out
+        if profiling_requested(scope) and not scope["path"].startswith("/debug/profiles/"):
+            profile_id = new_profile_id()
+            profiler = SamplingProfiler(lambda: list(timings.threads))
+            profiler.start()
+
+        async def send_with_timings(message):
+            nonlocal status, profiler
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing())
+                if profile_id is not None:
+                    headers.append("X-Profile-Id", profile_id)
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                # Store the profile before the client can see the response end
+                if profiler is not None:
+                    save_profile(profile_id, profiler.stop())
+                    profiler = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            if profiler is not None:
+                save_profile(profile_id, profiler.stop())
+            _request_timings.reset(token)
+
+            route = route_label(scope)
+            REQUEST_DURATION.observe(
+                time.perf_counter() - timings.start,
+                method=scope["method"],
+                route=route,
+                status=str(status),
+            )
+            for stage, seconds in timings.stages.items():
+                STAGE_DURATION.observe(seconds, route=route, stage=stage)
+
+
+def render_metrics(gauges: Optional[Iterable[Tuple[str, str, float]]] = None) -> str:
+    """
+    Format the request histograms and any extra gauges in the Prometheus text format.
+
+    Args:
+        gauges: (name, description, value) for each extra gauge
+
+    Returns:
+        The exposition text
+    """
+    lines = REQUEST_DURATION.render() + STAGE_DURATION.render()
+    for name, description, value in gauges or ():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
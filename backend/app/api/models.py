@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -11,6 +11,29 @@ class IncomeItem(BaseModel):
     )
 
 
+class ReformSpec(BaseModel):
+    freeze_end_year: int = Field(
+        2027,
+        ge=2027,
+        le=2030,
+        description=(
+            "Last year thresholds stay frozen in the counterfactual; they are uprated in every "
+            "later year"
+        ),
+    )
+    uprating: Literal["earnings", "cpi"] = Field(
+        "earnings",
+        description="Index thresholds are uprated by: OBR earnings growth or an assumed 2% CPI",
+    )
+    thresholds: List[
+        Literal["personal_allowance", "basic_rate_limit", "additional_rate_threshold"]
+    ] = Field(
+        default_factory=lambda: ["personal_allowance", "basic_rate_limit"],
+        min_length=1,
+        description="Thresholds the counterfactual uprates; the rest stay frozen",
+    )
+
+
 class WageGrowthRequest(BaseModel):
     incomes: List[IncomeItem] = Field(
         ..., 
@@ -23,6 +46,68 @@ class WageGrowthRequest(BaseModel):
             "(e.g., {'2026': 0.02, '2027': 0.02, '2028': 0.02, '2029': 0.02} for 2% growth)"
         )
     )
+    reform: Optional[ReformSpec] = Field(
+        default=None,
+        description=(
+            "Counterfactual the freeze extension is compared against; by default the freeze "
+            "ends after 2027 and the personal allowance and basic rate limit rise with earnings"
+        ),
+    )
+
+
+class HouseholdMember(BaseModel):
+    age: int = Field(..., ge=0, le=120, description="Age in years")
+    incomes: List[IncomeItem] = Field(
+        default_factory=list, description="List of income items with amounts and types"
+    )
+
+
+class ProjectionRequest(BaseModel):
+    people: List[HouseholdMember] = Field(
+        ...,
+        min_length=1,
+        description=(
+            "Household members: one or two adults, who are a couple if there are two, and "
+            "any children"
+        ),
+    )
+    end_year: int = Field(2029, ge=2025, le=2035, description="Last year of the projection")
+    wage_growth: Dict[str, float] = Field(
+        default_factory=dict,
+        description=(
+            "Annual wage growth rate for future years, as for /api/calculate; years without "
+            "one use the OBR projections, then 2%"
+        ),
+    )
+    reform: Optional[ReformSpec] = Field(
+        default=None,
+        description="Counterfactual the freeze extension is compared against",
+    )
+
+
+class BatchCalculationRequest(BaseModel):
+    items: List[WageGrowthRequest] = Field(
+        ..., description="Income and wage growth requests to calculate together"
+    )
+
+
+class SensitivityRequest(BaseModel):
+    incomes: List[IncomeItem] = Field(
+        ..., description="List of income items with amounts and types"
+    )
+    wage_growth_scenarios: List[Dict[str, float]] = Field(
+        ...,
+        min_length=1,
+        description=(
+            "Wage growth scenarios to compare, each shaped like a calculate request's "
+            "wage_growth (e.g. [{'2026': 0.01, ...}, {'2026': 0.02, ...}]); an empty scenario "
+            "uses the OBR projections"
+        ),
+    )
+    reform: Optional[ReformSpec] = Field(
+        default=None,
+        description="Counterfactual the freeze extension is compared against in every scenario",
+    )
 
 
 class YearlyDataPoint(BaseModel):
@@ -38,9 +123,93 @@ class CalculationResponse(BaseModel):
     chart_data: List[Dict[str, Union[int, float]]]
     total_impact: float
     assumptions: Dict[str, Union[float, Dict[str, float]]]
+    tax_parameters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description=(
+            "Information about tax parameters in each scenario, omitted when requested with "
+            "include_parameters=false"
+        ),
+    )
+    reform: Optional[Dict[str, Any]] = Field(
+        default=None, description="Counterfactual reform spec, with defaults filled in"
+    )
+
+
+class ParametersResponse(BaseModel):
     tax_parameters: Dict[str, Any] = Field(
         description="Information about tax parameters in each scenario"
     )
+    obr_earnings_growth: Dict[str, float] = Field(
+        description="OBR earnings growth projections by year"
+    )
+
+
+class BatchCalculationResponse(BaseModel):
+    results: List[CalculationResponse] = Field(
+        description="Calculation results in the same order as the request items"
+    )
+
+
+class SensitivityResponse(BaseModel):
+    years: List[int] = Field(description="Years of the net income matrix columns")
+    wage_growth: List[Dict[str, float]] = Field(
+        description="Each scenario's wage growth, with OBR projections filled in"
+    )
+    with_freeze: List[List[float]] = Field(
+        description="Net income with the freeze extended, one row per scenario"
+    )
+    without_freeze: List[List[float]] = Field(
+        description="Net income without the freeze extension, one row per scenario"
+    )
+    total_impact: List[float] = Field(
+        description="Net income lost to the freeze extension over 2028-2029 in each scenario"
+    )
+    reform: Optional[Dict[str, Any]] = Field(
+        default=None, description="Counterfactual reform spec, with defaults filled in"
+    )
+
+
+class ProjectionResponse(BaseModel):
+    years: List[int] = Field(description="Projection years, from 2025")
+    with_freeze: List[float] = Field(
+        description="Household net income with the freeze extended, by year"
+    )
+    without_freeze: List[float] = Field(
+        description="Household net income without the freeze extension, by year"
+    )
+    total_impact: float = Field(
+        description="Net income lost to the freeze extension over the projection"
+    )
+    wage_growth: Dict[str, float] = Field(
+        description="Wage growth used for each year, with OBR projections filled in"
+    )
+    reform: Optional[Dict[str, Any]] = Field(
+        default=None, description="Counterfactual reform spec, with defaults filled in"
+    )
+
+
+class JobRequest(BaseModel):
+    kind: str = Field(..., description="Kind of analysis to run, e.g. percentile_impact")
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description=(
+            "Parameters for the kind of analysis, e.g. {'mode': 'binned', 'bins': 1000} for "
+            "percentile_impact"
+        ),
+    )
+
+
+class JobStatusResponse(BaseModel):
+    id: str = Field(description="Job id, the same for every submission of the same spec")
+    kind: str
+    params: Dict[str, Any] = Field(description="Parameters with defaults filled in")
+    state: str = Field(description="queued, running, done or failed")
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    result_url: Optional[str] = Field(
+        default=None, description="Where to fetch the result once the job is done"
+    )
 
 
 class ScatterDataPoint(BaseModel):
@@ -50,4 +219,18 @@ class ScatterDataPoint(BaseModel):
 
 
 class PercentileImpactResponse(BaseModel):
-    scatter_data: List[ScatterDataPoint]
\ No newline at end of file
+    scatter_data: List[ScatterDataPoint]
+
+
+class PercentileBin(BaseModel):
+    percentile: float
+    household_weight: float
+    mean_net_income: float
+    mean_absolute_difference: float
+    median_absolute_difference: float
+    mean_percentage_change: float
+    median_percentage_change: float
+
+
+class PercentileBinsResponse(BaseModel):
+    percentile_bins: List[PercentileBin]
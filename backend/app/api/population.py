@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Precomputed population frames baked into the image by `python -m app.api.population`
+POPULATION_ARTIFACT_PATH = Path(
+    os.environ.get(
+        "POPULATION_ARTIFACT_PATH",
+        Path(__file__).resolve().parents[2] / "data" / "population.npz",
+    )
+)
+
+# Whether worker processes map one shared copy of the population arrays rather than each
+# loading their own; /dev/shm keeps the shared copy in memory where it exists
+SHARE_POPULATION_DATA = os.environ.get("SHARE_POPULATION_DATA", "false").lower() == "true"
+SHARED_POPULATION_DIR = Path(
+    os.environ.get(
+        "SHARED_POPULATION_DIR",
+        Path("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+        / "uk-income-tax-freeze-population",
+    )
+)
+
+FRAME_NAMES = ("baseline_2028", "reform_2028", "baseline_2029", "reform_2029")
+
+SCATTER_FIELDS = ("percentile", "percentage_change", "absolute_difference")
+
+
+def population_artifact_version(
+    dataset: str,
+    variables: List[str],
+    reform: dict,
+    sample_size: int,
+    seed: int,
+    bin_counts: Tuple[int, ...],
+) -> str:
+    """
+    Hash everything that determines the population frames, so stale artifacts are ignored.
+
+    Returns:
+        Hex digest identifying the inputs and the installed PolicyEngine UK version
+    """
+    try:
+        policyengine_uk_version = version("policyengine-uk")
+    except PackageNotFoundError:
+        policyengine_uk_version = "unknown"
+
+    inputs = {
+        "dataset": dataset,
+        "variables": variables,
+        "reform": reform,
+        "sample_size": sample_size,
+        "seed": seed,
+        "bin_counts": list(bin_counts),
+        "policyengine_uk": policyengine_uk_version,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def population_arrays(
+    artifact_version: str,
+    population_data: Tuple["pd.DataFrame", ...],
+    scatter_data: Dict[str, np.ndarray],
+    percentile_bins: Dict[int, Dict[str, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    """
+    Flatten the population frames, scatter data and percentile bins into named arrays.
+    """
+    arrays = {"version": np.array(artifact_version)}
+    for frame_name, df in zip(FRAME_NAMES, population_data):
+        arrays[f"{frame_name}.columns"] = np.array(list(df.columns))
+        for column in df.columns:
+            arrays[f"{frame_name}.{column}"] = df[column].values
+    for field in SCATTER_FIELDS:
+        arrays[f"scatter.{field}"] = scatter_data[field]
+    arrays["bins"] = np.array(list(percentile_bins), dtype=int)
+    for bins, columns in percentile_bins.items():
+        arrays[f"bins_{bins}.columns"] = np.array(list(columns))
+        for field, values in columns.items():
+            arrays[f"bins_{bins}.{field}"] = values
+    return arrays
+
+
+def population_from_arrays(
+    arrays: Mapping[str, np.ndarray],
+) -> Tuple[Tuple["pd.DataFrame", ...], Dict[str, np.ndarray], Dict[int, Dict[str, np.ndarray]]]:
+    """
+    Rebuild the population frames, scatter data and percentile bins from `population_arrays`.
+
+    Frames are built without copying, so they stay backed by memory-mapped arrays.
+    """
+    import pandas as pd
+
+    population_data = tuple(
+        pd.DataFrame(
+            {
+                column: arrays[f"{frame_name}.{column}"]
+                for column in arrays[f"{frame_name}.columns"]
+            },
+            copy=False,
+        )
+        for frame_name in FRAME_NAMES
+    )
+    scatter_data = {field: arrays[f"scatter.{field}"] for field in SCATTER_FIELDS}
+    percentile_bins = {
+        int(bins): {
+            str(field): arrays[f"bins_{bins}.{field}"] for field in arrays[f"bins_{bins}.columns"]
+        }
+        for bins in arrays["bins"]
+    }
+    return population_data, scatter_data, percentile_bins
+
+
+def save_population_artifact(
+    path: Path,
+    artifact_version: str,
+    population_data: Tuple["pd.DataFrame", ...],
+    scatter_data: Dict[str, np.ndarray],
+    percentile_bins: Dict[int, Dict[str, np.ndarray]],
+):
+    """
+    Write the population frames, scatter data and percentile bins column by column to an
+    .npz file.
+    """
+    arrays = population_arrays(artifact_version, population_data, scatter_data, percentile_bins)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # np.savez appends .npz to paths without it, so write through a file handle
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def load_population_artifact(
+    path: Path, artifact_version: str
+) -> Optional[
+    Tuple[Tuple["pd.DataFrame", ...], Dict[str, np.ndarray], Dict[int, Dict[str, np.ndarray]]]
+]:
+    """
+    Read the population frames, scatter data and percentile bins written by
+    `save_population_artifact`.
+
+    Returns:
+        The frames, scatter data and percentile bins, or None if the file is missing or its
+        version differs
+    """
+    if not path.exists():
+        return None
+
+    with np.load(path) as arrays:
+        if str(arrays["version"]) != artifact_version:
+            return None
+        return population_from_arrays({key: arrays[key] for key in arrays.files})
+
+
+def save_shared_population_data(
+    directory: Path,
+    artifact_version: str,
+    population_data: Tuple["pd.DataFrame", ...],
+    scatter_data: Dict[str, np.ndarray],
+    percentile_bins: Dict[int, Dict[str, np.ndarray]],
+):
+    """
+    Write the population data to a directory of .npy files, one per array, that worker
+    processes can memory-map with `attach_shared_population_data`.
+
+    The directory is replaced in one step, so processes never map a partly written copy.
+    Processes still mapping a replaced copy keep it until they let go of it.
+    """
+    arrays = population_arrays(artifact_version, population_data, scatter_data, percentile_bins)
+
+    staging = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for key, values in arrays.items():
+        np.save(staging / f"{key}.npy", values)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+
+
+def attach_shared_population_data(
+    directory: Path, artifact_version: str
+) -> Optional[
+    Tuple[Tuple["pd.DataFrame", ...], Dict[str, np.ndarray], Dict[int, Dict[str, np.ndarray]]]
+]:
+    """
+    Memory-map the population data written by `save_shared_population_data`.
+
+    Every process attaching the same directory shares one read-only copy of the arrays.
+
+    Returns:
+        The frames, scatter data and percentile bins, or None if the directory is missing or
+        its version differs
+    """
+    version_path = directory / "version.npy"
+    if not version_path.exists() or str(np.load(version_path)) != artifact_version:
+        return None
+
+    # Plain ndarray views keep pandas and numpy results ndarrays, while still reading
+    # through the mapping
+    arrays = {
+        path.stem: np.load(path, mmap_mode="r").view(np.ndarray)
+        for path in directory.glob("*.npy")
+        if path != version_path
+    }
+    return population_from_arrays(arrays)
+
+
+if __name__ == "__main__":
+    from .calculator import build_population_artifact
+
+    print(f"Wrote {build_population_artifact()}")
@@ -0,0 +1,97 @@
+import hmac
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Callable, Iterable, Optional
+
+# Requests with this header set to PROFILE_TOKEN are profiled; without a token, none are
+PROFILE_HEADER = b"x-profile"
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+
+# Seconds between stack samples, and the number of recent profiles kept for collection
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
+PROFILE_HISTORY = 20
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    Sample the stacks of a set of threads from a background thread.
+
+    Samples are counted as collapsed stacks, one "root;...;leaf count" line per distinct
+    stack, which flamegraph.pl and speedscope render as flame graphs.
+    """
+
+    def __init__(self, threads: Callable[[], Iterable[int]], interval: float = PROFILE_INTERVAL):
+        self.threads = threads
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in self.threads():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        """
+        Stop sampling.
+
+        Returns:
+            The samples as collapsed stacks, most frequent first
+        """
+        self._stopped.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def profiling_requested(scope: dict) -> bool:
+    """
+    Check whether an ASGI request asks to be profiled with the configured token.
+    """
+    if not PROFILE_TOKEN:
+        return False
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value.decode("latin-1"), PROFILE_TOKEN)
+    return False
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def save_profile(profile_id: str, profile: str):
+    """
+    Keep a profile for collection, dropping the oldest beyond `PROFILE_HISTORY`.
+    """
+    with _profiles_lock:
+        _profiles[profile_id] = profile
+        while len(_profiles) > PROFILE_HISTORY:
+            _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """
+    Return a saved profile as collapsed stacks, or None if it's unknown or was dropped.
+    """
+    with _profiles_lock:
+        return _profiles.get(profile_id)
@@ -1,129 +1,1047 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from .bulk import BULK_CHUNK_SIZE, iter_chunks, score_lines
+from .cache import ResultCache, normalize_calculation_request, normalize_projection_request
 from .calculator import (
+    COMPILED_REFORM_CACHE_SIZE,
     CURRENT_PARAMETERS,
+    DEFAULT_REFORM,
     OBR_EARNINGS_GROWTH,
+    PERCENTILE_BIN_COUNTS,
+    calculate_impact_fast,
     calculate_impact_over_years,
+    calculate_impact_over_years_batch,
+    calculate_projection,
+    calculate_sensitivity,
+    canonical_reform_spec,
+    get_counterfactual_thresholds,
+    get_income_percentile_bins,
+    get_income_percentile_impact_columns,
     get_income_percentile_impact_data,
     get_projected_thresholds,
+    is_population_ready,
+    start_population_loading,
+    validate_household,
+    validate_incomes,
+)
+from .coalescing import MicroBatcher, RequestCoalescer
+from .compression import EncodedPayload
+from .grid import lookup_impact_over_years
+from .jobs import JobRunner, JobStore
+from .metrics import record_stage_since_request_start, span
+from .models import (
+    BatchCalculationRequest,
+    BatchCalculationResponse,
+    CalculationResponse,
+    JobRequest,
+    JobStatusResponse,
+    ParametersResponse,
+    PercentileBinsResponse,
+    PercentileImpactResponse,
+    ProjectionRequest,
+    ProjectionResponse,
+    ReformSpec,
+    SensitivityRequest,
+    SensitivityResponse,
+    WageGrowthRequest,
 )
-from .models import CalculationResponse, PercentileImpactResponse, WageGrowthRequest
+from .workers import WorkerPool, WorkerPoolFullError
 
 router = APIRouter(prefix="/api")
 
+# Opt in to the analytic fast engine for the household shapes it supports
+USE_FAST_ENGINE = os.environ.get("USE_FAST_ENGINE", "false").lower() == "true"
+
+# Projections use the fast engine by default, since a simulated projection's cost grows with
+# its horizon; households it doesn't support, or any other PolicyEngine UK version, fall back
+# to the full simulation
+USE_FAST_PROJECTIONS = (
+    USE_FAST_ENGINE or os.environ.get("USE_FAST_PROJECTIONS", "true").lower() == "true"
+)
+
+# Opt in to answering single-income requests under default growth from the precomputed
+# grid, if built. Its results are interpolated, so up to GRID_MAX_ERROR off the simulation.
+USE_RESPONSE_GRID = os.environ.get("USE_RESPONSE_GRID", "false").lower() == "true"
+
+# Results for repeated requests, keyed on the normalized incomes, wage growth and reform
+calculation_cache = ResultCache(
+    max_size=int(os.environ.get("CALCULATION_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("CALCULATION_CACHE_TTL", "3600")),
+)
+
+# Net income per year, uprated household and scenario, so a request that only changes some
+# years' wage growth (e.g. a moved slider) recalculates just the years it affects
+year_result_cache = ResultCache(
+    max_size=int(os.environ.get("YEAR_RESULT_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("CALCULATION_CACHE_TTL", "3600")),
+)
+
+# Blocking calculations run here so the event loop keeps serving other requests
+worker_pool = WorkerPool(
+    kind=os.environ.get("WORKER_POOL_KIND", "thread"),
+    max_workers=int(os.environ.get("WORKER_POOL_SIZE", "2")),
+    max_queue=int(os.environ.get("WORKER_QUEUE_DEPTH", "8")),
+    timeout=float(os.environ.get("CALCULATION_TIMEOUT", "120")),
+)
+
+# Long-running analyses, run in the background with results kept on disk
+job_store = JobStore()
+job_runner = JobRunner(job_store)
+
+# Seconds clients are asked to wait before retrying when the worker pool is full
+RETRY_AFTER_SECONDS = 5
+POPULATION_RETRY_AFTER_SECONDS = 30
+
+# Largest batch accepted, and the number of profiles simulated together within a batch
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "1000"))
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "250"))
+
+# Most wage growth scenarios accepted in one sensitivity sweep
+MAX_SENSITIVITY_SCENARIOS = int(os.environ.get("MAX_SENSITIVITY_SCENARIOS", "50"))
+
+# Seconds clients may reuse /api/parameters before revalidating it
+PARAMETERS_MAX_AGE = int(os.environ.get("PARAMETERS_MAX_AGE", "3600"))
+
+# Seconds clients and CDNs may reuse /api/percentile-impact, which only changes on deployment
+PERCENTILE_IMPACT_MAX_AGE = int(os.environ.get("PERCENTILE_IMPACT_MAX_AGE", "86400"))
+
+# Concurrent requests with the same canonical input, e.g. a link shared on budget day, await
+# one shared calculation rather than each taking a worker
+COALESCE_REQUESTS = os.environ.get("COALESCE_REQUESTS", "true").lower() == "true"
+
+# Distinct /api/calculate requests arriving within this many seconds of each other, up to
+# CALCULATE_BATCH_SIZE, are simulated together. Off (0) by default: every request would wait
+# the window, and batched requests skip the per-year results a lone request reuses
+CALCULATE_BATCH_WINDOW = float(os.environ.get("CALCULATE_BATCH_WINDOW", "0"))
+CALCULATE_BATCH_SIZE = int(os.environ.get("CALCULATE_BATCH_SIZE", "8"))
+
+# Serialized and compressed percentile-impact bodies by (mode, bins, format)
+percentile_impact_payloads: Dict[Tuple[str, int, str], EncodedPayload] = {}
+
+# Bytes of a streamed upload held in memory before it spills to a temporary file
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+def request_reform(reform: Optional[ReformSpec]) -> str:
+    """
+    Canonicalize a request's counterfactual reform spec, defaulting to `DEFAULT_REFORM`.
+    """
+    return canonical_reform_spec(None if reform is None else reform.model_dump())
+
+
+def unpack_cache_key(cache_key: Tuple) -> Tuple[List[dict], Dict[str, float], str]:
+    """
+    Turn a normalized request back into income items, wage growth and reform.
+    """
+    normalized_incomes, normalized_wage_growth, reform = cache_key
+    incomes = [
+        {"amount": amount, "type": income_type} for income_type, amount in normalized_incomes
+    ]
+    return incomes, dict(normalized_wage_growth), reform
+
+
+def calculate_impact_without_simulation(
+    incomes: List[dict], wage_growth: Dict[str, float], reform: str = DEFAULT_REFORM
+) -> Optional[Dict[str, Dict[int, float]]]:
+    """
+    Answer a request from the response grid or the fast engine, where enabled and supported.
+    The grid only holds the default counterfactual.
+    """
+    if USE_RESPONSE_GRID and reform == DEFAULT_REFORM:
+        results = lookup_impact_over_years(incomes, wage_growth)
+        if results is not None:
+            return results
+    if USE_FAST_ENGINE:
+        return calculate_impact_fast(incomes, wage_growth, reform)
+    return None
+
+
+def calculate_cached_impact(cache_key: Tuple) -> Dict[str, Dict[int, float]]:
+    """
+    Calculate the impact for a normalized request, reusing cached results.
+
+    Runs inside the worker pool; with process workers each worker keeps its own cache.
+    """
+    incomes, wage_growth, reform = unpack_cache_key(cache_key)
+
+    def compute():
+        results = calculate_impact_without_simulation(incomes, wage_growth, reform)
+        if results is None:
+            results = calculate_impact_over_years(
+                incomes=incomes,
+                wage_growth=wage_growth,
+                year_results=year_result_cache,
+                reform=reform,
+            )
+        return results
+
+    return calculation_cache.get_or_compute(cache_key, compute)
+
+
+def calculate_cached_impact_batch(cache_keys: List[Tuple]) -> List[Dict[str, Dict[int, float]]]:
+    """
+    Calculate the impact for many normalized requests, simulating the uncached ones together.
+
+    Uncached requests are simulated together with the others comparing against the same
+    counterfactual reform. Runs inside the worker pool; results are returned in the order of
+    `cache_keys`.
+
+    Args:
+        cache_keys: Normalized requests
+    """
+    results = {}
+    to_simulate = {}
+    for cache_key in dict.fromkeys(cache_keys):
+        cached = calculation_cache.get(cache_key)
+        if cached is None:
+            cached = calculate_impact_without_simulation(*unpack_cache_key(cache_key))
+        if cached is None:
+            to_simulate.setdefault(unpack_cache_key(cache_key)[2], []).append(cache_key)
+        else:
+            results[cache_key] = cached
+
+    for reform, reform_keys in to_simulate.items():
+        for start in range(0, len(reform_keys), BATCH_CHUNK_SIZE):
+            chunk = reform_keys[start : start + BATCH_CHUNK_SIZE]
+            profiles = [unpack_cache_key(cache_key) for cache_key in chunk]
+            chunk_results = calculate_impact_over_years_batch(
+                [incomes for incomes, _, _ in profiles],
+                [wage_growth for _, wage_growth, _ in profiles],
+                reform,
+            )
+            results.update(zip(chunk, chunk_results))
+
+    for cache_key, result in results.items():
+        calculation_cache.set(cache_key, result)
+    return [results[cache_key] for cache_key in cache_keys]
+
+
+class InvalidBatchItemError(ValueError):
+    """
+    Raised when an item of a /calculate/batch request can't be simulated.
+    """
+
+
+def calculate_validated_impact_batch(cache_keys: List[Tuple]) -> List[Dict[str, Dict[int, float]]]:
+    """
+    Check every request's income items, then calculate them as `calculate_cached_impact_batch`.
+
+    Checking first means one bad profile is reported by its index rather than failing the
+    chunk it would be simulated in. Runs inside the worker pool, as the check needs the
+    tax-benefit system.
+
+    Raises:
+        InvalidBatchItemError: If an item's income items can't be simulated
+    """
+    for index, cache_key in enumerate(cache_keys):
+        try:
+            validate_incomes(unpack_cache_key(cache_key)[0])
+        except ValueError as e:
+            raise InvalidBatchItemError(f"items[{index}]: {e}") from e
+    return calculate_cached_impact_batch(cache_keys)
+
+
+def calculate_micro_batch(cache_keys: List[Tuple]) -> List[Union[dict, Exception]]:
+    """
+    Calculate a micro-batch of distinct /api/calculate requests.
+
+    A lone request takes the single-request path, which reuses per-year results. Larger
+    batches are simulated together, in the same template buckets as single requests and
+    sensitivity sweeps, so batching builds no templates of its own. If the batch fails, e.g.
+    on one request's unknown income type, each request is calculated on its own so only the
+    failing ones error.
+
+    Runs inside the worker pool.
+
+    Returns:
+        Each request's results, or the exception calculating it raised, in order
+    """
+    if len(cache_keys) == 1:
+        return [calculate_cached_impact(cache_keys[0])]
+
+    try:
+        return calculate_cached_impact_batch(cache_keys)
+    except Exception:
+        results = []
+        for cache_key in cache_keys:
+            try:
+                results.append(calculate_cached_impact(cache_key))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+async def run_calculation_batch(cache_keys: List[Tuple]) -> List[Union[dict, Exception]]:
+    """
+    Run a micro-batch in the worker pool, taking one slot however many requests it holds.
+    """
+    return await worker_pool.run(calculate_micro_batch, cache_keys)
+
+
+request_coalescer = RequestCoalescer()
+calculate_batcher = MicroBatcher(
+    run_calculation_batch, window=CALCULATE_BATCH_WINDOW, max_size=CALCULATE_BATCH_SIZE
+)
+
+
+async def calculate_coalesced(cache_key: Tuple) -> Dict[str, Dict[int, float]]:
+    """
+    Calculate a normalized request, sharing the calculation with concurrent identical
+    requests and micro-batching it with concurrent distinct ones.
+
+    Raises:
+        WorkerPoolFullError: If the worker pool has no capacity left
+        asyncio.TimeoutError: If the calculation doesn't finish within the pool's timeout
+    """
+
+    async def compute():
+        if calculate_batcher.window > 0:
+            return await calculate_batcher.submit(cache_key)
+        return await worker_pool.run(calculate_cached_impact, cache_key)
+
+    if not COALESCE_REQUESTS:
+        return await compute()
+    return await request_coalescer.run(("calculate", cache_key), compute)
+
+
+def calculate_cached_sensitivity(
+    incomes: List[Dict[str, Union[float, str]]],
+    wage_growths: List[Dict[str, float]],
+    reform: str = DEFAULT_REFORM,
+) -> List[Dict[str, Dict[int, float]]]:
+    """
+    Calculate a sensitivity sweep, reusing and adding to the per-year results.
+
+    Runs inside the worker pool; with process workers each worker keeps its own cache.
+    """
+    return calculate_sensitivity(
+        incomes, wage_growths, year_results=year_result_cache, reform=reform
+    )
+
+
+def calculate_cached_projection(cache_key: Tuple) -> Dict[str, Dict[int, float]]:
+    """
+    Calculate a normalized projection request, reusing cached results.
+
+    Runs inside the worker pool; with process workers each worker keeps its own cache.
+    """
+    members, end_year, normalized_wage_growth, reform = cache_key
+    people = [
+        {
+            "age": age,
+            "incomes": [{"amount": amount, "type": income_type} for income_type, amount in incomes],
+        }
+        for age, incomes in members
+    ]
+
+    def compute():
+        return calculate_projection(
+            people,
+            list(range(2025, end_year + 1)),
+            dict(normalized_wage_growth),
+            fast=USE_FAST_PROJECTIONS,
+            year_results=year_result_cache,
+            reform=reform,
+        )
+
+    return calculation_cache.get_or_compute(("projection", cache_key), compute)
+
+
+@lru_cache(maxsize=COMPILED_REFORM_CACHE_SIZE)
+def get_parameters_payload(reform: str = DEFAULT_REFORM) -> Dict[str, dict]:
+    """
+    Tax parameters for both scenarios and the OBR earnings growth projections.
+
+    Only the counterfactual's thresholds depend on the request, so each reform's payload is
+    built once per process.
+    """
+    # Get projected thresholds for both scenarios
+    baseline_thresholds, reform_thresholds = get_projected_thresholds()
+    if reform != DEFAULT_REFORM:
+        baseline_thresholds = get_counterfactual_thresholds(reform)
+
+    # Format tax parameters for response
+    tax_parameters = {
+        "current": CURRENT_PARAMETERS,
+        "baseline": {
+            param: {str(year): value for year, value in years.items()}
+            for param, years in baseline_thresholds.items()
+        },
+        "reform": {
+            param: {str(year): value for year, value in years.items()}
+            for param, years in reform_thresholds.items()
+        },
+    }
+
+    return {
+        "tax_parameters": tax_parameters,
+        "obr_earnings_growth": {str(k): v for k, v in OBR_EARNINGS_GROWTH.items()},
+    }
+
+
+@lru_cache(maxsize=COMPILED_REFORM_CACHE_SIZE)
+def get_parameters_json(reform: str = DEFAULT_REFORM) -> Dict[str, Union[bytes, EncodedPayload]]:
+    """
+    `get_parameters_payload` serialized once: the whole payload compressed for
+    /api/parameters, and each part on its own for splicing into calculation responses.
+    """
+    payload = get_parameters_payload(reform)
+    return {
+        "payload": EncodedPayload(dumps_compact(payload), "application/json"),
+        "tax_parameters": dumps_compact(payload["tax_parameters"]),
+        "obr_earnings_growth": dumps_compact(payload["obr_earnings_growth"]),
+    }
+
+
+def dumps_compact(value) -> bytes:
+    """
+    Serialize to JSON the way FastAPI's default JSONResponse does.
+    """
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fill_wage_growth(wage_growth: Dict[str, float], end_year: int = 2029) -> Dict[str, float]:
+    """
+    Fill in wage growth for every projection year through `end_year` - use OBR if empty dict
+    was passed or fall back to custom values
+    """
+    complete_wage_growth = {}
+    for year in range(2026, end_year + 1):
+        year_str = str(year)
+        if not wage_growth:  # Empty dict = use OBR projections
+            complete_wage_growth[year_str] = OBR_EARNINGS_GROWTH.get(year_str, 0.02)
+        else:
+            complete_wage_growth[year_str] = wage_growth.get(
+                year_str, OBR_EARNINGS_GROWTH.get(year_str, 0.02)
+            )
+    return complete_wage_growth
+
+
+def calculation_response_fields(
+    request: WageGrowthRequest, results: Dict[str, Dict[int, float]]
+) -> dict:
+    """
+    The parts of a CalculationResponse that depend on the request, without the tax
+    parameters and OBR projections from `get_parameters_payload`.
+
+    Args:
+        request: Income, wage growth and reform request
+        results: Net income by year for both policy scenarios
+
+    Returns:
+        Dictionary of CalculationResponse fields
+    """
+    with_freeze_results = results["with_freeze"]
+    without_freeze_results = results["without_freeze"]
+
+    # Format results for chart - only for years 2025-2029
+    chart_data = []
+    for year in range(2025, 2030):
+        with_freeze = with_freeze_results.get(year, 0)
+        without_freeze = without_freeze_results.get(year, 0)
+        chart_data.append(
+            {
+                "year": year,
+                "with_freeze": with_freeze,
+                "without_freeze": without_freeze,
+                "difference": without_freeze - with_freeze,
+            }
+        )
+
+    # Convert year keys to strings for JSON compatibility
+    with_freeze_str_keys = {str(k): float(v) for k, v in with_freeze_results.items()}
+    without_freeze_str_keys = {str(k): float(v) for k, v in without_freeze_results.items()}
+
+    # Calculate total impact - differences only matter in 2028-2029
+    # since the freeze is already in place until 2027/28
+    total_impact = sum(
+        without_freeze_results.get(year, 0) - with_freeze_results.get(year, 0)
+        for year in range(2028, 2030)
+    )
+
+    complete_wage_growth = fill_wage_growth(request.wage_growth)
+
+    # Calculate total base income
+    total_base_income = sum(item.amount for item in request.incomes)
+
+    # Calculate income type proportions for the assumptions
+    income_types = {}
+    for item in request.incomes:
+        if item.type in income_types:
+            income_types[item.type] += item.amount / total_base_income
+        else:
+            income_types[item.type] = item.amount / total_base_income
+
+    return {
+        "with_freeze": with_freeze_str_keys,
+        "without_freeze": without_freeze_str_keys,
+        "chart_data": chart_data,
+        "total_impact": float(total_impact),
+        "assumptions": {
+            "base_income": float(total_base_income),
+            "wage_growth": complete_wage_growth,
+            "income_types": income_types,
+        },
+        "reform": json.loads(request_reform(request.reform)),
+    }
+
+
+def build_calculation_response(
+    request: WageGrowthRequest, results: Dict[str, Dict[int, float]]
+) -> CalculationResponse:
+    """
+    Format calculated net incomes for a request as a CalculationResponse.
+
+    Args:
+        request: Income and wage growth request
+        results: Net income by year for both policy scenarios
+
+    Returns:
+        CalculationResponse with impact analysis
+    """
+    fields = calculation_response_fields(request, results)
+    parameters = get_parameters_payload(request_reform(request.reform))
+    fields["assumptions"]["obr_earnings_growth"] = parameters["obr_earnings_growth"]
+    return CalculationResponse(**fields, tax_parameters=parameters["tax_parameters"])
+
+
+def build_calculation_response_json(
+    request: WageGrowthRequest,
+    results: Dict[str, Dict[int, float]],
+    include_parameters: bool = True,
+) -> bytes:
+    """
+    Serialize the same JSON as `build_calculation_response`, splicing in the pre-serialized
+    tax parameters and OBR projections rather than building and validating them each time.
+
+    Args:
+        request: Income and wage growth request
+        results: Net income by year for both policy scenarios
+        include_parameters: Include the tax parameters and OBR projections, which clients
+            can instead fetch once from /api/parameters
+
+    Returns:
+        The response body
+    """
+    fields = calculation_response_fields(request, results)
+    if not include_parameters:
+        return dumps_compact(fields)
+
+    parameters = get_parameters_json(request_reform(request.reform))
+    assumptions = dumps_compact(fields.pop("assumptions"))
+    body = dumps_compact(fields)
+    return b"".join(
+        [
+            body[:-1],
+            b',"assumptions":',
+            assumptions[:-1],
+            b',"obr_earnings_growth":',
+            parameters["obr_earnings_growth"],
+            b'},"tax_parameters":',
+            parameters["tax_parameters"],
+            b"}",
+        ]
+    )
+
+
+@router.get("/parameters", response_model=ParametersResponse)
+async def get_parameters(request: Request):
+    """
+    Get the tax parameters for both scenarios and the OBR earnings growth projections.
+
+    They only change between deployments, so the response carries an ETag and may be cached
+    for `PARAMETERS_MAX_AGE` seconds; a matching If-None-Match gets a 304.
+    """
+    return get_parameters_json()["payload"].response(
+        request.headers, f"public, max-age={PARAMETERS_MAX_AGE}"
+    )
+
 
 @router.post("/calculate", response_model=CalculationResponse)
-async def calculate_impact(request: WageGrowthRequest):
+async def calculate_impact(
+    request: WageGrowthRequest,
+    include_parameters: bool = Query(
+        True,
+        description=(
+            "Include tax_parameters and assumptions.obr_earnings_growth, which don't depend on "
+            "the request and can instead be fetched once from /api/parameters"
+        ),
+    ),
+):
     """
     Calculate the impact of extending the income tax threshold freeze to 2028/29 and 2029/30.
     
     Args:
         request: Income and wage growth request
+        include_parameters: Whether to include the request-independent parameters
     
     Returns:
-        CalculationResponse with impact analysis
+        CalculationResponse with impact analysis, serialized directly rather than validated
+        through the response model
     """
+    # Reading, parsing and validating the body all happen before the endpoint is called
+    record_stage_since_request_start("validation")
+
     try:
         # Convert the income items to a list of dictionaries
         income_items = [{"amount": item.amount, "type": item.type} for item in request.incomes]
         
-        # Calculate impact over years using the provided parameters
-        results = calculate_impact_over_years(
-            incomes=income_items,
-            wage_growth=request.wage_growth
+        # Calculate impact over years from the normalized request in the worker pool
+        cache_key = normalize_calculation_request(
+            income_items, request.wage_growth, request_reform(request.reform)
         )
+        results = await calculate_coalesced(cache_key)
         
-        # Get projected thresholds for both scenarios
-        baseline_thresholds, reform_thresholds = get_projected_thresholds()
-        
-        with_freeze_results = results["with_freeze"]
-        without_freeze_results = results["without_freeze"]
-        
-        # Format results for chart - only for years 2025-2029
-        chart_data = []
-        for year in range(2025, 2030):
-            chart_data.append({
-                "year": year,
-                "with_freeze": with_freeze_results.get(year, 0),
-                "without_freeze": without_freeze_results.get(year, 0),
-                "difference": without_freeze_results.get(year, 0) - with_freeze_results.get(year, 0)
-            })
-        
-        # Convert year keys to strings for JSON compatibility
-        with_freeze_str_keys = {str(k): v for k, v in with_freeze_results.items()}
-        without_freeze_str_keys = {str(k): v for k, v in without_freeze_results.items()}
-        
-        # Calculate total impact - differences only matter in 2028-2029
-        # since the freeze is already in place until 2027/28
-        total_impact = sum(
-            without_freeze_results.get(year, 0) - with_freeze_results.get(year, 0) 
-            for year in range(2028, 2030)
+        with span("response"):
+            return Response(
+                content=build_calculation_response_json(request, results, include_parameters),
+                media_type="application/json",
+            )
+    except WorkerPoolFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
         )
-        
-        # Fill in wage growth values - use OBR if empty dict was passed or fall back to 
-        # custom values
-        complete_wage_growth = {}
-        for year in range(2026, 2030):
-            year_str = str(year)
-            if not request.wage_growth:  # Empty dict = use OBR projections
-                complete_wage_growth[year_str] = OBR_EARNINGS_GROWTH.get(year_str, 0.02)
-            else:
-                complete_wage_growth[year_str] = request.wage_growth.get(
-                    year_str, OBR_EARNINGS_GROWTH.get(year_str, 0.02)
-                )
-        
-        # Calculate total base income
-        total_base_income = sum(item.amount for item in request.incomes)
-        
-        # Calculate income type proportions for the assumptions
-        income_types = {}
-        for item in request.incomes:
-            if item.type in income_types:
-                income_types[item.type] += item.amount / total_base_income
-            else:
-                income_types[item.type] = item.amount / total_base_income
-            
-        # Format tax parameters for response
-        tax_parameters = {
-            "current": CURRENT_PARAMETERS,
-            "baseline": {
-                param: {str(year): value for year, value in years.items()}
-                for param, years in baseline_thresholds.items()
-            },
-            "reform": {
-                param: {str(year): value for year, value in years.items()}
-                for param, years in reform_thresholds.items()
-            }
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Calculation timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/calculate/batch", response_model=BatchCalculationResponse)
+async def calculate_impact_batch(request: BatchCalculationRequest):
+    """
+    Calculate the impact of the freeze extension for many income profiles in one request.
+
+    Profiles that aren't cached are simulated together, one simulation per scenario for
+    every `BATCH_CHUNK_SIZE` profiles.
+
+    Args:
+        request: Income and wage growth requests
+
+    Returns:
+        BatchCalculationResponse with one CalculationResponse per item, in order
+
+    Raises:
+        HTTPException: 422 naming the first item whose incomes can't be simulated
+    """
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"Batches are limited to {MAX_BATCH_SIZE} items"
+        )
+
+    record_stage_since_request_start("validation")
+
+    try:
+        cache_keys = [
+            normalize_calculation_request(
+                [{"amount": item.amount, "type": item.type} for item in batch_item.incomes],
+                batch_item.wage_growth,
+                request_reform(batch_item.reform),
+            )
+            for batch_item in request.items
+        ]
+        results = await worker_pool.run(calculate_validated_impact_batch, cache_keys)
+
+        with span("response"):
+            return BatchCalculationResponse(
+                results=[
+                    build_calculation_response(batch_item, item_results)
+                    for batch_item, item_results in zip(request.items, results)
+                ]
+            )
+    except InvalidBatchItemError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except WorkerPoolFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Calculation timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sensitivity", response_model=SensitivityResponse)
+async def calculate_sensitivity_sweep(request: SensitivityRequest):
+    """
+    Calculate the impact of the freeze extension for one income profile under several wage
+    growth scenarios, e.g. a flat 1%, 2%, 3% and 4%.
+
+    Every scenario is evaluated together, simulating each distinct uprated household once
+    per policy scenario, so a sweep costs far less than one /api/calculate per scenario.
+
+    Args:
+        request: Income profile and wage growth scenarios
+
+    Returns:
+        SensitivityResponse with one row of net incomes and one total impact per scenario
+    """
+    if len(request.wage_growth_scenarios) > MAX_SENSITIVITY_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweeps are limited to {MAX_SENSITIVITY_SCENARIOS} scenarios",
+        )
+
+    record_stage_since_request_start("validation")
+
+    try:
+        income_items = [{"amount": item.amount, "type": item.type} for item in request.incomes]
+        reform = request_reform(request.reform)
+        results = await worker_pool.run(
+            calculate_cached_sensitivity, income_items, request.wage_growth_scenarios, reform
+        )
+
+        with span("response"):
+            years = list(range(2025, 2030))
+            return SensitivityResponse(
+                years=years,
+                wage_growth=[
+                    fill_wage_growth(wage_growth) for wage_growth in request.wage_growth_scenarios
+                ],
+                with_freeze=[
+                    [scenario["with_freeze"][year] for year in years] for scenario in results
+                ],
+                without_freeze=[
+                    [scenario["without_freeze"][year] for year in years] for scenario in results
+                ],
+                total_impact=[
+                    sum(
+                        scenario["without_freeze"][year] - scenario["with_freeze"][year]
+                        for year in range(2028, 2030)
+                    )
+                    for scenario in results
+                ],
+                reform=json.loads(reform),
+            )
+    except WorkerPoolFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Calculation timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/projection", response_model=ProjectionResponse)
+async def calculate_projection_impact(request: ProjectionRequest):
+    """
+    Project a household's net income with and without the freeze extension through any
+    year up to 2035.
+
+    The household is one family: one or two adults, who are a couple if there are two, and
+    any children, each with their own age and incomes. Households the analytic fast engine
+    supports cost about the same however long the projection, unless `USE_FAST_PROJECTIONS`
+    is turned off; each year of any other household adds a full simulation's cost.
+
+    Args:
+        request: Household members, last projection year, wage growth and reform
+
+    Returns:
+        ProjectionResponse with each year's net income in both scenarios
+    """
+    people = [
+        {
+            "age": member.age,
+            "incomes": [{"amount": item.amount, "type": item.type} for item in member.incomes],
         }
-        
-        return CalculationResponse(
-            with_freeze=with_freeze_str_keys,
-            without_freeze=without_freeze_str_keys,
-            chart_data=chart_data,
-            total_impact=total_impact,
-            assumptions={
-                "base_income": total_base_income,
-                "wage_growth": complete_wage_growth,
-                "income_types": income_types,
-                "obr_earnings_growth": {str(k): v for k, v in OBR_EARNINGS_GROWTH.items()}
-            },
-            tax_parameters=tax_parameters
+        for member in request.people
+    ]
+    try:
+        validate_household(people)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    record_stage_since_request_start("validation")
+
+    try:
+        reform = request_reform(request.reform)
+        cache_key = normalize_projection_request(
+            people, request.end_year, request.wage_growth, reform
+        )
+
+        async def compute():
+            return await worker_pool.run(calculate_cached_projection, cache_key)
+
+        if COALESCE_REQUESTS:
+            results = await request_coalescer.run(("projection", cache_key), compute)
+        else:
+            results = await compute()
+
+        with span("response"):
+            years = list(range(2025, request.end_year + 1))
+            return ProjectionResponse(
+                years=years,
+                with_freeze=[results["with_freeze"][year] for year in years],
+                without_freeze=[results["without_freeze"][year] for year in years],
+                total_impact=sum(
+                    results["without_freeze"][year] - results["with_freeze"][year] for year in years
+                ),
+                wage_growth=fill_wage_growth(request.wage_growth, request.end_year),
+                reform=json.loads(reform),
+            )
+    except WorkerPoolFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
         )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Calculation timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/percentile-impact", response_model=PercentileImpactResponse)
-async def get_percentile_impact():
+async def score_chunk(lines: List[str], input_format: str, header, start: int) -> List[dict]:
+    """
+    Score a chunk in the worker pool, waiting for capacity rather than failing mid-stream.
+    """
+    while True:
+        try:
+            return await worker_pool.run(score_lines, lines, input_format, header, start)
+        except WorkerPoolFullError:
+            await asyncio.sleep(0.5)
+
+
+@router.post("/calculate/stream")
+async def calculate_impact_stream(request: Request):
+    """
+    Score a large NDJSON or CSV file of income profiles, streaming NDJSON results back.
+
+    NDJSON lines are shaped like a calculate request with an optional "id". CSV input has a
+    header row with an optional id column, one column per income type and optional
+    wage_growth_<year> columns.
+
+    The upload is spooled to a temporary file, since Starlette can't read the request body
+    while streaming the response. Results are then scored `BULK_CHUNK_SIZE` profiles at a
+    time, and the next chunk isn't scored until the previous results have been sent, so
+    memory use doesn't grow with the input and slow clients slow the scoring down.
+
+    Returns:
+        NDJSON stream with one result per input profile, in order
+    """
+    content_type = request.headers.get("content-type", "")
+    input_format = "csv" if "csv" in content_type else "ndjson"
+
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+    async for data in request.stream():
+        upload.write(data)
+    upload.seek(0)
+
+    async def stream_results():
+        with upload:
+            # Bytes that aren't UTF-8 become U+FFFD, failing only their line rather than the
+            # stream after its headers have been sent
+            lines = (line.decode(errors="replace") for line in upload)
+            for chunk, header, start in iter_chunks(lines, input_format, BULK_CHUNK_SIZE):
+                for result in await score_chunk(chunk, input_format, header, start):
+                    yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def build_percentile_impact_payload(mode: str, bins: int, format: str) -> EncodedPayload:
+    """
+    Serialize and compress a /api/percentile-impact body. The population sample is fixed,
+    so each combination of parameters is only built once per process.
+
+    Args:
+        mode: "sample" or "binned"
+        bins: Number of percentile bins in binned mode
+        format: "points", "columnar" or "binary" in sample mode
+
+    Returns:
+        The body in every supported content coding
+    """
+    if mode == "binned":
+        response = PercentileBinsResponse(percentile_bins=get_income_percentile_bins(bins))
+        return EncodedPayload(dumps_compact(response.model_dump()), "application/json")
+
+    if format == "points":
+        response = PercentileImpactResponse(scatter_data=get_income_percentile_impact_data())
+        return EncodedPayload(dumps_compact(response.model_dump()), "application/json")
+
+    columns = get_income_percentile_impact_columns()
+    if format == "columnar":
+        body = dumps_compact({field: values.tolist() for field, values in columns.items()})
+        return EncodedPayload(body, "application/json")
+
+    return EncodedPayload(
+        np.stack(list(columns.values())).astype("<f4").tobytes(),
+        "application/octet-stream",
+        headers={
+            "X-Scatter-Fields": ",".join(columns),
+            "X-Scatter-Length": str(len(columns["percentile"])),
+        },
+    )
+
+
+@router.get(
+    "/percentile-impact",
+    response_model=Union[PercentileImpactResponse, PercentileBinsResponse],
+)
+async def get_percentile_impact(
+    request: Request,
+    mode: Literal["sample", "binned"] = Query(
+        "sample",
+        description=(
+            "sample: one scatter point per sampled household; binned: weighted percentile "
+            "bins summarising every household in the dataset"
+        ),
+    ),
+    bins: int = Query(
+        100, description=f"Number of percentile bins in binned mode, one of {PERCENTILE_BIN_COUNTS}"
+    ),
+    format: Literal["points", "columnar", "binary"] = Query(
+        "points",
+        description=(
+            "points: a list of scatter points; columnar: one JSON array per field; "
+            "binary: little-endian float32 arrays, one per field in X-Scatter-Fields order"
+        ),
+    ),
+):
     """
     Get scatter plot data showing the percentage change in combined net income (2028-2029)
     across income percentiles due to the threshold freeze extension.
+
+    The columnar and binary formats skip per-point response validation. The binned mode
+    always responds with JSON. Every body is serialized and compressed once, then served
+    from memory with a strong ETag and a long-lived Cache-Control.
     
     Returns:
-        PercentileImpactResponse with scatter plot data
+        PercentileImpactResponse with scatter plot data, the same data in a compact format,
+        or PercentileBinsResponse with weighted percentile bins
     """
+    if mode == "binned" and bins not in PERCENTILE_BIN_COUNTS:
+        raise HTTPException(status_code=400, detail=f"bins must be one of {PERCENTILE_BIN_COUNTS}")
+
+    if not is_population_ready():
+        # Loading takes minutes, so ask clients to come back rather than queue behind it
+        start_population_loading()
+        raise HTTPException(
+            status_code=503,
+            detail="Population data is still loading",
+            headers={"Retry-After": str(POPULATION_RETRY_AFTER_SECONDS)},
+        )
+
     try:
-        scatter_data = get_income_percentile_impact_data()
-        return PercentileImpactResponse(scatter_data=scatter_data)
+        key = (mode, bins if mode == "binned" else 0, format if mode == "sample" else "points")
+        payload = percentile_impact_payloads.get(key)
+        if payload is None:
+
+            async def build():
+                # The population data is loaded in this process, so never build in a child
+                built = await worker_pool.run(build_percentile_impact_payload, *key, in_thread=True)
+                percentile_impact_payloads[key] = built
+                return built
+
+            # Concurrent first requests share one build rather than filling the worker pool
+            if COALESCE_REQUESTS:
+                payload = await request_coalescer.run(("percentile_impact", key), build)
+            else:
+                payload = await build()
+        return payload.response(request.headers, f"public, max-age={PERCENTILE_IMPACT_MAX_AGE}")
+    except WorkerPoolFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Calculation timed out")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def job_status(job: dict) -> JobStatusResponse:
+    """
+    Format a job from the job store for a response.
+    """
+    result_url = f"/api/jobs/{job['id']}/result" if job["state"] == "done" else None
+    return JobStatusResponse(**job, result_url=result_url)
+
+
+@router.post("/jobs", response_model=JobStatusResponse, status_code=202)
+def submit_job(request: JobRequest, response: Response):
+    """
+    Submit a long-running analysis, such as the population percentile impact, to run in the
+    background.
+
+    Submitting the same kind and parameters again returns the same job, and a finished job's
+    result is served from the job store rather than recalculated. Jobs that failed are run
+    again.
+
+    Args:
+        request: Kind of analysis and its parameters
+
+    Returns:
+        JobStatusResponse to poll at /api/jobs/{id}, with status 200 if the result is ready
+    """
+    try:
+        job = job_store.submit(request.kind, request.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if job["state"] == "done":
+        response.status_code = 200
+    else:
+        job_runner.notify()
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return job_status(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str):
+    """
+    Get the state of a submitted job.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Get a finished job's result, shaped like the response of the matching endpoint (e.g.
+    /api/percentile-impact). Returns 409 while the job is queued or running, or if it failed.
+    """
+    result = job_store.get_result(job_id)
+    if result is not None:
+        return Response(content=result, media_type="application/json")
+
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    detail = f"Job is {job['state']}" + (f": {job['error']}" if job["error"] else "")
+    raise HTTPException(status_code=409, detail=detail)
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Get size and hit/miss counters for the calculation result cache, and for the per-year
+    results behind partial recalculation.
+    """
+    return {**calculation_cache.stats(), "year_results": year_result_cache.stats()}
+
+
+@router.get("/worker-stats")
+async def get_worker_stats():
+    """
+    Get configuration and the number of unfinished calls for the worker pool, and counters
+    for request coalescing and micro-batching in front of it.
+    """
+    return {
+        **worker_pool.stats(),
+        "coalescing": request_coalescer.stats(),
+        "micro_batching": calculate_batcher.stats(),
+    }
@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .metrics import record_stage, request_thread
+
+
+class WorkerPoolFullError(Exception):
+    """
+    Raised when the worker pool already has as much work as it will accept.
+    """
+
+
+def _run_in_request_context(submitted_at: float, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a call in a worker thread as part of the request that submitted it, recording the
+    time it waited for a worker.
+    """
+    record_stage("queue", time.perf_counter() - submitted_at)
+    with request_thread():
+        return fn(*args)
+
+
+class WorkerPool:
+    """
+    Bounded thread or process pool for running blocking calculations off the event loop.
+
+    At most `max_workers + max_queue` calls are accepted at once; further calls are rejected
+    with `WorkerPoolFullError` rather than queued without limit. A call that exceeds its
+    timeout is cancelled if it hasn't started, and its slot is released when it finishes.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 8,
+        timeout: float = 120,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executors = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self, kind: str) -> Executor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == "process":
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="calculator"
+                )
+            self._executors[kind] = executor
+        return executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, in_thread: bool = False) -> Any:
+        """
+        Run `fn(*args)` in the pool and wait for its result.
+
+        With a thread pool, `fn` runs in a copy of the caller's context, so its spans count
+        towards the caller's request. With a process pool, `fn` and its arguments must be
+        picklable, and its spans aren't recorded.
+
+        `in_thread` runs `fn` in a thread even in a process pool, for work that needs this
+        process's memory, such as the loaded population data. It counts against the same
+        capacity.
+
+        Raises:
+            WorkerPoolFullError: If the pool has no capacity left
+            asyncio.TimeoutError: If the call doesn't finish within the timeout
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise WorkerPoolFullError("Too many calculations in progress")
+            self._pending += 1
+
+        try:
+            if self.kind == "thread" or in_thread:
+                # Carry the request's timings over to the worker thread
+                context = contextvars.copy_context()
+                future = self._get_executor("thread").submit(
+                    context.run, _run_in_request_context, time.perf_counter(), fn, *args
+                )
+            else:
+                future = self._get_executor("process").submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Queued work is dropped; work already running finishes and frees its slot
+            future.cancel()
+            raise
+
+    def stats(self) -> dict:
+        """
+        Report pool configuration and the number of accepted, unfinished calls.
+        """
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+            }
+
+    def shutdown(self):
+        """
+        Stop the pool, dropping queued work and waiting for running work to finish.
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors.clear()
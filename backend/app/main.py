@@ -1,16 +1,52 @@
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 
+from .api.calculator import get_population_status, start_population_loading
+from .api.compression import PrecompressedStaticFiles
+from .api.metrics import TimingMiddleware, render_metrics
+from .api.profiling import get_profile, profiling_requested
+from .api.routes import (
+    calculate_batcher,
+    calculation_cache,
+    job_runner,
+    job_store,
+    request_coalescer,
+    worker_pool,
+)
 from .api.routes import router as api_router
 
+# Load population data in the background at startup rather than in the first request
+WARM_UP_POPULATION = os.environ.get("WARM_UP_POPULATION", "true").lower() == "true"
+
+# Run submitted jobs in this process; turn off for processes that should only serve requests
+RUN_JOBS = os.environ.get("RUN_JOBS", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start warming up population data and resume queued jobs, and shut down the calculation
+    worker pool on exit.
+    """
+    if WARM_UP_POPULATION:
+        start_population_loading()
+    if RUN_JOBS:
+        job_runner.start()
+    yield
+    # Jobs still running are queued again by the next process to start
+    job_runner.stop(timeout=5)
+    worker_pool.shutdown()
+
+
 app = FastAPI(
     title="UK Income Tax Freeze API",
     description="API for analyzing the impact of income tax threshold freezes in the UK",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -20,8 +56,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id"],
 )
 
+# Time every request, outermost so the timings cover the other middleware too
+app.add_middleware(TimingMiddleware)
+
 # Include API routes
 app.include_router(api_router)
 
@@ -34,10 +74,81 @@ async def health_check():
     return {"status": "ok"}
 
 
-# Serve static files in production
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check reporting population data loading progress.
+
+    Returns 503 until the population data behind /api/percentile-impact is loaded.
+    """
+    population_status = get_population_status()
+    status_code = 200 if population_status["state"] == "ready" else 503
+    return JSONResponse(status_code=status_code, content={"population": population_status})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Request and stage duration histograms, cache counters and worker pool load in the
+    Prometheus text format.
+    """
+    cache_stats = calculation_cache.stats()
+    worker_stats = worker_pool.stats()
+    gauges = [
+        ("calculation_cache_hits", "Calculation cache hits since startup.", cache_stats["hits"]),
+        (
+            "calculation_cache_misses",
+            "Calculation cache misses since startup.",
+            cache_stats["misses"],
+        ),
+        ("calculation_cache_size", "Entries in the calculation cache.", cache_stats["size"]),
+        (
+            "worker_pool_pending",
+            "Calculations accepted by the worker pool and not yet finished.",
+            worker_stats["pending"],
+        ),
+        (
+            "requests_coalesced",
+            "Requests that shared an identical calculation already in flight.",
+            request_coalescer.stats()["coalesced"],
+        ),
+        (
+            "calculation_micro_batches",
+            "Micro-batches of concurrent calculate requests run since startup.",
+            calculate_batcher.stats()["batches"],
+        ),
+        *(
+            (f"jobs_{state}", f"Jobs in the {state} state.", count)
+            for state, count in job_store.stats().items()
+        ),
+        (
+            "population_ready",
+            "Whether the population data is loaded.",
+            int(get_population_status()["state"] == "ready"),
+        ),
+    ]
+    return PlainTextResponse(
+        render_metrics(gauges), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def debug_profile(profile_id: str, request: Request):
+    """
+    Collapsed stacks sampled from a request sent with the X-Profile header, ready for
+    flamegraph.pl or speedscope. This request needs the same header.
+    """
+    profile = get_profile(profile_id) if profiling_requested(request.scope) else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile)
+
+
+# Serve static files in production, using the compressed copies written at build time by
+# `python -m app.api.compression`
 static_dir = os.environ.get("STATIC_DIR", "static")
 if os.path.exists(static_dir):
-    app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+    app.mount("/", PrecompressedStaticFiles(directory=static_dir, html=True), name="static")
     
     @app.exception_handler(404)
     async def custom_404_handler(request: Request, exc):
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+# Amounts are never repeated, so no request is answered from an earlier round's caches
+_amounts = count(30_000, 7)
+
+# Micro-batching window for the "on" round when CALCULATE_BATCH_WINDOW leaves it off
+BATCH_WINDOW = 0.01
+
+
+def calculation_request(amount: float) -> dict:
+    return {
+        "incomes": [
+            {"amount": amount, "type": "employment_income"},
+            {"amount": 1000, "type": "savings_interest_income"},
+        ],
+        "wage_growth": {},
+    }
+
+
+def identical_calculations(requests: int) -> List[dict]:
+    amount = next(_amounts)
+    return [calculation_request(amount)] * requests
+
+
+def distinct_calculations(requests: int) -> List[dict]:
+    return [calculation_request(next(_amounts)) for _ in range(requests)]
+
+
+def set_coalescing(enabled: bool):
+    """
+    Turn request coalescing and micro-batching on or off for the running app.
+    """
+    from app.api import routes
+
+    routes.COALESCE_REQUESTS = enabled
+    window = routes.CALCULATE_BATCH_WINDOW or BATCH_WINDOW
+    routes.calculate_batcher.window = window if enabled else 0
+
+
+async def burst(client: httpx.AsyncClient, send: Callable, payloads: List) -> Dict[str, float]:
+    """
+    Send every request at once and wait for all of them.
+
+    Returns:
+        Wall time, and the number of successful and rejected (503) responses
+    """
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(send(client, payload) for payload in payloads))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "ok": sum(response.status_code == 200 for response in responses),
+        "rejected": sum(response.status_code == 503 for response in responses),
+    }
+
+
+async def post_calculate(client: httpx.AsyncClient, payload: dict) -> httpx.Response:
+    return await client.post("/api/calculate", json=payload)
+
+
+async def get_percentile_impact(client: httpx.AsyncClient, query: dict) -> httpx.Response:
+    return await client.get("/api/percentile-impact", params=query)
+
+
+def percentile_impact_queries(requests: int) -> List[dict]:
+    from app.api import routes
+
+    # Each burst starts cold, as after a deployment
+    routes.percentile_impact_payloads.clear()
+    return [{"mode": "binned", "bins": 1000}] * requests
+
+
+async def run(requests: int, scenario_filter: str):
+    from app.api import routes
+    from app.main import app
+
+    scenarios = {
+        "identical /api/calculate": (post_calculate, identical_calculations),
+        "distinct /api/calculate": (post_calculate, distinct_calculations),
+        "cold /api/percentile-impact": (get_percentile_impact, percentile_impact_queries),
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load-test", timeout=None
+    ) as client:
+        # Build the single-request and padded-batch simulation templates before timing
+        for enabled in (False, True):
+            set_coalescing(enabled)
+            await burst(client, post_calculate, distinct_calculations(routes.CALCULATE_BATCH_SIZE))
+
+        print(
+            f"{'scenario':30} {'mode':4} {'ok':>4} {'503':>4} {'seconds':>8} {'ok/s':>8} "
+            f"{'speedup':>8}"
+        )
+        for name, (send, make_payloads) in scenarios.items():
+            if scenario_filter not in name:
+                continue
+            throughput = {}
+            for enabled in (False, True):
+                set_coalescing(enabled)
+                routes.calculation_cache.clear()
+                result = await burst(client, send, make_payloads(requests))
+                mode = "on" if enabled else "off"
+                throughput[mode] = result["ok"] / result["seconds"]
+                speedup = throughput[mode] / throughput["off"] if throughput["off"] else 0
+                print(
+                    f"{name:30} {mode:4} {result['ok']:4} {result['rejected']:4} "
+                    f"{result['seconds']:8.2f} {throughput[mode]:8.1f} {speedup:7.1f}x"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Send bursts of concurrent requests with request coalescing and micro-batching off "
+            "and then on, and report the throughput of each."
+        )
+    )
+    parser.add_argument("--requests", type=int, default=16, help="Concurrent requests per burst")
+    parser.add_argument("-k", "--filter", default="", help="Only run scenarios containing this")
+    args = parser.parse_args()
+
+    # Run offline against the synthetic population, with every request simulated
+    population_path = Path(tempfile.mkdtemp()) / "population.npz"
+    os.environ["POPULATION_ARTIFACT_PATH"] = str(population_path)
+    os.environ["SHARE_POPULATION_DATA"] = "false"
+    os.environ["WARM_UP_POPULATION"] = "false"
+    os.environ["USE_RESPONSE_GRID"] = "false"
+    os.environ["RUN_JOBS"] = "false"
+    os.environ["JOB_STORE_PATH"] = str(population_path.with_name("jobs.sqlite"))
+
+    from app.api.calculator import get_population_data
+
+    from .synthetic import write_synthetic_population_artifact
+
+    write_synthetic_population_artifact(population_path)
+    get_population_data()
+    asyncio.run(run(args.requests, args.filter))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+
+from app.api.calculator import calculate_projection
+
+HORIZONS = (1, 5, 11)
+FAST_REPEATS = 1000
+
+HOUSEHOLDS = {
+    "single earner": [{"age": 40, "incomes": [{"amount": 45_000, "type": "employment_income"}]}],
+    "couple with two children": [
+        {"age": 40, "incomes": [{"amount": 70_000, "type": "employment_income"}]},
+        {"age": 38, "incomes": [{"amount": 25_000, "type": "self_employment_income"}]},
+        {"age": 8, "incomes": []},
+        {"age": 12, "incomes": []},
+    ],
+}
+
+
+def time_call(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Compare how projection cost grows with the horizon on the fast engine and on the full
+    simulation.
+
+    Run from the backend directory with `python -m benchmarks.projection`.
+    """
+    for name, people in HOUSEHOLDS.items():
+        print(f"{name}:")
+        for horizon in HORIZONS:
+            years = list(range(2025, 2025 + horizon))
+
+            # Build the simulation templates for this horizon before timing
+            calculate_projection(people, years, {"2026": 0.05})
+            simulated = time_call(lambda: calculate_projection(people, years, {}))
+            fast = time_call(
+                lambda: [
+                    calculate_projection(people, years, {}, fast=True) for _ in range(FAST_REPEATS)
+                ]
+            )
+
+            print(
+                f"  {horizon:2} years: simulation {simulated:7.3f}s  "
+                f"fast engine {fast / FAST_REPEATS * 1000:7.3f}ms"
+            )
@@ -0,0 +1,51 @@
+import time
+
+from policyengine_uk import Simulation
+
+from app.api.calculator import (
+    NO_FREEZE_REFORM,
+    build_households_by_year,
+    create_simulation,
+)
+
+YEARS = list(range(2025, 2030))
+REPEATS = 5
+
+
+def time_call(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Compare per-call simulation setup cost with and without shared templates.
+
+    Run from the backend directory with `python -m benchmarks.simulation_setup`.
+    """
+    situations = [
+        build_households_by_year(
+            [{"amount": 20_000 + 10_000 * index, "type": "employment_income"}], YEARS, {}
+        )
+        for index in range(REPEATS)
+    ]
+
+    for freeze_thresholds in (True, False):
+        reform = None if freeze_thresholds else NO_FREEZE_REFORM
+        scenario = "with freeze" if freeze_thresholds else "without freeze"
+
+        fresh = [
+            time_call(lambda: Simulation(situation=situation, reform=reform))
+            for situation in situations
+        ]
+        first = time_call(lambda: create_simulation(situations[0], freeze_thresholds))
+        shared = [
+            time_call(lambda: create_simulation(situation, freeze_thresholds))
+            for situation in situations
+        ]
+
+        print(f"{scenario}:")
+        print(f"  new Simulation per call: {sum(fresh) / len(fresh):.3f}s")
+        print(f"  first call building the template: {first:.3f}s")
+        print(f"  template clone per call: {sum(shared) / len(shared):.3f}s")
@@ -0,0 +1,53 @@
+import os
+import time
+
+# Time the API on its own, without population loading competing for the CPU
+os.environ.setdefault("WARM_UP_POPULATION", "false")
+
+STEADY_STATE_REQUESTS = 5
+
+
+def calculation_request(amount: float) -> dict:
+    """
+    A request the response grid can't answer, so it always runs a simulation.
+    """
+    return {
+        "incomes": [
+            {"amount": amount, "type": "employment_income"},
+            {"amount": 1000, "type": "savings_interest_income"},
+        ],
+        "wage_growth": {},
+    }
+
+
+if __name__ == "__main__":
+    """
+    Report import, first-request and steady-state timings for a fresh process.
+
+    Run from the backend directory with `python -m benchmarks.startup`.
+    """
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    print(f"import app.main: {time.perf_counter() - start:.3f}s")
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        client.get("/health").raise_for_status()
+        print(f"first /health: {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        client.post("/api/calculate", json=calculation_request(30_000)).raise_for_status()
+        print(f"first /api/calculate: {time.perf_counter() - start:.3f}s")
+
+        timings = []
+        for index in range(STEADY_STATE_REQUESTS):
+            start = time.perf_counter()
+            response = client.post(
+                "/api/calculate", json=calculation_request(31_000 + 1000 * index)
+            )
+            response.raise_for_status()
+            timings.append(time.perf_counter() - start)
+        print(f"steady-state /api/calculate: {sum(timings) / len(timings):.3f}s mean")
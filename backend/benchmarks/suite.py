@@ -0,0 +1,282 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Income mixes each household-level case runs with
+INCOME_MIXES = {
+    "employment": [{"amount": 30_000, "type": "employment_income"}],
+    "higher_rate_mixed": [
+        {"amount": 60_000, "type": "employment_income"},
+        {"amount": 5_000, "type": "dividend_income"},
+        {"amount": 2_000, "type": "savings_interest_income"},
+    ],
+    "pensioner": [
+        {"amount": 11_500, "type": "state_pension"},
+        {"amount": 20_000, "type": "pension_income"},
+        {"amount": 3_000, "type": "savings_interest_income"},
+    ],
+}
+
+# Profiles per call for the batched calculation
+BATCH_SIZES = (1, 10, 50)
+
+# Cheap cases run this many times more often than simulation cases, to steady their timings
+CHEAP_CASE_REPEAT_FACTOR = 100
+
+
+class BenchmarkCase(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    cheap: bool = False
+
+
+def benchmark_cases(client) -> List[BenchmarkCase]:
+    """
+    The calculator and API hot paths, each parameterised by income mix or batch size.
+
+    Args:
+        client: FastAPI test client for the app
+    """
+    from app.api.calculator import (
+        build_household,
+        calculate_household_df,
+        calculate_impact_over_years,
+        calculate_impact_over_years_batch,
+        get_income_percentile_impact_data,
+    )
+    from app.api.routes import calculation_cache
+
+    def post_calculate(incomes):
+        # Clear the cache so every request is calculated rather than served from memory
+        calculation_cache.clear()
+        client.post("/api/calculate", json={"incomes": incomes}).raise_for_status()
+
+    cases = []
+    for mix, incomes in INCOME_MIXES.items():
+        household = build_household(incomes, 2029, {})
+        cases += [
+            BenchmarkCase(
+                f"build_household[{mix}]",
+                lambda incomes=incomes: build_household(incomes, 2029, {}),
+                True,
+            ),
+            BenchmarkCase(
+                f"calculate_household_df[{mix}]",
+                lambda household=household: calculate_household_df(household, 2029),
+            ),
+            BenchmarkCase(
+                f"calculate_impact_over_years[{mix}]",
+                lambda incomes=incomes: calculate_impact_over_years(incomes, {}),
+            ),
+            BenchmarkCase(
+                f"POST /api/calculate[{mix}]", lambda incomes=incomes: post_calculate(incomes)
+            ),
+        ]
+
+    for batch_size in BATCH_SIZES:
+        income_lists = [
+            [{"amount": 20_000 + 1_000 * index, "type": "employment_income"}]
+            for index in range(batch_size)
+        ]
+        cases.append(
+            BenchmarkCase(
+                f"calculate_impact_over_years_batch[{batch_size}]",
+                lambda income_lists=income_lists: calculate_impact_over_years_batch(
+                    income_lists, [{}] * len(income_lists)
+                ),
+            )
+        )
+
+    cases += [
+        BenchmarkCase("get_income_percentile_impact_data", get_income_percentile_impact_data, True),
+        BenchmarkCase(
+            "GET /api/percentile-impact",
+            lambda: client.get("/api/percentile-impact").raise_for_status(),
+            True,
+        ),
+    ]
+    return cases
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case: BenchmarkCase, repeats: int) -> Dict[str, float]:
+    """
+    Time a case after one untimed warm-up call, with garbage collection paused.
+
+    Returns:
+        Latency percentiles in milliseconds, the number of timed calls and the process peak
+        RSS after the case
+    """
+    case.run()
+    if case.cheap:
+        repeats *= CHEAP_CASE_REPEAT_FACTOR
+
+    # Like timeit, keep garbage collection out of the timings: how often it runs depends on
+    # what else the process has allocated, so timings would depend on which cases ran first
+    gc.collect()
+    gc.disable()
+    timings = []
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            case.run()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+        gc.collect()
+
+    return {
+        "repeats": repeats,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "max_ms": float(np.max(timings)),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    latency_threshold: float,
+    rss_threshold: float,
+    min_regression_ms: float = 1.0,
+) -> List[str]:
+    """
+    Find the metrics that regressed beyond their threshold relative to the baseline.
+
+    Args:
+        results: Metrics by case name from `run_case`
+        baseline: Stored metrics by case name; cases missing from it are not compared
+        latency_threshold: Allowed fractional increase in p50 and p95 latency
+        rss_threshold: Allowed fractional increase in peak RSS
+        min_regression_ms: Latency increases smaller than this are treated as noise
+
+    Returns:
+        One description per regressed metric
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric, threshold, slack in (
+            ("p50_ms", latency_threshold, min_regression_ms),
+            ("p95_ms", latency_threshold, min_regression_ms),
+            ("peak_rss_mb", rss_threshold, 0),
+        ):
+            limit = max(expected[metric] * (1 + threshold), expected[metric] + slack)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.3f} exceeds {limit:.3f} "
+                    f"(baseline {expected[metric]:.3f})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark the calculator and API hot paths offline against a synthetic population, "
+            "and fail when they regress against the stored baseline."
+        )
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per simulation case")
+    parser.add_argument("-k", "--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Store these results as the baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.3, help="Allowed fractional latency regression"
+    )
+    parser.add_argument(
+        "--rss-threshold", type=float, default=0.2, help="Allowed fractional peak RSS regression"
+    )
+    parser.add_argument(
+        "--min-regression-ms",
+        type=float,
+        default=1.0,
+        help="Ignore latency increases smaller than this",
+    )
+    parser.add_argument("--output", type=Path, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Run offline against the synthetic population, with every request simulated
+    population_path = Path(tempfile.mkdtemp()) / "population.npz"
+    os.environ["POPULATION_ARTIFACT_PATH"] = str(population_path)
+    os.environ["SHARE_POPULATION_DATA"] = "false"
+    os.environ["WARM_UP_POPULATION"] = "false"
+    os.environ["USE_RESPONSE_GRID"] = "false"
+    os.environ["RUN_JOBS"] = "false"
+    os.environ["JOB_STORE_PATH"] = str(population_path.with_name("jobs.sqlite"))
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    from .synthetic import write_synthetic_population_artifact
+
+    write_synthetic_population_artifact(population_path)
+
+    results = {}
+    with TestClient(app) as client:
+        for case in benchmark_cases(client):
+            if args.filter not in case.name:
+                continue
+            results[case.name] = run_case(case, args.repeats)
+            result = results[case.name]
+            print(
+                f"{case.name:50} p50 {result['p50_ms']:10.3f}ms  p95 {result['p95_ms']:10.3f}ms  "
+                f"peak RSS {result['peak_rss_mb']:8.1f}MB"
+            )
+
+    report = {
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "cases": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote baseline to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())["cases"]
+    regressions = compare_to_baseline(
+        results, baseline, args.threshold, args.rss_threshold, args.min_regression_ms
+    )
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
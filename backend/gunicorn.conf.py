@@ -0,0 +1,34 @@
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+# Build the tax-benefit system in the master process before forking workers, so they start
+# with it loaded and share its memory copy-on-write instead of each building their own
+PREWARM_TAX_SYSTEM = os.environ.get("PREWARM_TAX_SYSTEM", "false").lower() == "true"
+
+# Load the population data once into shared memory for every worker to map, rather than
+# each worker loading its own copy
+SHARE_POPULATION_DATA = os.environ.get("SHARE_POPULATION_DATA", "false").lower() == "true"
+
+preload_app = PREWARM_TAX_SYSTEM or SHARE_POPULATION_DATA
+
+
+def when_ready(server):
+    """
+    Warm up the simulation templates and share the population data once the app is loaded,
+    before any worker is forked.
+    """
+    if SHARE_POPULATION_DATA:
+        from app.api.calculator import share_population_data
+
+        share_population_data()
+    if PREWARM_TAX_SYSTEM:
+        from app.api.calculator import warm_up_simulation
+
+        warm_up_simulation()
+    if preload_app:
+        # Keep the garbage collector from touching, and so copying, the shared objects
+        gc.freeze()
@@ -0,0 +1,28 @@
+import argparse
+import json
+import sys
+
+from app.api.bulk import BULK_CHUNK_SIZE, score_file_lines
+
+if __name__ == "__main__":
+    """
+    Score an NDJSON or CSV file of income profiles, writing NDJSON results to stdout.
+    """
+    parser = argparse.ArgumentParser(
+        description="Score income profiles under both freeze scenarios, writing NDJSON."
+    )
+    parser.add_argument("input", help="NDJSON or CSV file of income profiles, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        help="Input format (defaults to csv for .csv files, otherwise ndjson)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    input_format = args.format or ("csv" if args.input.endswith(".csv") else "ndjson")
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+
+    with input_file:
+        for result in score_file_lines(input_file, input_format, args.chunk_size):
+            sys.stdout.write(json.dumps(result) + "\n")
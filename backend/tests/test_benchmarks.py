@@ -0,0 +1,36 @@
+from app.api.calculator import calculate_percentile_impact
+from benchmarks.suite import compare_to_baseline
+from benchmarks.synthetic import synthetic_population_data
+
+
+def test_compare_to_baseline_flags_only_regressions_beyond_thresholds():
+    """
+    Test that latency and RSS regressions are reported only beyond their thresholds.
+    """
+    baseline = {
+        "slow": {"p50_ms": 100.0, "p95_ms": 150.0, "peak_rss_mb": 500.0},
+        "fast": {"p50_ms": 0.01, "p95_ms": 0.02, "peak_rss_mb": 500.0},
+    }
+    results = {
+        "slow": {"p50_ms": 140.0, "p95_ms": 160.0, "peak_rss_mb": 650.0},
+        # Tiny absolute increases are noise, however large relative to the baseline
+        "fast": {"p50_ms": 0.5, "p95_ms": 0.9, "peak_rss_mb": 550.0},
+        "new": {"p50_ms": 1000.0, "p95_ms": 1000.0, "peak_rss_mb": 1000.0},
+    }
+
+    regressions = compare_to_baseline(results, baseline, latency_threshold=0.3, rss_threshold=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow: p50_ms")
+    assert regressions[1].startswith("slow: peak_rss_mb")
+
+
+def test_synthetic_population_loses_income_under_the_freeze():
+    """
+    Test that the synthetic benchmark population has a positive impact for every household.
+    """
+    scatter_data = calculate_percentile_impact(synthetic_population_data(households=100))
+
+    assert len(scatter_data["percentile"]) == 100
+    assert (scatter_data["absolute_difference"] >= 0).all()
+    assert scatter_data["absolute_difference"].max() > 0
@@ -0,0 +1,137 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api import bulk, routes
+from app.api.bulk import parse_csv_profile, parse_ndjson_profile, score_file_lines, score_lines
+from app.api.calculator import calculate_impact_over_years
+from app.main import app
+
+
+def fake_batch(income_lists, wage_growths):
+    """
+    Stand-in for the batched simulation that fails on unknown income types, as it does.
+    """
+    if any(item["type"] == "unknown_income" for incomes in income_lists for item in incomes):
+        raise ValueError("Unknown income type")
+    years = range(2025, 2030)
+    return [
+        {
+            "with_freeze": {year: incomes[0]["amount"] for year in years},
+            "without_freeze": {year: incomes[0]["amount"] + 1 for year in years},
+        }
+        for incomes in income_lists
+    ]
+
+
+def test_parse_profiles_from_ndjson_and_csv():
+    """
+    Test that NDJSON lines and CSV rows parse to the same profile.
+    """
+    ndjson_profile = parse_ndjson_profile(
+        '{"id": "a", "incomes": [{"amount": 30000, "type": "employment_income"}], '
+        '"wage_growth": {"2027": 0.03}}'
+    )
+    csv_profile = parse_csv_profile(
+        {"id": "a", "employment_income": "30000", "dividend_income": "", "wage_growth_2027": "0.03"}
+    )
+
+    assert ndjson_profile == csv_profile
+    assert csv_profile == {
+        "id": "a",
+        "incomes": [{"amount": 30000.0, "type": "employment_income"}],
+        "wage_growth": {"2027": 0.03},
+    }
+
+
+def test_score_file_lines_streams_results_in_order():
+    """
+    Test that chunked scoring returns one result per profile, in order, and reports bad lines.
+    """
+    lines = [
+        "id,employment_income,pension_income\n",
+        "first,40000,\n",
+        "second,,20000\n",
+        "third,not a number,\n",
+        ",15000,5000\n",
+    ]
+
+    results = list(score_file_lines(iter(lines), "csv", chunk_size=2))
+
+    assert [result["id"] for result in results] == ["first", "second", "third", 3]
+    assert "error" in results[2]
+
+    expected = calculate_impact_over_years([{"amount": 40000, "type": "employment_income"}], {})
+    for year in range(2025, 2030):
+        assert abs(results[0]["with_freeze"][str(year)] - expected["with_freeze"][year]) < 0.01
+
+
+def test_score_lines_keeps_valid_profiles_batched(monkeypatch):
+    """
+    Test that a profile with an unknown income type is reported without simulating the
+    rest of its chunk one profile at a time.
+    """
+    batches = []
+
+    def counting_batch(income_lists, wage_growths):
+        batches.append(len(income_lists))
+        return fake_batch(income_lists, wage_growths)
+
+    monkeypatch.setattr(bulk, "calculate_impact_over_years_batch", counting_batch)
+    lines = [
+        json.dumps({"incomes": [{"amount": amount, "type": income_type}]})
+        for amount, income_type in [
+            (30_000, "employment_income"),
+            (20_000, "unknown_income"),
+            (10_000, "pension_income"),
+            (float("inf"), "pension_income"),
+        ]
+    ]
+
+    results = score_lines(lines, "ndjson")
+
+    assert batches == [2]
+    assert "Unknown income type" in results[1]["error"]
+    assert "finite" in results[3]["error"]
+    assert results[2]["with_freeze"]["2025"] == 10_000
+
+
+def test_stream_reports_undecodable_lines_without_aborting(monkeypatch):
+    """
+    Test that bytes that aren't UTF-8 fail only their own line of a streamed upload.
+    """
+    monkeypatch.setattr(bulk, "calculate_impact_over_years_batch", fake_batch)
+    body = b"id,employment_income\nfirst,30000\nsecond,3\xff000\nthird,10000\n"
+
+    response = TestClient(app).post(
+        "/api/calculate/stream", content=body, headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["id"] for result in results] == ["first", "second", "third"]
+    assert "error" in results[1]
+    assert results[2]["with_freeze"]["2025"] == 10_000
+
+
+def test_calculate_batch_names_the_item_that_cant_be_simulated(monkeypatch):
+    """
+    Test that /calculate/batch checks every item before simulating, so an unknown income type
+    is a 422 naming its index rather than a 500 for the whole batch.
+    """
+    simulated = []
+    monkeypatch.setattr(
+        routes,
+        "calculate_impact_over_years_batch",
+        lambda *args: simulated.append(args),
+    )
+    items = [
+        {"incomes": [{"amount": 30_000, "type": "employment_income"}]},
+        {"incomes": [{"amount": 30_000, "type": "unknown_income"}]},
+    ]
+
+    response = TestClient(app).post("/api/calculate/batch", json={"items": items})
+
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("items[1]: Unknown income type")
+    assert simulated == []
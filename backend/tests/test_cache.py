@@ -0,0 +1,83 @@
+import threading
+import time
+
+from app.api.cache import ResultCache, normalize_calculation_request
+from app.api.calculator import OBR_EARNINGS_GROWTH
+
+
+def test_normalize_calculation_request_merges_equivalent_requests():
+    """
+    Test that equivalent requests normalize to the same cache key.
+    """
+    first = normalize_calculation_request(
+        [
+            {"amount": 20000, "type": "employment_income"},
+            {"amount": 1000.004, "type": "dividend_income"},
+            {"amount": 30000, "type": "employment_income"},
+        ],
+        {},
+    )
+    second = normalize_calculation_request(
+        [
+            {"amount": 1000, "type": "dividend_income"},
+            {"amount": 50000, "type": "employment_income"},
+        ],
+        {str(year): OBR_EARNINGS_GROWTH[str(year)] for year in range(2026, 2030)},
+    )
+
+    assert first == second
+    assert first[0] == (("dividend_income", 1000.0), ("employment_income", 50000))
+
+
+def test_result_cache_counts_hits_and_evicts_least_recently_used():
+    """
+    Test that the cache reuses values, counts lookups and stays within its size.
+    """
+    cache = ResultCache(max_size=2, ttl=60)
+
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("b", lambda: 2) == 2
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    assert cache.get_or_compute("c", lambda: 3) == 3
+    assert cache.get_or_compute("b", lambda: 4) == 4
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+
+
+def test_result_cache_expires_entries():
+    """
+    Test that entries older than the TTL are recomputed.
+    """
+    cache = ResultCache(max_size=2, ttl=0)
+
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("a", lambda: 2) == 2
+
+
+def test_result_cache_deduplicates_concurrent_computations():
+    """
+    Test that concurrent callers for the same key share one computation.
+    """
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
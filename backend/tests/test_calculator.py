@@ -1,4 +1,31 @@
-from app.api.calculator import calculate_impact_over_years
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from policyengine_uk import Simulation
+
+from app.api import calculator
+from app.api.cache import ResultCache
+from app.api.calculator import (
+    DEFAULT_REFORM,
+    NO_FREEZE_REFORM,
+    build_household,
+    build_households_by_year,
+    build_projection_situation,
+    calculate_impact_over_years,
+    calculate_impact_over_years_batch,
+    calculate_percentile_impact,
+    calculate_sensitivity,
+    calculate_weighted_percentile_bins,
+    canonical_reform_spec,
+    compile_reform,
+    create_simulation,
+    get_simulation_templates,
+    simulation_build_counts,
+    template_bucket,
+)
 
 
 def test_calculate_impact_over_years():
@@ -36,4 +63,305 @@ def test_calculate_impact_over_years():
     # Years 2025-2027 should be identical in both scenarios
     # (freeze already exists in both scenarios)
     for year in range(2025, 2028):
-        assert with_freeze[year] == without_freeze[year]
\ No newline at end of file
+        assert with_freeze[year] == without_freeze[year]
+
+
+def test_calculate_impact_over_years_matches_per_year_simulations():
+    """
+    Test that the batched simulation matches a new simulation per year and scenario, built
+    without the shared templates.
+    """
+    incomes = [
+        {"amount": 60000, "type": "employment_income"},
+        {"amount": 4000, "type": "dividend_income"},
+    ]
+    wage_growth = {"2026": 0.03, "2028": 0.01}
+
+    results = calculate_impact_over_years(incomes, wage_growth)
+
+    for year in range(2025, 2030):
+        household = build_household(incomes, year, wage_growth)
+        for scenario, reform in (("with_freeze", None), ("without_freeze", NO_FREEZE_REFORM)):
+            expected = Simulation(situation=household, reform=reform)
+            expected_net_income = float(expected.calculate("household_net_income", year)[0])
+            assert abs(results[scenario][year] - expected_net_income) < 0.01
+
+
+def test_calculate_impact_over_years_batch_matches_single_requests():
+    """
+    Test that a batch returns the same results, in order, as one request per profile.
+    """
+    income_lists = [
+        [{"amount": 25000, "type": "employment_income"}],
+        [
+            {"amount": 90000, "type": "self_employment_income"},
+            {"amount": 5000, "type": "savings_interest_income"},
+        ],
+        [{"amount": 30000, "type": "pension_income"}],
+    ]
+    wage_growths = [{}, {"2027": 0.04}, {"2029": 0.0}]
+
+    results = calculate_impact_over_years_batch(income_lists, wage_growths)
+
+    assert len(results) == len(income_lists)
+    for incomes, wage_growth, batch_results in zip(income_lists, wage_growths, results):
+        expected = calculate_impact_over_years(incomes, wage_growth)
+        for scenario in ("with_freeze", "without_freeze"):
+            for year in range(2025, 2030):
+                assert abs(batch_results[scenario][year] - expected[scenario][year]) < 0.01
+
+
+def test_calculate_impact_over_years_recalculates_only_changed_years():
+    """
+    Test that changing one year's wage growth only recalculates that year, with the same
+    results as a full calculation.
+    """
+    incomes = [{"amount": 45000, "type": "employment_income"}]
+    year_results = ResultCache()
+
+    calculate_impact_over_years(incomes, {}, year_results=year_results)
+    assert year_results.stats()["size"] == 10
+
+    wage_growth = {"2029": 0.06}
+    results = calculate_impact_over_years(incomes, wage_growth, year_results=year_results)
+
+    # Only the 2029 household changed, in both scenarios
+    assert year_results.stats()["size"] == 12
+    assert year_results.stats()["hits"] == 8
+    expected = calculate_impact_over_years(incomes, wage_growth)
+    for scenario in ("with_freeze", "without_freeze"):
+        for year in range(2025, 2030):
+            assert abs(results[scenario][year] - expected[scenario][year]) < 1e-6
+
+
+def test_calculate_sensitivity_matches_single_requests():
+    """
+    Test that a sweep simulates each distinct household once and matches calculating each
+    scenario on its own.
+    """
+    incomes = [{"amount": 60000, "type": "employment_income"}]
+    # The first two scenarios share every household before 2029
+    wage_growths = [
+        {"2026": 0.02, "2027": 0.02, "2028": 0.02, "2029": 0.01},
+        {"2026": 0.02, "2027": 0.02, "2028": 0.02, "2029": 0.04},
+        {"2026": 0.04, "2027": 0.04, "2028": 0.04, "2029": 0.04},
+    ]
+    year_results = ResultCache()
+
+    results = calculate_sensitivity(incomes, wage_growths, year_results=year_results)
+
+    # 2025 is shared by all three, 2026-2028 by the first two and 2029 by none
+    assert year_results.stats()["size"] == 2 * (1 + 2 * 3 + 3)
+    for wage_growth, scenario_results in zip(wage_growths, results):
+        expected = calculate_impact_over_years(incomes, wage_growth)
+        for scenario in ("with_freeze", "without_freeze"):
+            for year in range(2025, 2030):
+                assert abs(scenario_results[scenario][year] - expected[scenario][year]) < 1e-6
+
+
+def test_sensitivity_sweeps_of_different_sizes_share_templates():
+    """
+    Test that sweeps over different numbers of scenarios reuse one template per scenario.
+    """
+    incomes = [{"amount": 45_000, "type": "employment_income"}]
+    calculate_sensitivity(incomes, [{"2026": rate / 100} for rate in range(20)])
+    builds = simulation_build_counts()
+
+    for points in (35, 50):
+        results = calculate_sensitivity(incomes, [{"2026": rate / 100} for rate in range(points)])
+        assert len(results) == points
+
+    assert simulation_build_counts() == builds
+
+
+def test_create_simulation_matches_new_simulation():
+    """
+    Test that simulations cloned from a shared template match ones built from scratch.
+    """
+    years = list(range(2025, 2030))
+    situation = build_households_by_year(
+        [
+            {"amount": 9000, "type": "employment_income"},
+            {"amount": 2000, "type": "savings_interest_income"},
+        ],
+        years,
+        {},
+    )
+
+    for freeze_thresholds in (True, False):
+        reform = None if freeze_thresholds else NO_FREEZE_REFORM
+        expected = Simulation(situation=situation, reform=reform)
+        simulation = create_simulation(situation, freeze_thresholds)
+        for year in years:
+            expected_net_income = expected.calculate("household_net_income", year)
+            np.testing.assert_allclose(
+                simulation.calculate("household_net_income", year)[: len(expected_net_income)],
+                expected_net_income,
+            )
+
+
+def test_situations_of_different_sizes_share_templates():
+    """
+    Test that single calculations, small batches and sensitivity sweeps reuse the same
+    templates, whatever their number of households.
+    """
+    incomes = [{"amount": 30_000, "type": "employment_income"}]
+    calculate_impact_over_years(incomes, {})
+    builds = simulation_build_counts()
+
+    batch = calculate_impact_over_years_batch([incomes, incomes[:0], incomes], [{}, {}, {}])
+    calculate_sensitivity(incomes, [{}, {"2027": 0.05}])
+
+    assert simulation_build_counts() == builds
+    assert batch[0] == calculate_impact_over_years(incomes, {})
+    assert template_bucket(5) == template_bucket(15) == 16
+    assert template_bucket(300) == 1280
+    assert template_bucket(3000) == 3 * 1280
+
+
+def test_templates_share_their_reforms_tax_benefit_system():
+    """
+    Test that every template and family simulation under one reform uses the same
+    tax-benefit system, which is built only once.
+    """
+    templates = get_simulation_templates(DEFAULT_REFORM)
+    family = build_projection_situation(
+        [
+            {"age": 40, "incomes": [{"amount": 50_000, "type": "employment_income"}]},
+            {"age": 9, "incomes": []},
+        ],
+        [2025, 2026],
+        {},
+    )
+    builds = simulation_build_counts()["tax_benefit_systems"]
+
+    assert templates.template(16).tax_benefit_system is templates.tax_benefit_system
+    assert templates.template(256).tax_benefit_system is templates.tax_benefit_system
+    assert create_simulation(family).tax_benefit_system is templates.tax_benefit_system
+    assert simulation_build_counts()["tax_benefit_systems"] == builds
+
+
+def test_concurrent_first_uses_of_a_reform_build_its_system_once(monkeypatch):
+    """
+    Test that concurrent callers needing a reform's templates wait for one build.
+    """
+    built = []
+
+    class SlowTemplates:
+        def __init__(self, reform):
+            built.append(reform)
+            time.sleep(0.2)
+
+    monkeypatch.setattr(calculator, "SimulationTemplates", SlowTemplates)
+    # A key no real reform has, so later tests don't get the stand-in
+    reform = "concurrent first use"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(calculator.get_simulation_templates, [reform] * 4))
+
+    assert built == [reform]
+    assert all(result is results[0] for result in results)
+
+
+def test_calculate_percentile_impact_drops_non_finite_households():
+    """
+    Test that the scatter data skips invalid households and ranks the rest by net income.
+    """
+
+    def population_df(net_income):
+        return pd.DataFrame(
+            {
+                "household_id": [1, 2, 3, 4],
+                "household_net_income": net_income,
+                "household_weight": [1.0, 1.0, 1.0, 1.0],
+            }
+        )
+
+    population_data = (
+        population_df([40_000.0, 20_000.0, 0.0, np.nan]),
+        population_df([39_000.0, 20_100.0, 0.0, 10_000.0]),
+        population_df([40_000.0, 20_000.0, 0.0, 10_000.0]),
+        population_df([39_000.0, 20_100.0, 0.0, 10_000.0]),
+    )
+
+    scatter_data = calculate_percentile_impact(population_data)
+
+    np.testing.assert_allclose(scatter_data["percentile"], [100.0, 50.0])
+    np.testing.assert_allclose(scatter_data["percentage_change"], [2.5, 0.0])
+    np.testing.assert_allclose(scatter_data["absolute_difference"], [2_000.0, 0.0])
+
+
+def test_calculate_weighted_percentile_bins_splits_by_weight():
+    """
+    Test that percentile bins hold equal weight and summarise each bin's households.
+    """
+
+    def population_df(net_income):
+        return pd.DataFrame(
+            {
+                "household_id": [1, 2, 3, 4],
+                "household_net_income": net_income,
+                "household_weight": [3.0, 1.0, 1.0, 1.0],
+            }
+        )
+
+    baseline_income = [10_000.0, 20_000.0, 30_000.0, 40_000.0]
+    reform_income = [10_000.0, 19_800.0, 29_400.0, 39_600.0]
+    population_data = (
+        population_df(baseline_income),
+        population_df(reform_income),
+        population_df(baseline_income),
+        population_df(reform_income),
+    )
+
+    percentile_bins = calculate_weighted_percentile_bins(population_data, bins=2)
+
+    np.testing.assert_allclose(percentile_bins["percentile"], [50.0, 100.0])
+    np.testing.assert_allclose(percentile_bins["household_weight"], [3.0, 3.0])
+    np.testing.assert_allclose(percentile_bins["mean_net_income"], [10_000.0, 30_000.0])
+    np.testing.assert_allclose(percentile_bins["mean_absolute_difference"], [0.0, 800.0])
+    np.testing.assert_allclose(percentile_bins["median_absolute_difference"], [0.0, 800.0])
+    np.testing.assert_allclose(percentile_bins["mean_percentage_change"], [0.0, 1.0 + 1 / 3])
+
+
+def test_canonical_reform_spec_shares_one_compiled_reform():
+    """
+    Test that equivalent reform specs canonicalize alike and compile once, with the default
+    spec compiling to the original counterfactual.
+    """
+    equivalent = canonical_reform_spec(
+        {"thresholds": ["personal_allowance", "basic_rate_limit", "personal_allowance"]}
+    )
+
+    assert equivalent == canonical_reform_spec() == DEFAULT_REFORM
+    assert compile_reform(equivalent) is NO_FREEZE_REFORM
+    expected = {
+        "gov.hmrc.income_tax.allowances.personal_allowance.amount": {
+            "2028-01-01.2028-12-31": 12_867,
+            "2029-01-01.2029-12-31": 13_208,
+        },
+        "gov.hmrc.income_tax.rates.uk[1].threshold": {
+            "2028-01-01.2028-12-31": 38_590,
+            "2029-01-01.2029-12-31": 39_613,
+        },
+    }
+    for parameter, values in expected.items():
+        # Thresholds keep rising with long-run growth through the last projection year
+        assert list(NO_FREEZE_REFORM[parameter]) == [
+            f"{year}-01-01.{year}-12-31" for year in range(2028, 2036)
+        ]
+        assert NO_FREEZE_REFORM[parameter].items() >= values.items()
+
+    shorter = compile_reform(canonical_reform_spec({"freeze_end_year": 2028, "uprating": "cpi"}))
+    shorter_values = shorter["gov.hmrc.income_tax.rates.uk[1].threshold"]
+    assert min(shorter_values) == "2029-01-01.2029-12-31"
+    assert shorter_values["2029-01-01.2029-12-31"] == 38_454
+
+    for invalid in (
+        {"freeze_end_year": 2031},
+        {"uprating": "rpi"},
+        {"thresholds": []},
+        {"thresholds": ["higher_rate"]},
+        {"length": 2},
+    ):
+        with pytest.raises(ValueError):
+            canonical_reform_spec(invalid)
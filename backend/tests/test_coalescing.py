@@ -0,0 +1,268 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.api.calculator import DEFAULT_REFORM, simulation_build_counts
+from app.api.coalescing import MicroBatcher, RequestCoalescer
+from app.api.compression import EncodedPayload
+from app.main import app
+
+
+def test_request_coalescer_shares_one_computation():
+    """
+    Test that concurrent callers with the same key share one computation and its error,
+    and that a later caller starts a new one.
+    """
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        if value == "bad":
+            raise ValueError("bad input")
+        return value
+
+    async def run_all():
+        results = await asyncio.gather(
+            *(coalescer.run("a", lambda: compute("a")) for _ in range(5))
+        )
+        errors = await asyncio.gather(
+            *(coalescer.run("b", lambda: compute("bad")) for _ in range(3)),
+            return_exceptions=True,
+        )
+        again = await coalescer.run("a", lambda: compute("a"))
+        return results, errors, again
+
+    results, errors, again = asyncio.run(run_all())
+
+    assert results == ["a"] * 5
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert again == "a"
+    assert calls == ["a", "bad", "a"]
+    assert coalescer.stats() == {"started": 3, "coalesced": 6, "in_flight": 0}
+
+
+def test_micro_batcher_fans_results_out_by_window_and_size():
+    """
+    Test that items are batched up to the size limit or until the window closes, and that
+    each caller gets its own result or error.
+    """
+    batches = []
+
+    async def run_batch(items):
+        batches.append(items)
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    async def run_all():
+        batcher = MicroBatcher(run_batch, window=0.05, max_size=3)
+        return await asyncio.gather(
+            *(batcher.submit(item) for item in ["a", "b", "bad", "c"]), return_exceptions=True
+        )
+
+    results = asyncio.run(run_all())
+
+    assert batches == [["a", "b", "bad"], ["c"]]
+    assert results[:2] == ["A", "B"]
+    assert isinstance(results[2], ValueError)
+    assert results[3] == "C"
+
+
+def test_concurrent_calculate_requests_share_work(monkeypatch):
+    """
+    Test that concurrent /api/calculate requests are coalesced when identical and simulated
+    together when distinct, with every response holding its own results.
+    """
+    batch_sizes = []
+    single_calls = []
+
+    def fake_batch(income_lists, wage_growths, reform=None):
+        batch_sizes.append(len(income_lists))
+        time.sleep(0.05)
+        return [
+            {
+                "with_freeze": {year: incomes[0]["amount"] for year in range(2025, 2030)},
+                "without_freeze": {year: incomes[0]["amount"] + 100 for year in range(2025, 2030)},
+            }
+            for incomes in income_lists
+        ]
+
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "calculate_impact_over_years_batch", fake_batch)
+    monkeypatch.setattr(
+        routes, "calculate_impact_over_years", lambda **kwargs: single_calls.append(kwargs)
+    )
+    monkeypatch.setattr(routes, "request_coalescer", RequestCoalescer())
+    monkeypatch.setattr(
+        routes,
+        "calculate_batcher",
+        MicroBatcher(routes.run_calculation_batch, window=0.05, max_size=8),
+    )
+    routes.calculation_cache.clear()
+
+    amounts = [41_001] * 6 + [41_002, 41_003, 41_004]
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post(
+                        "/api/calculate",
+                        json={"incomes": [{"amount": amount, "type": "employment_income"}]},
+                    )
+                    for amount in amounts
+                )
+            )
+
+    responses = asyncio.run(post_all())
+
+    for amount, response in zip(amounts, responses):
+        assert response.status_code == 200
+        assert response.json()["with_freeze"]["2029"] == amount
+        assert response.json()["total_impact"] == 200
+    # Four distinct requests in one batch
+    assert batch_sizes == [4]
+    assert single_calls == []
+    assert routes.request_coalescer.stats()["coalesced"] == 5
+
+
+def test_batched_and_single_calculations_share_templates(monkeypatch):
+    """
+    Test that micro-batches of any size, mixed with single requests, build no simulation
+    templates beyond those single requests and sensitivity sweeps use.
+    """
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "USE_FAST_ENGINE", False)
+    routes.calculation_cache.clear()
+    routes.year_result_cache.clear()
+
+    def cache_keys(*amounts):
+        return [((("employment_income", float(amount)),), (), DEFAULT_REFORM) for amount in amounts]
+
+    routes.calculate_micro_batch(cache_keys(52_001))
+    routes.calculate_micro_batch(cache_keys(*range(52_002, 52_010)))
+    builds = simulation_build_counts()
+
+    for amounts in ([52_101], [52_102, 52_103], [52_104], range(52_105, 52_110)):
+        results = routes.calculate_micro_batch(cache_keys(*amounts))
+        assert all(isinstance(result, dict) for result in results)
+
+    assert simulation_build_counts() == builds
+
+
+def test_concurrent_percentile_impact_requests_build_once(monkeypatch):
+    """
+    Test that concurrent first requests for a percentile-impact body share one build.
+    """
+    builds = []
+
+    def fake_build(mode, bins, format):
+        builds.append((mode, bins, format))
+        time.sleep(0.05)
+        return EncodedPayload(b'{"scatter_data":[]}', "application/json")
+
+    monkeypatch.setattr(routes, "is_population_ready", lambda: True)
+    monkeypatch.setattr(routes, "build_percentile_impact_payload", fake_build)
+    monkeypatch.setattr(routes, "percentile_impact_payloads", {})
+    monkeypatch.setattr(routes, "request_coalescer", RequestCoalescer())
+
+    async def get_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/api/percentile-impact") for _ in range(20)))
+
+    responses = asyncio.run(get_all())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert builds == [("sample", 0, "points")]
+
+
+@pytest.mark.parametrize("window", [0.0, 0.01])
+def test_calculate_request_errors_reach_only_their_caller(monkeypatch, window):
+    """
+    Test that a request that fails to calculate doesn't fail the requests batched with it.
+    """
+
+    def fake_single(incomes, wage_growth, year_results=None, reform=None):
+        if incomes[0]["type"] == "unknown_income":
+            raise ValueError("Unknown income type")
+        years = range(2025, 2030)
+        return {
+            "with_freeze": {year: 1.0 for year in years},
+            "without_freeze": {year: 2.0 for year in years},
+        }
+
+    def fake_batch(income_lists, wage_growths, reform=None):
+        return [fake_single(incomes, {}) for incomes in income_lists]
+
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "calculate_impact_over_years", fake_single)
+    monkeypatch.setattr(routes, "calculate_impact_over_years_batch", fake_batch)
+    monkeypatch.setattr(
+        routes, "calculate_batcher", MicroBatcher(routes.run_calculation_batch, window, 8)
+    )
+    routes.calculation_cache.clear()
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post(
+                        "/api/calculate",
+                        json={"incomes": [{"amount": 20_000, "type": income_type}]},
+                    )
+                    for income_type in ["employment_income", "unknown_income", "pension_income"]
+                )
+            )
+
+    responses = asyncio.run(post_all())
+
+    assert [response.status_code for response in responses] == [200, 500, 200]
+
+
+def test_calculate_requests_are_not_batched_by_default(monkeypatch):
+    """
+    Test that concurrent distinct requests each take the single-request path, which reuses
+    per-year results, unless micro-batching is turned on.
+    """
+    single_calls = []
+
+    def fake_single(incomes, wage_growth, year_results=None, reform=None):
+        single_calls.append(year_results)
+        years = range(2025, 2030)
+        return {
+            "with_freeze": {year: 1.0 for year in years},
+            "without_freeze": {year: 2.0 for year in years},
+        }
+
+    def fail_batch(income_lists, wage_growths, reform=None):
+        raise AssertionError("batched without CALCULATE_BATCH_WINDOW")
+
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "calculate_impact_over_years", fake_single)
+    monkeypatch.setattr(routes, "calculate_impact_over_years_batch", fail_batch)
+    routes.calculation_cache.clear()
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post(
+                        "/api/calculate",
+                        json={"incomes": [{"amount": amount, "type": "employment_income"}]},
+                    )
+                    for amount in (23_001, 23_002, 23_003)
+                )
+            )
+
+    responses = asyncio.run(post_all())
+
+    assert routes.CALCULATE_BATCH_WINDOW == 0
+    assert [response.status_code for response in responses] == [200] * 3
+    assert single_calls == [routes.year_result_cache] * 3
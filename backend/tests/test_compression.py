@@ -0,0 +1,148 @@
+import gzip
+import json
+import os
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+
+from app.api import routes
+from app.api.compression import (
+    EncodedPayload,
+    PrecompressedStaticFiles,
+    choose_encoding,
+    precompress_directory,
+)
+from app.api.workers import WorkerPool
+from app.main import app
+
+
+def test_choose_encoding_respects_quality_values():
+    """
+    Test that the accepted coding with the highest quality wins, and q=0 refuses a coding.
+    """
+    assert choose_encoding("gzip, deflate", {"gzip": b""}) == "gzip"
+    assert choose_encoding("gzip;q=0", {"gzip": b""}) is None
+    assert choose_encoding("*", {"gzip": b""}) == "gzip"
+    assert choose_encoding("", {"gzip": b""}) is None
+    assert choose_encoding("gzip", {}) is None
+
+
+def test_encoded_payload_serves_compressed_bytes_and_304():
+    """
+    Test that a payload is served gzipped to clients that accept it, with an ETag per coding.
+    """
+    body = json.dumps({"values": list(range(1_000))}).encode()
+    payload = EncodedPayload(body, "application/json")
+
+    plain = payload.response(Headers({}), "public, max-age=60")
+    compressed = payload.response(Headers({"Accept-Encoding": "gzip"}), "public, max-age=60")
+
+    assert plain.body == body
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == body
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert compressed.headers["vary"] == "Accept-Encoding"
+
+    not_modified = payload.response(
+        Headers({"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]}),
+        "public, max-age=60",
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+
+
+def test_percentile_impact_is_serialized_once(monkeypatch):
+    """
+    Test that /api/percentile-impact builds its body once, then serves it compressed with
+    caching headers.
+    """
+    scatter_data = [
+        {"percentile": float(p), "percentage_change": -0.5, "absolute_difference": -100.0}
+        for p in range(100)
+    ]
+    calls = []
+
+    def fake_percentile_impact_data():
+        calls.append(1)
+        return scatter_data
+
+    monkeypatch.setattr(routes, "is_population_ready", lambda: True)
+    monkeypatch.setattr(routes, "get_income_percentile_impact_data", fake_percentile_impact_data)
+    monkeypatch.setattr(routes, "percentile_impact_payloads", {})
+    client = TestClient(app)
+
+    first = client.get("/api/percentile-impact", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/percentile-impact", headers={"Accept-Encoding": "gzip"})
+
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert "max-age" in first.headers["cache-control"]
+    assert first.json() == {"scatter_data": scatter_data}
+    assert second.headers["etag"] == first.headers["etag"]
+    assert len(calls) == 1
+
+    revalidated = client.get(
+        "/api/percentile-impact",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_percentile_impact_builds_in_process_with_process_workers(monkeypatch):
+    """
+    Test that with process workers the percentile impact is still built in this process,
+    which holds the loaded population data, rather than in a child that would reload it.
+    """
+    builders = []
+
+    def fake_percentile_impact_data():
+        builders.append(os.getpid())
+        return []
+
+    pool = WorkerPool(kind="process", max_workers=1, max_queue=0)
+    monkeypatch.setattr(routes, "worker_pool", pool)
+    monkeypatch.setattr(routes, "is_population_ready", lambda: True)
+    monkeypatch.setattr(routes, "get_income_percentile_impact_data", fake_percentile_impact_data)
+    monkeypatch.setattr(routes, "percentile_impact_payloads", {})
+
+    try:
+        response = TestClient(app).get("/api/percentile-impact")
+    finally:
+        pool.shutdown()
+
+    assert response.status_code == 200
+    assert builders == [os.getpid()]
+
+
+def test_precompressed_static_files(tmp_path):
+    """
+    Test that static files are served from their precompressed copies, with hashed Next.js
+    assets cached as immutable.
+    """
+    script = "console.log('freeze');\n" * 100
+    (tmp_path / "_next" / "static").mkdir(parents=True)
+    (tmp_path / "_next" / "static" / "app.js").write_text(script)
+    (tmp_path / "index.html").write_text("<html></html>")
+
+    assert precompress_directory(tmp_path) >= 1
+    assert not (tmp_path / "index.html.gz").exists()  # Too small to be worth compressing
+
+    static_app = Starlette()
+    static_app.mount("/", PrecompressedStaticFiles(directory=tmp_path, html=True))
+    client = TestClient(static_app)
+
+    asset = client.get("/_next/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert asset.headers["content-encoding"] == "gzip"
+    assert "javascript" in asset.headers["content-type"]
+    assert asset.text == script
+    assert "immutable" in asset.headers["cache-control"]
+
+    identity = client.get("/_next/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.text == script
+
+    page = client.get("/")
+    assert page.headers["cache-control"] == "public, no-cache"
+    assert "etag" in page.headers
@@ -0,0 +1,141 @@
+import pytest
+
+from app.api import calculator
+from app.api.calculator import (
+    CHILD_BENEFIT_AMOUNTS,
+    CHILD_BENEFIT_CHARGE,
+    POST_FREEZE_THRESHOLDS,
+    UNIVERSAL_CREDIT_TAPER_RATE,
+    build_household,
+    calculate_household_df,
+    calculate_impact_fast,
+    calculate_impact_over_years,
+    calculate_net_income_fast,
+    canonical_reform_spec,
+    fast_engine_matches_policyengine,
+    supports_fast_engine,
+)
+
+# PolicyEngine works in float32 and withdraws the personal allowance in whole pounds, so
+# rounding can move the taper by a pound of allowance near the income limit.
+TOLERANCE = 0.5
+
+
+@pytest.mark.parametrize("income_type", ["employment_income", "self_employment_income"])
+@pytest.mark.parametrize("amount", [12_570, 30_000, 50_270, 75_000, 110_000, 150_000])
+def test_fast_engine_matches_policyengine(income_type, amount):
+    """
+    Test that the fast engine matches the full simulation across incomes and years.
+    """
+    incomes = [{"amount": amount, "type": income_type}]
+    wage_growth = {"2026": 0.03, "2029": -0.01}
+
+    for year in range(2025, 2030):
+        household = build_household(incomes, year, wage_growth)
+        assert supports_fast_engine(household, year)
+
+        for freeze_thresholds in (True, False):
+            expected = calculate_household_df(household, year, freeze_thresholds)
+            expected_net_income = float(expected["household_net_income"].iloc[0])
+            net_income = calculate_net_income_fast(household, year, freeze_thresholds)
+            assert net_income == pytest.approx(expected_net_income, abs=TOLERANCE)
+
+
+def test_fast_engine_rejects_unsupported_households():
+    """
+    Test that households outside the fast engine's scope are left to the full simulation.
+    """
+    unsupported = [
+        [{"amount": 8_000, "type": "employment_income"}],
+        [{"amount": 30_000, "type": "dividend_income"}],
+        [
+            {"amount": 30_000, "type": "employment_income"},
+            {"amount": 30_000, "type": "self_employment_income"},
+        ],
+    ]
+
+    for incomes in unsupported:
+        assert not supports_fast_engine(build_household(incomes, 2025, {}), 2025)
+    assert not supports_fast_engine(
+        build_household([{"amount": 30_000, "type": "employment_income"}], 2036, {}), 2036
+    )
+
+
+def test_calculate_impact_over_years_falls_back_to_simulation():
+    """
+    Test that the fast option still returns simulated results for unsupported incomes.
+    """
+    incomes = [{"amount": 20_000, "type": "dividend_income"}]
+
+    assert calculate_impact_over_years(incomes, {}, fast=True) == calculate_impact_over_years(
+        incomes, {}
+    )
+
+
+@pytest.mark.parametrize("amount", [60_000, 150_000])
+def test_fast_engine_matches_policyengine_for_other_reforms(amount):
+    """
+    Test that the fast engine applies a counterfactual reform's thresholds as the full
+    simulation does, including the additional rate threshold.
+    """
+    reform = canonical_reform_spec(
+        {
+            "freeze_end_year": 2027,
+            "uprating": "cpi",
+            "thresholds": ["personal_allowance", "additional_rate_threshold"],
+        }
+    )
+    incomes = [{"amount": amount, "type": "employment_income"}]
+
+    for year in (2028, 2029):
+        household = build_household(incomes, year, {})
+        expected = calculate_household_df(household, year, reform=reform)
+        expected_net_income = float(expected["household_net_income"].iloc[0])
+        net_income = calculate_net_income_fast(household, year, reform=reform)
+        assert net_income == pytest.approx(expected_net_income, abs=TOLERANCE)
+        assert net_income != pytest.approx(
+            calculate_net_income_fast(household, year), abs=TOLERANCE
+        )
+
+
+def test_fast_engine_tables_match_installed_policyengine():
+    """
+    Test that the fast engine's tables match the parameters of the PolicyEngine UK release
+    they were taken from, so refreshing them is part of any upgrade.
+    """
+    from policyengine_uk import CountryTaxBenefitSystem
+
+    assert fast_engine_matches_policyengine()
+    parameters = CountryTaxBenefitSystem().parameters
+
+    for year, (eldest, additional) in CHILD_BENEFIT_AMOUNTS.items():
+        amounts = parameters(f"{year}-01-01").gov.hmrc.child_benefit.amount
+        assert eldest == pytest.approx(amounts.eldest * 52, abs=0.01)
+        assert additional == pytest.approx(amounts.additional * 52, abs=0.01)
+
+    for year, thresholds in POST_FREEZE_THRESHOLDS.items():
+        income_tax = parameters(f"{year}-01-01").gov.hmrc.income_tax
+        assert thresholds["personal_allowance"] == income_tax.allowances.personal_allowance.amount
+        assert thresholds["basic_rate_limit"] == income_tax.rates.uk.thresholds[1]
+
+    current = parameters("2025-01-01").gov
+    assert CHILD_BENEFIT_CHARGE == {
+        "phase_out_start": current.hmrc.income_tax.charges.CB_HITC.phase_out_start,
+        "phase_out_end": current.hmrc.income_tax.charges.CB_HITC.phase_out_end,
+    }
+    assert UNIVERSAL_CREDIT_TAPER_RATE == current.dwp.universal_credit.means_test.reduction_rate
+
+
+def test_fast_engine_falls_back_for_other_policyengine_versions(monkeypatch):
+    """
+    Test that with another PolicyEngine UK version installed, no household uses the fast
+    engine.
+    """
+    monkeypatch.setattr(calculator, "FAST_ENGINE_POLICYENGINE_UK_VERSION", "0.0.0")
+    calculator.fast_engine_matches_policyengine.cache_clear()
+    try:
+        household = build_household([{"amount": 30_000, "type": "employment_income"}], 2025, {})
+        assert not supports_fast_engine(household, 2025)
+        assert calculate_impact_fast([{"amount": 30_000, "type": "employment_income"}], {}) is None
+    finally:
+        calculator.fast_engine_matches_policyengine.cache_clear()
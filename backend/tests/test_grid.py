@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from app.api.calculator import calculate_impact_over_years_batch
+from app.api.grid import (
+    GRID_MAX_ERROR,
+    GRID_YEARS,
+    default_wage_growth,
+    grid_amounts,
+    lookup_impact_over_years,
+)
+
+
+def build_grid(income_type, amounts):
+    """
+    Build response grid arrays for one income type over the given amounts.
+    """
+    wage_growth = default_wage_growth()
+    results = calculate_impact_over_years_batch(
+        [[{"amount": float(amount), "type": income_type}] for amount in amounts],
+        [wage_growth] * len(amounts),
+    )
+    grid = {"amounts": np.asarray(amounts, dtype=float)}
+    for scenario in ("with_freeze", "without_freeze"):
+        grid[f"{income_type}.{scenario}"] = np.array(
+            [[result[scenario][year] for year in GRID_YEARS] for result in results]
+        )
+    return grid
+
+
+@pytest.mark.parametrize(
+    "income_type,low,high",
+    [
+        ("employment_income", 45_000, 55_000),
+        ("employment_income", 95_000, 130_000),
+        # Universal Credit withdrawn alongside tax and National Insurance
+        ("employment_income", 0, 15_000),
+        ("self_employment_income", 45_000, 55_000),
+        ("pension_income", 10_000, 20_000),
+        # Savings allowances and the starting rate for savings
+        ("savings_interest_income", 12_000, 22_000),
+        ("dividend_income", 10_000, 20_000),
+    ],
+)
+def test_response_grid_interpolation_within_error_bound(income_type, low, high):
+    """
+    Test that interpolated grid lookups stay within GRID_MAX_ERROR of live simulation.
+    """
+    amounts = grid_amounts()
+    grid = build_grid(income_type, amounts[(amounts >= low) & (amounts <= high)])
+
+    rng = np.random.default_rng(0)
+    income_lists = [
+        [{"amount": float(amount), "type": income_type}] for amount in rng.uniform(low, high, 20)
+    ]
+    wage_growth = default_wage_growth()
+    for incomes, expected in zip(
+        income_lists,
+        calculate_impact_over_years_batch(income_lists, [wage_growth] * len(income_lists)),
+    ):
+        results = lookup_impact_over_years(incomes, {}, grid)
+
+        for scenario in ("with_freeze", "without_freeze"):
+            for year in GRID_YEARS:
+                assert results[scenario][year] == pytest.approx(
+                    expected[scenario][year], abs=GRID_MAX_ERROR
+                )
+
+
+def test_response_grid_lookup_skips_requests_off_the_grid():
+    """
+    Test that requests the grid doesn't cover are left to the simulation.
+    """
+    grid = {
+        "amounts": np.array([0.0, 100.0]),
+        "employment_income.with_freeze": np.zeros((2, len(GRID_YEARS))),
+        "employment_income.without_freeze": np.zeros((2, len(GRID_YEARS))),
+    }
+    employment = [{"amount": 50.0, "type": "employment_income"}]
+
+    assert lookup_impact_over_years(employment, {}, grid) is not None
+    assert lookup_impact_over_years(employment, {"2027": 0.05}, grid) is None
+    assert (
+        lookup_impact_over_years([{"amount": 500.0, "type": "employment_income"}], {}, grid) is None
+    )
+    assert lookup_impact_over_years([{"amount": 50.0, "type": "pension_income"}], {}, grid) is None
+    assert (
+        lookup_impact_over_years(
+            employment + [{"amount": 10.0, "type": "dividend_income"}], {}, grid
+        )
+        is None
+    )
@@ -0,0 +1,163 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import jobs, routes
+from app.api.jobs import JobKind, JobRunner, JobStore
+from app.main import app
+
+
+@pytest.fixture
+def fake_job_kind(monkeypatch):
+    """
+    Register a "square" job kind that records its runs, and can be made to block or fail.
+    """
+    runs = []
+    release = threading.Event()
+    release.set()
+
+    def normalize(params):
+        if not isinstance(params.get("x"), int):
+            raise ValueError("x must be an integer")
+        return {"x": params["x"]}
+
+    def run(params):
+        runs.append(params["x"])
+        release.wait(5)
+        if params["x"] < 0:
+            raise RuntimeError("negative")
+        return {"square": params["x"] ** 2}
+
+    monkeypatch.setitem(jobs.JOB_KINDS, "square", JobKind(normalize, run, lambda: "v1"))
+    return runs, release
+
+
+def test_job_store_dedupes_and_keeps_results(tmp_path, fake_job_kind):
+    """
+    Test that identical specs share a job whose result outlives the store instance, and that
+    failed jobs are queued again.
+    """
+    runs, _ = fake_job_kind
+    store = JobStore(tmp_path / "jobs.sqlite")
+    runner = JobRunner(store)
+
+    job = store.submit("square", {"x": 3})
+    assert job["state"] == "queued"
+    assert store.submit("square", {"x": 3})["id"] == job["id"]
+    assert runner.run_next()
+    assert not runner.run_next()
+
+    # A new store on the same file, as after a restart, serves the stored result
+    reopened = JobStore(tmp_path / "jobs.sqlite")
+    assert reopened.submit("square", {"x": 3})["state"] == "done"
+    assert reopened.get_result(job["id"]) == '{"square": 9}'
+    assert runs == [3]
+
+    failed = store.submit("square", {"x": -1})
+    runner.run_next()
+    assert store.get(failed["id"])["state"] == "failed"
+    assert store.get(failed["id"])["error"] == "negative"
+    assert store.submit("square", {"x": -1})["state"] == "queued"
+
+    with pytest.raises(ValueError):
+        store.submit("square", {"x": "three"})
+    with pytest.raises(ValueError):
+        store.submit("unknown", {})
+
+
+def test_job_store_limits_running_jobs(tmp_path, fake_job_kind):
+    """
+    Test that no more than `concurrency` jobs are claimed at once, and that running jobs
+    without a recent heartbeat are queued again, even if their owner looks alive.
+    """
+    store = JobStore(tmp_path / "jobs.sqlite", concurrency=1)
+    first = store.submit("square", {"x": 1})
+    second = store.submit("square", {"x": 2})
+
+    assert store.claim("host:1")["id"] == first["id"]
+    assert store.claim("host:2") is None
+
+    store.finish(first["id"], result={"square": 1})
+    assert store.claim(jobs.process_owner())["id"] == second["id"]
+
+    assert store.heartbeat(jobs.process_owner()) == 1
+    assert store.requeue_abandoned(timeout=60) == 0
+
+    # The last heartbeat was long ago, as when another container reused this process's ID
+    with store._connect() as connection:
+        connection.execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - 120, second["id"])
+        )
+    assert store.requeue_abandoned(timeout=60) == 1
+    assert store.get(second["id"])["state"] == "queued"
+
+
+def test_job_store_adds_heartbeats_to_older_stores(tmp_path, fake_job_kind):
+    """
+    Test that a store created before heartbeats gains the column, and its running jobs are
+    queued again.
+    """
+    path = tmp_path / "jobs.sqlite"
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, "
+        "state TEXT NOT NULL, owner TEXT, result TEXT, error TEXT, created_at REAL NOT NULL, "
+        "updated_at REAL NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO jobs VALUES ('old', 'square', '{\"x\": 2}', 'running', 'host:1', NULL, "
+        "NULL, 0, 0)"
+    )
+    connection.close()
+
+    store = JobStore(path)
+    assert store.requeue_abandoned() == 1
+    assert store.claim("host:2")["id"] == "old"
+
+
+def test_job_endpoints(tmp_path, monkeypatch, fake_job_kind):
+    """
+    Test submitting, polling and fetching a job's result over HTTP.
+    """
+    runs, release = fake_job_kind
+    store = JobStore(tmp_path / "jobs.sqlite")
+    runner = JobRunner(store)
+    monkeypatch.setattr(routes, "job_store", store)
+    monkeypatch.setattr(routes, "job_runner", runner)
+    client = TestClient(app)
+
+    release.clear()
+    runner.start()
+    try:
+        submitted = client.post("/api/jobs", json={"kind": "square", "params": {"x": 4}})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        assert submitted.headers["location"] == f"/api/jobs/{job_id}"
+
+        deadline = time.monotonic() + 5
+        while client.get(f"/api/jobs/{job_id}").json()["state"] != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+
+        release.set()
+        while client.get(f"/api/jobs/{job_id}").json()["state"] != "done":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        release.set()
+        runner.stop()
+
+    status = client.get(f"/api/jobs/{job_id}").json()
+    assert status["result_url"] == f"/api/jobs/{job_id}/result"
+    assert client.get(status["result_url"]).json() == {"square": 16}
+
+    resubmitted = client.post("/api/jobs", json={"kind": "square", "params": {"x": 4}})
+    assert resubmitted.status_code == 200
+    assert runs == [4]
+
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.post("/api/jobs", json={"kind": "square", "params": {}}).status_code == 400
@@ -0,0 +1,94 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import profiling, routes
+from app.api.metrics import Histogram, span
+from app.main import app
+
+
+def fake_calculate_impact_over_years(incomes, wage_growth, year_results=None, reform=None):
+    with span("formula_evaluation"):
+        time.sleep(0.05)
+    years = range(2025, 2030)
+    return {
+        "with_freeze": {year: 20_000.0 for year in years},
+        "without_freeze": {year: 20_100.0 for year in years},
+    }
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Test that observations are counted in every bucket at least as large as them.
+    """
+    histogram = Histogram("test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5, stage="a")
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
+
+
+def test_calculate_reports_stage_timings(monkeypatch):
+    """
+    Test that /api/calculate echoes its stages in Server-Timing and /metrics aggregates them.
+    """
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "calculate_impact_over_years", fake_calculate_impact_over_years)
+    routes.calculation_cache.clear()
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/calculate", json={"incomes": [{"amount": 31_234, "type": "employment_income"}]}
+    )
+
+    assert response.status_code == 200
+    stages = dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+    assert {"validation", "queue", "formula_evaluation", "response", "total"} <= set(stages)
+    assert float(stages["formula_evaluation"]) >= 50
+
+    metrics = client.get("/metrics").text
+    assert (
+        'http_request_stage_duration_seconds_count{route="/api/calculate",'
+        'stage="formula_evaluation"}'
+    ) in metrics
+    assert (
+        'http_request_duration_seconds_count{method="POST",route="/api/calculate",status="200"}'
+        in metrics
+    )
+    assert "calculation_cache_misses" in metrics
+
+
+def test_profiling_header_captures_a_profile(monkeypatch):
+    """
+    Test that a request with the profiling token is sampled and its profile can be fetched.
+    """
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "calculate_impact_over_years", fake_calculate_impact_over_years)
+    routes.calculation_cache.clear()
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/calculate",
+        json={"incomes": [{"amount": 45_678, "type": "employment_income"}]},
+        headers={"X-Profile": "secret"},
+    )
+    profile_id = response.headers["X-Profile-Id"]
+
+    assert client.get(f"/debug/profiles/{profile_id}").status_code == 404
+    profile = client.get(f"/debug/profiles/{profile_id}", headers={"X-Profile": "secret"})
+    assert profile.status_code == 200
+    assert "fake_calculate_impact_over_years" in profile.text
+
+    unprofiled = client.post(
+        "/api/calculate",
+        json={"incomes": [{"amount": 45_678, "type": "employment_income"}]},
+        headers={"X-Profile": "wrong"},
+    )
+    assert "X-Profile-Id" not in unprofiled.headers
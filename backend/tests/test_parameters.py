@@ -0,0 +1,70 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.api.models import WageGrowthRequest
+from app.main import app
+
+
+def fake_results():
+    years = range(2025, 2030)
+    return {
+        "with_freeze": {year: 20_000.0 + year for year in years},
+        "without_freeze": {year: 20_100.5 + year for year in years},
+    }
+
+
+def test_calculation_response_json_matches_response_model():
+    """
+    Test that the spliced JSON body parses to the same value as the validated response model.
+    """
+    request = WageGrowthRequest(
+        incomes=[
+            {"amount": 30_000, "type": "employment_income"},
+            {"amount": 5_000, "type": "dividend_income"},
+        ],
+        wage_growth={"2027": 0.05},
+    )
+
+    body = routes.build_calculation_response_json(request, fake_results())
+    expected = routes.build_calculation_response(request, fake_results())
+
+    assert json.loads(body) == expected.model_dump()
+
+
+def test_calculation_response_json_can_omit_parameters():
+    """
+    Test that include_parameters=False drops only the request-independent fields.
+    """
+    request = WageGrowthRequest(incomes=[{"amount": 30_000, "type": "employment_income"}])
+
+    full = json.loads(routes.build_calculation_response_json(request, fake_results()))
+    slim = json.loads(routes.build_calculation_response_json(request, fake_results(), False))
+
+    assert "tax_parameters" not in slim
+    assert "obr_earnings_growth" not in slim["assumptions"]
+    del full["tax_parameters"]
+    del full["assumptions"]["obr_earnings_growth"]
+    assert slim == full
+
+
+def test_parameters_endpoint_revalidates_with_etag():
+    """
+    Test that /api/parameters is cacheable and answers a matching If-None-Match with a 304.
+    """
+    client = TestClient(app)
+
+    response = client.get("/api/parameters")
+    assert response.status_code == 200
+    assert response.json() == routes.get_parameters_payload()
+    assert "max-age" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/api/parameters", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    changed = client.get("/api/parameters", headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
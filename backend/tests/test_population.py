@@ -0,0 +1,229 @@
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api import calculator
+from app.api.population import (
+    SCATTER_FIELDS,
+    attach_shared_population_data,
+    load_population_artifact,
+    save_population_artifact,
+    save_shared_population_data,
+)
+
+
+def test_population_artifact_round_trip(tmp_path):
+    """
+    Test that saved population frames and scatter data load back unchanged.
+    """
+    path = tmp_path / "population.npz"
+    population_data = tuple(
+        pd.DataFrame(
+            {
+                "household_id": [1, 2, 3],
+                "household_net_income": [20_000.0 + offset, 35_000.0, 80_000.0],
+                "household_weight": [1.5, 2.0, 0.5],
+            }
+        )
+        for offset in range(4)
+    )
+    scatter_data = {
+        "percentile": np.array([50.0, 100.0]),
+        "percentage_change": np.array([0.5, 1.0]),
+        "absolute_difference": np.array([120.0, 800.0]),
+    }
+
+    percentile_bins = {
+        2: {"percentile": np.array([50.0, 100.0]), "mean_net_income": np.array([1.0, 2.0])}
+    }
+
+    save_population_artifact(path, "v1", population_data, scatter_data, percentile_bins)
+    loaded_population_data, loaded_scatter_data, loaded_percentile_bins = load_population_artifact(
+        path, "v1"
+    )
+
+    for loaded, expected in zip(loaded_population_data, population_data):
+        pd.testing.assert_frame_equal(loaded, expected)
+    for field, values in scatter_data.items():
+        np.testing.assert_array_equal(loaded_scatter_data[field], values)
+    assert list(loaded_percentile_bins) == [2]
+    for field, values in percentile_bins[2].items():
+        np.testing.assert_array_equal(loaded_percentile_bins[2][field], values)
+
+
+def test_population_artifact_ignored_when_missing_or_stale(tmp_path):
+    """
+    Test that a missing artifact or one with another version is not used.
+    """
+    path = tmp_path / "population.npz"
+    assert load_population_artifact(path, "v1") is None
+
+    population_data = tuple(pd.DataFrame({"household_id": [1]}) for _ in range(4))
+    scatter_data = {field: np.array([]) for field in SCATTER_FIELDS}
+    save_population_artifact(path, "v1", population_data, scatter_data, {})
+    assert load_population_artifact(path, "v2") is None
+
+
+def test_population_data_loads_once_for_concurrent_callers(monkeypatch):
+    """
+    Test that concurrent loads wait for a single computation and report readiness.
+    """
+    calls = []
+    population_data = tuple(pd.DataFrame({"household_id": [1]}) for _ in range(4))
+
+    def compute_population_data():
+        calls.append(1)
+        time.sleep(0.1)
+        return population_data, {}
+
+    monkeypatch.setattr(calculator, "_population_data", None)
+    monkeypatch.setattr(calculator, "_percentile_impact_data", None)
+    monkeypatch.setattr(calculator, "_population_status", {"state": "idle"})
+    monkeypatch.setattr(calculator, "load_population_artifact", lambda path, version: None)
+    monkeypatch.setattr(calculator, "compute_population_data", compute_population_data)
+
+    assert calculator.start_population_loading()
+    threads = [threading.Thread(target=calculator.get_population_data) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calculator.get_population_data() is population_data
+    assert calculator.get_population_status()["state"] == "ready"
+    assert not calculator.start_population_loading()
+    assert len(calls) == 1
+
+
+def test_shared_population_data_is_memory_mapped(tmp_path):
+    """
+    Test that shared population data attaches as read-only memory-mapped arrays, and that a
+    missing or stale copy is not used.
+    """
+    directory = tmp_path / "population"
+    assert attach_shared_population_data(directory, "v1") is None
+
+    population_data = tuple(
+        pd.DataFrame({"household_id": [1, 2], "household_net_income": [20_000.0, 35_000.0]})
+        for _ in range(4)
+    )
+    scatter_data = {field: np.array([1.0, 2.0]) for field in SCATTER_FIELDS}
+    percentile_bins = {2: {"percentile": np.array([50.0, 100.0])}}
+
+    save_shared_population_data(directory, "v1", population_data, scatter_data, percentile_bins)
+    # Saving again replaces the copy without leaving staging directories behind
+    save_shared_population_data(directory, "v1", population_data, scatter_data, percentile_bins)
+    assert [path.name for path in tmp_path.iterdir()] == ["population"]
+    assert attach_shared_population_data(directory, "v2") is None
+
+    shared_population_data, shared_scatter_data, shared_percentile_bins = (
+        attach_shared_population_data(directory, "v1")
+    )
+    for shared, expected in zip(shared_population_data, population_data):
+        pd.testing.assert_frame_equal(shared, expected)
+        values = shared["household_net_income"].values
+        while not isinstance(values, np.memmap):
+            values = values.base
+    for field in SCATTER_FIELDS:
+        np.testing.assert_array_equal(shared_scatter_data[field], scatter_data[field])
+    np.testing.assert_array_equal(
+        shared_percentile_bins[2]["percentile"], percentile_bins[2]["percentile"]
+    )
+
+
+def test_compute_population_data_keeps_only_the_sample(monkeypatch):
+    """
+    Test that the population loader calculates only the household-level variables it needs,
+    runs one microsimulation at a time, and keeps the sample as float32.
+    """
+    import policyengine_uk
+
+    households = 50
+    requested = set()
+    alive = weakref.WeakSet()
+    most_alive = []
+
+    class FakeMicrosimulation:
+        def __init__(self, reform=None, dataset=None):
+            self.reform = reform
+            alive.add(self)
+            most_alive.append(len(alive))
+
+        def calculate(self, variable, period, unweighted=False):
+            requested.add(variable)
+            if variable == "household_id":
+                return np.arange(households)
+            if variable == "household_weight":
+                return np.linspace(1.0, 2.0, households)
+            freeze_loss = 0 if self.reform is not None else 100.0 * (period - 2027)
+            return np.linspace(10_000.0, 90_000.0, households) - freeze_loss
+
+    monkeypatch.setattr(policyengine_uk, "Microsimulation", FakeMicrosimulation)
+    monkeypatch.setattr(calculator, "POPULATION_SAMPLE_SIZE", 10)
+
+    population_data, percentile_bins = calculator.compute_population_data()
+
+    assert requested == set(calculator.POPULATION_VARIABLES)
+    assert max(most_alive) == 1
+    assert len(alive) == 0
+    for df in population_data:
+        assert list(df.columns) == calculator.POPULATION_VARIABLES
+        assert len(df) == 10
+        assert df["household_net_income"].dtype == np.float32
+        assert df["household_id"].is_unique
+    np.testing.assert_array_equal(population_data[0].household_id, population_data[3].household_id)
+    # Bins summarise every household, not just the sample
+    assert percentile_bins[100]["household_weight"].sum() == np.linspace(1.0, 2.0, households).sum()
+    scatter_data = calculator.calculate_percentile_impact(population_data)
+    np.testing.assert_allclose(scatter_data["absolute_difference"], 300.0)
+
+
+def test_reform_population_results_share_current_law(monkeypatch):
+    """
+    Test that population results for other counterfactuals are computed on first use,
+    simulating current law only once across reforms.
+    """
+    simulated = []
+
+    def calculate_population_variables(reform):
+        simulated.append(reform)
+        # Each uprated threshold raises every household's net income by £100 a year
+        uprating = 0.0 if reform is None else 100.0 * len(reform)
+        return [
+            pd.DataFrame(
+                {
+                    "household_id": np.arange(20),
+                    "household_weight": np.ones(20),
+                    "household_net_income": np.linspace(10_000.0, 50_000.0, 20) + uprating,
+                }
+            )
+            for _ in (2028, 2029)
+        ]
+
+    monkeypatch.setattr(
+        calculator, "calculate_population_variables", calculate_population_variables
+    )
+    monkeypatch.setattr(calculator, "POPULATION_SAMPLE_SIZE", 10)
+    calculator.get_current_law_population_frames.cache_clear()
+    calculator.get_reform_population_results.cache_clear()
+
+    one_threshold = calculator.canonical_reform_spec({"thresholds": ["personal_allowance"]})
+    all_thresholds = calculator.canonical_reform_spec(
+        {"thresholds": list(calculator.THRESHOLD_PARAMETERS)}
+    )
+    try:
+        bins = calculator.get_income_percentile_bins(100, one_threshold)
+        scatter_data = calculator.get_income_percentile_impact_data(all_thresholds)
+        calculator.get_income_percentile_bins(1000, one_threshold)
+    finally:
+        calculator.get_current_law_population_frames.cache_clear()
+        calculator.get_reform_population_results.cache_clear()
+
+    assert simulated.count(None) == 1
+    assert len(simulated) == 3
+    assert all(point["mean_absolute_difference"] == pytest.approx(200.0) for point in bins)
+    assert all(point["absolute_difference"] == pytest.approx(600.0) for point in scatter_data)
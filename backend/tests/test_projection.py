@@ -0,0 +1,295 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from policyengine_uk import Simulation
+
+from app.api import calculator, routes
+from app.api.calculator import (
+    NO_FREEZE_REFORM,
+    OBR_EARNINGS_GROWTH,
+    build_projection_situation,
+    calculate_projection,
+    calculate_projection_fast,
+    canonical_reform_spec,
+    create_simulation,
+    income_growth_factors,
+)
+from app.main import app
+
+client = TestClient(app)
+
+YEARS = list(range(2025, 2036))
+
+# As in the fast engine tests, PolicyEngine's float32 arithmetic can move results by pennies
+TOLERANCE = 0.5
+
+HOUSEHOLDS = {
+    "single_self_employed": [
+        {"age": 30, "incomes": [{"amount": 120_000, "type": "self_employment_income"}]}
+    ],
+    "couple_with_children": [
+        {"age": 40, "incomes": [{"amount": 70_000, "type": "employment_income"}]},
+        {"age": 38, "incomes": [{"amount": 25_000, "type": "self_employment_income"}]},
+        {"age": 8, "incomes": []},
+        {"age": 12, "incomes": []},
+    ],
+    "lone_parent_paying_child_benefit_charge": [
+        {"age": 35, "incomes": [{"amount": 68_000, "type": "employment_income"}]},
+        {"age": 6, "incomes": []},
+    ],
+}
+
+
+def test_income_growth_factors_compound_each_year():
+    """
+    Test that growth factors match compounding each year's growth in turn.
+    """
+    wage_growth = {"2027": 0.04, "2031": -0.01}
+
+    factors = income_growth_factors(YEARS, wage_growth)
+
+    factor = 1.0
+    for year, expected in zip(YEARS, factors):
+        if year > 2025:
+            factor *= 1 + wage_growth.get(str(year), OBR_EARNINGS_GROWTH.get(str(year), 0.02))
+        assert expected == pytest.approx(factor)
+
+
+@pytest.mark.parametrize("household", HOUSEHOLDS)
+def test_fast_projection_matches_policyengine(household):
+    """
+    Test that the fast engine matches the full simulation for every year through 2035,
+    including the years after the current-law freeze ends.
+    """
+    people = HOUSEHOLDS[household]
+    wage_growth = {"2027": 0.04}
+
+    fast = calculate_projection_fast(people, YEARS, wage_growth)
+    expected = calculate_projection(people, YEARS, wage_growth)
+
+    assert fast is not None
+    for scenario in ("with_freeze", "without_freeze"):
+        for year in YEARS:
+            assert fast[scenario][year] == pytest.approx(expected[scenario][year], abs=TOLERANCE)
+
+
+def test_fast_projection_matches_policyengine_for_later_freeze_end():
+    """
+    Test that a counterfactual uprating thresholds only after 2030 moves National Insurance
+    thresholds with them, as the full simulation does.
+    """
+    reform = canonical_reform_spec({"freeze_end_year": 2030, "uprating": "cpi"})
+    people = [{"age": 45, "incomes": [{"amount": 55_000, "type": "employment_income"}]}]
+    years = [2030, 2031, 2035]
+
+    fast = calculate_projection_fast(people, years, {}, reform)
+    expected = calculate_projection(people, years, {}, reform=reform)
+
+    for year in years:
+        assert fast["without_freeze"][year] == pytest.approx(
+            expected["without_freeze"][year], abs=TOLERANCE
+        )
+    assert fast["without_freeze"][2030] == pytest.approx(fast["with_freeze"][2030])
+    assert fast["without_freeze"][2031] != pytest.approx(fast["with_freeze"][2031])
+
+
+def test_fast_projection_rejects_unsupported_households():
+    """
+    Test that households outside the fast engine's scope are left to the full simulation.
+    """
+    earner = {"age": 40, "incomes": [{"amount": 60_000, "type": "employment_income"}]}
+    unsupported = [
+        # Childcare entitlements for under-fives
+        [earner, {"age": 3, "incomes": []}],
+        # Universal Credit for a low-income family
+        [
+            {"age": 30, "incomes": [{"amount": 18_000, "type": "employment_income"}]},
+            {"age": 7, "incomes": []},
+        ],
+        # Marriage allowance for a partner below the personal allowance
+        [earner, {"age": 40, "incomes": [{"amount": 5_000, "type": "employment_income"}]}],
+        # A pensioner
+        [{"age": 70, "incomes": [{"amount": 30_000, "type": "employment_income"}]}],
+    ]
+
+    for people in unsupported:
+        assert calculate_projection_fast(people, YEARS, {}) is None
+
+
+def test_projection_falls_back_to_simulation():
+    """
+    Test that the fast option still returns simulated results for unsupported households.
+    """
+    people = [
+        {"age": 40, "incomes": [{"amount": 60_000, "type": "employment_income"}]},
+        {"age": 3, "incomes": []},
+    ]
+    years = [2025, 2031]
+
+    assert calculate_projection(people, years, {}, fast=True) == calculate_projection(
+        people, years, {}
+    )
+
+
+def test_projection_rejects_households_that_are_not_one_family():
+    """
+    Test that projections need one or two adults and stay within the projection years.
+    """
+    adult = {"age": 40, "incomes": [{"amount": 30_000, "type": "employment_income"}]}
+
+    with pytest.raises(ValueError):
+        calculate_projection([adult] * 3, YEARS, {})
+    with pytest.raises(ValueError):
+        calculate_projection([{"age": 10, "incomes": []}], YEARS, {})
+    with pytest.raises(ValueError):
+        calculate_projection([adult], [2036], {})
+
+
+def test_create_simulation_matches_new_simulation_for_families():
+    """
+    Test that simulations cloned from a shared template set every member's age and incomes.
+    """
+    years = [2025, 2033]
+    situation = build_projection_situation(
+        [
+            {"age": 67, "incomes": [{"amount": 11_000, "type": "state_pension"}]},
+            {"age": 30, "incomes": [{"amount": 20_000, "type": "employment_income"}]},
+            {"age": 2, "incomes": []},
+        ],
+        years,
+        {},
+    )
+
+    for freeze_thresholds in (True, False):
+        reform = None if freeze_thresholds else NO_FREEZE_REFORM
+        expected = Simulation(situation=situation, reform=reform)
+        simulation = create_simulation(situation, freeze_thresholds)
+        for year in years:
+            expected_net_income = expected.calculate("household_net_income", year)
+            np.testing.assert_allclose(
+                simulation.calculate("household_net_income", year)[: len(expected_net_income)],
+                expected_net_income,
+            )
+
+
+# /api/calculate results before the counterfactual's uprated parameters ran to 2035
+CALCULATE_REGRESSION_CASES = [
+    (
+        {"incomes": [{"amount": 50_000, "type": "employment_income"}]},
+        [39345.05, 40963.05, 42323.53, 43646.75, 45003.27],
+        [39345.05, 40963.05, 42323.53, 43943.55, 45641.06],
+    ),
+    (
+        {
+            "incomes": [
+                {"amount": 120_000, "type": "employment_income"},
+                {"amount": 5_000, "type": "savings_interest_income"},
+            ],
+            "wage_growth": {"2027": 0.04},
+        },
+        [78182.86, 81662.05, 86179.77, 89586.81, 93316.09],
+        [78182.86, 81662.05, 86179.77, 89764.81, 93698.69],
+    ),
+    (
+        {
+            "incomes": [
+                {"amount": 25_000, "type": "self_employment_income"},
+                {"amount": 12_000, "type": "pension_income"},
+            ]
+        },
+        [21593.65, 22535.52, 23660.46, 24835.79, 26053.88],
+        [21593.65, 22535.52, 23660.46, 24895.19, 26181.48],
+    ),
+]
+
+
+@pytest.mark.parametrize("body, with_freeze, without_freeze", CALCULATE_REGRESSION_CASES)
+def test_calculate_endpoint_results_unchanged_by_longer_projections(
+    monkeypatch, body, with_freeze, without_freeze
+):
+    """
+    Test that extending the default counterfactual to 2035 leaves /api/calculate's
+    simulated 2025-2029 results as they were.
+    """
+    monkeypatch.setattr(routes, "USE_RESPONSE_GRID", False)
+    monkeypatch.setattr(routes, "USE_FAST_ENGINE", False)
+    routes.calculation_cache.clear()
+    routes.year_result_cache.clear()
+
+    response = client.post("/api/calculate", json=body)
+
+    assert response.status_code == 200
+    payload = response.json()
+    for year, expected_with, expected_without in zip(YEARS, with_freeze, without_freeze):
+        assert payload["with_freeze"][str(year)] == pytest.approx(expected_with, abs=TOLERANCE)
+        assert payload["without_freeze"][str(year)] == pytest.approx(
+            expected_without, abs=TOLERANCE
+        )
+
+
+def test_projection_endpoint(monkeypatch):
+    """
+    Test that /api/projection returns each year's results and shares cached results
+    between households listing the same members in a different order.
+    """
+    calls = []
+
+    def fake_projection(people, years, wage_growth, fast=False, year_results=None, reform=None):
+        calls.append((people, years, wage_growth))
+        return {
+            "with_freeze": {year: 1000.0 for year in years},
+            "without_freeze": {year: 1010.0 for year in years},
+        }
+
+    monkeypatch.setattr(routes, "calculate_projection", fake_projection)
+    routes.calculation_cache.clear()
+
+    adults = [
+        {"age": 40, "incomes": [{"amount": 50_000, "type": "employment_income"}]},
+        {"age": 41, "incomes": [{"amount": 30_000, "type": "employment_income"}]},
+    ]
+    for people in (adults, adults[::-1]):
+        response = client.post(
+            "/api/projection", json={"people": people, "end_year": 2035, "wage_growth": {}}
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["years"] == YEARS
+        assert payload["total_impact"] == pytest.approx(10 * len(YEARS))
+        assert sorted(payload["wage_growth"]) == [str(year) for year in YEARS[1:]]
+
+    assert len(calls) == 1
+    assert calls[0][1] == YEARS
+
+
+def test_projection_endpoint_uses_fast_engine_by_default(monkeypatch):
+    """
+    Test that a supported household's projection is answered by the fast engine without
+    simulating, so its cost doesn't grow with the horizon.
+    """
+
+    def fail_simulation(*args, **kwargs):
+        raise AssertionError("simulated a household the fast engine supports")
+
+    monkeypatch.setattr(calculator, "create_simulation", fail_simulation)
+    routes.calculation_cache.clear()
+    people = HOUSEHOLDS["couple_with_children"]
+
+    response = client.post("/api/projection", json={"people": people, "end_year": 2035})
+
+    assert response.status_code == 200
+    expected = calculate_projection_fast(people, YEARS, {})
+    assert response.json()["with_freeze"] == [expected["with_freeze"][year] for year in YEARS]
+
+
+def test_projection_endpoint_rejects_households_that_are_not_one_family():
+    """
+    Test that households without one or two adults are rejected before calculating.
+    """
+    adult = {"age": 40, "incomes": [{"amount": 30_000, "type": "employment_income"}]}
+
+    response = client.post("/api/projection", json={"people": [adult] * 3})
+    assert response.status_code == 400
+
+    response = client.post("/api/projection", json={"people": [adult], "end_year": 2036})
+    assert response.status_code == 422
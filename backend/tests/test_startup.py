@@ -0,0 +1,22 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_importing_app_does_not_import_policyengine_uk():
+    """
+    Test that the API can start serving without importing PolicyEngine UK or pandas.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, app.main; "
+            "print('policyengine_uk' in sys.modules, 'pandas' in sys.modules)",
+        ],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False False"
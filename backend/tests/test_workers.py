@@ -0,0 +1,70 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.api.workers import WorkerPool, WorkerPoolFullError
+
+
+def test_worker_pool_runs_calls_off_the_event_loop():
+    """
+    Test that calls run in a worker thread and return their result.
+    """
+    pool = WorkerPool(max_workers=1, max_queue=0)
+
+    thread_name = asyncio.run(pool.run(lambda: threading.current_thread().name))
+
+    assert thread_name.startswith("calculator")
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+
+def test_worker_pool_rejects_calls_when_full():
+    """
+    Test that calls beyond the pool's capacity are rejected instead of queued.
+    """
+    pool = WorkerPool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def run_two():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(WorkerPoolFullError):
+                await pool.run(lambda: None)
+        finally:
+            release.set()
+        return await first
+
+    assert asyncio.run(run_two()) is True
+    pool.shutdown()
+
+
+def test_worker_pool_times_out_slow_calls():
+    """
+    Test that calls exceeding the timeout raise and later free their slot.
+    """
+    pool = WorkerPool(max_workers=1, max_queue=0, timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.run(release.wait))
+
+    release.set()
+    pool.shutdown()
+    assert pool.stats()["pending"] == 0
+
+
+def test_process_pool_runs_in_thread_calls_in_this_process():
+    """
+    Test that a process pool runs calls in child processes unless asked to use a thread.
+    """
+    pool = WorkerPool(kind="process", max_workers=1, max_queue=0)
+
+    try:
+        assert asyncio.run(pool.run(os.getpid)) != os.getpid()
+        assert asyncio.run(pool.run(os.getpid, in_thread=True)) == os.getpid()
+        assert pool.stats()["pending"] == 0
+    finally:
+        pool.shutdown()
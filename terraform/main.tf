@@ -49,6 +49,11 @@ resource "google_cloud_run_service" "app" {
           name  = "HUGGING_FACE_TOKEN"
           value = var.hugging_face_token
         }
+
+        env {
+          name  = "USE_RESPONSE_GRID"
+          value = tostring(var.use_response_grid)
+        }
         
         resources {
           limits = {
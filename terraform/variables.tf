@@ -19,4 +19,10 @@ variable "hugging_face_token" {
   description = "The Hugging Face API token"
   type        = string
   sensitive   = true
-}
\ No newline at end of file
+}
+
+variable "use_response_grid" {
+  description = "Answer single-income requests from the response grid built into the image"
+  type        = bool
+  default     = false
+}